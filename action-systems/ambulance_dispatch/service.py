@@ -5,6 +5,7 @@ GPS tracking, route optimization, ETA calculation
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from loguru import logger
+import asyncio
 import googlemaps
 import os
 
@@ -118,7 +119,9 @@ class AmbulanceDispatchService:
             }
         
         try:
-            directions = self.gmaps.directions(
+            # The client is synchronous; keep it off the event loop
+            directions = await asyncio.to_thread(
+                self.gmaps.directions,
                 (origin_lat, origin_lng),
                 (dest_lat, dest_lng),
                 mode="driving",
@@ -0,0 +1 @@
+"""Global Dispatch Optimizer"""
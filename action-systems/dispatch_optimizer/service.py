@@ -0,0 +1,354 @@
+"""
+Global Dispatch Optimizer
+Batch case <-> ambulance <-> hospital assignment over all open cases
+"""
+from typing import Dict, Any, List, Optional
+from scipy.optimize import linear_sum_assignment
+from loguru import logger
+import numpy as np
+import asyncio
+import httpx
+import os
+import time
+
+from ambulance_dispatch.service import AmbulanceDispatchService
+from shared.service_auth import backend_url, service_headers
+
+
+# Relative urgency of a case; scales the benefit of serving it this round
+SEVERITY_WEIGHTS = {
+    "critical": 8.0,
+    "high": 4.0,
+    "medium": 2.0,
+    "low": 1.0,
+}
+
+# Cost used for infeasible pairs so the solver never prefers them
+INFEASIBLE_COST = 1e9
+
+
+def haversine_matrix(
+    lat1: np.ndarray,
+    lng1: np.ndarray,
+    lat2: np.ndarray,
+    lng2: np.ndarray,
+) -> np.ndarray:
+    """Pairwise great-circle distances (km) between two sets of points"""
+    lat1, lng1 = np.radians(lat1)[:, None], np.radians(lng1)[:, None]
+    lat2, lng2 = np.radians(lat2)[None, :], np.radians(lng2)[None, :]
+    
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+class DispatchOptimizerService:
+    """Service for globally optimal dispatch across concurrent incidents"""
+    
+    def __init__(self, dispatch_service: Optional[AmbulanceDispatchService] = None):
+        """Initialize the service"""
+        self.backend_url = backend_url()
+        self.dispatch_service = dispatch_service or AmbulanceDispatchService()
+        
+        self.interval_seconds = float(os.getenv("DISPATCH_OPTIMIZER_INTERVAL", "5"))
+        self.avg_speed_kmh = 40.0
+        self.road_factor = 1.3
+        self.max_eta_minutes = 60.0
+        self.icu_reserve_penalty_minutes = 30.0
+        self.page_size = 1000
+        # Dispatched cases/ambulances are skipped until the backend reflects the
+        # assignment, or this long if persisting it failed
+        self.assignment_hold_seconds = 300.0
+        
+        self._held_cases: Dict[str, float] = {}
+        self._held_ambulances: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start periodic optimization rounds"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+            logger.info(f"Dispatch optimizer started (interval: {self.interval_seconds}s)")
+    
+    async def stop(self):
+        """Stop periodic optimization rounds"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Dispatch optimizer stopped")
+    
+    async def _run_loop(self):
+        """Re-run the optimizer over all open cases every interval"""
+        while True:
+            try:
+                await self.run_round()
+            except Exception as e:
+                logger.error(f"Error in dispatch optimization round: {e}")
+            await asyncio.sleep(self.interval_seconds)
+    
+    async def run_round(self) -> Dict[str, Any]:
+        """Fetch open cases and free resources, solve, and dispatch"""
+        cases, ambulances, hospitals = await asyncio.gather(
+            self._get_open_cases(),
+            self._get_available_ambulances(),
+            self._get_hospitals(),
+        )
+        
+        now = time.monotonic()
+        self._release_holds(self._held_cases, cases, "case_id", now)
+        self._release_holds(self._held_ambulances, ambulances, "ambulance_id", now)
+        cases = [c for c in cases or [] if c.get("case_id") not in self._held_cases]
+        ambulances = [a for a in ambulances or [] if a.get("ambulance_id") not in self._held_ambulances]
+        
+        assignments = self.optimize(cases, ambulances, hospitals or [])
+        if not assignments:
+            return {"success": True, "assignments": []}
+        
+        results = await asyncio.gather(
+            *(
+                self.dispatch_service.dispatch_ambulance(
+                    ambulance_id=a["ambulance_id"],
+                    case_id=a["case_id"],
+                    destination_lat=a["destination_lat"],
+                    destination_lng=a["destination_lng"],
+                    hospital_id=a["hospital_id"],
+                )
+                for a in assignments
+            ),
+            return_exceptions=True,
+        )
+        
+        dispatched = [
+            a for a, r in zip(assignments, results)
+            if isinstance(r, dict) and r.get("success")
+        ]
+        for a in dispatched:
+            self._held_cases[a["case_id"]] = now
+            self._held_ambulances[a["ambulance_id"]] = now
+        
+        persisted = await asyncio.gather(*(self._record_dispatch(a) for a in dispatched))
+        failed = len(persisted) - sum(persisted)
+        if failed:
+            logger.warning(f"Dispatch optimizer could not persist {failed} assignments; holding them locally")
+        logger.info(f"Dispatch optimizer assigned {len(dispatched)}/{len(cases)} open cases")
+        
+        return {
+            "success": True,
+            "assignments": dispatched,
+        }
+    
+    def _release_holds(
+        self,
+        holds: Dict[str, float],
+        visible: Optional[List[Dict[str, Any]]],
+        id_field: str,
+        now: float,
+    ):
+        """Drop holds that expired or that the backend no longer lists as free"""
+        visible_ids = None if visible is None else {item.get(id_field) for item in visible}
+        for item_id, held_at in list(holds.items()):
+            if now - held_at > self.assignment_hold_seconds or (
+                visible_ids is not None and item_id not in visible_ids
+            ):
+                del holds[item_id]
+    
+    async def _record_dispatch(self, assignment: Dict[str, Any]) -> bool:
+        """Persist an assignment: ambulance dispatched, case assigned and dispatched"""
+        case_update = {
+            "status": "dispatched",
+            "assigned_ambulance_id": assignment["ambulance_id"],
+        }
+        if assignment.get("hospital_id"):
+            case_update["assigned_hospital_id"] = assignment["hospital_id"]
+        
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                ambulance_response, case_response = await asyncio.gather(
+                    client.post(
+                        f"{self.backend_url}/api/v1/ambulance/dispatch",
+                        json={
+                            "ambulance_id": assignment["ambulance_id"],
+                            "case_id": assignment["case_id"],
+                            "destination_hospital_id": assignment.get("hospital_id"),
+                        },
+                    ),
+                    client.put(
+                        f"{self.backend_url}/api/v1/emergency/{assignment['case_id']}",
+                        json=case_update,
+                    ),
+                )
+        except Exception as e:
+            logger.error(f"Error recording dispatch for case {assignment['case_id']}: {e}")
+            return False
+        return ambulance_response.status_code == 200 and case_response.status_code == 200
+    
+    def optimize(
+        self,
+        cases: List[Dict[str, Any]],
+        ambulances: List[Dict[str, Any]],
+        hospitals: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Solve case <-> ambulance <-> hospital matching for one round"""
+        cases = [
+            c for c in cases
+            if c.get("location_lat") is not None and c.get("location_lng") is not None
+        ]
+        ambulances = [
+            a for a in ambulances
+            if a.get("current_lat") is not None and a.get("current_lng") is not None
+        ]
+        if not cases or not ambulances:
+            return []
+        
+        case_lat = np.array([c["location_lat"] for c in cases], dtype=float)
+        case_lng = np.array([c["location_lng"] for c in cases], dtype=float)
+        
+        pickup_eta = self._eta_matrix(
+            case_lat,
+            case_lng,
+            np.array([a["current_lat"] for a in ambulances], dtype=float),
+            np.array([a["current_lng"] for a in ambulances], dtype=float),
+        )
+        weights = np.array(
+            [SEVERITY_WEIGHTS.get(c.get("severity_level"), 1.0) for c in cases]
+        )
+        
+        # Minimising weight * (eta - horizon) maximises severity-weighted time saved,
+        # so scarce ambulances go to the most urgent cases first
+        cost = weights[:, None] * (pickup_eta - self.max_eta_minutes)
+        cost[pickup_eta > self.max_eta_minutes] = INFEASIBLE_COST
+        
+        case_idx, amb_idx = linear_sum_assignment(cost)
+        feasible = cost[case_idx, amb_idx] < INFEASIBLE_COST
+        case_idx, amb_idx = case_idx[feasible], amb_idx[feasible]
+        
+        hospital_ids = self._assign_hospitals(
+            [cases[i] for i in case_idx],
+            case_lat[case_idx],
+            case_lng[case_idx],
+            hospitals,
+        )
+        
+        return [
+            {
+                "case_id": cases[i]["case_id"],
+                "ambulance_id": ambulances[j]["ambulance_id"],
+                "hospital_id": hospital_id,
+                "destination_lat": cases[i]["location_lat"],
+                "destination_lng": cases[i]["location_lng"],
+                "eta_minutes": int(round(pickup_eta[i, j])),
+            }
+            for i, j, hospital_id in zip(case_idx, amb_idx, hospital_ids)
+        ]
+    
+    def _assign_hospitals(
+        self,
+        cases: List[Dict[str, Any]],
+        case_lat: np.ndarray,
+        case_lng: np.ndarray,
+        hospitals: List[Dict[str, Any]],
+    ) -> List[Optional[str]]:
+        """Match served cases to hospitals, respecting bed and ICU capacity"""
+        hospitals = [
+            h for h in hospitals
+            if h.get("is_active", True)
+            and h.get("location_lat") is not None
+            and h.get("location_lng") is not None
+        ]
+        if not cases or not hospitals:
+            return [None] * len(cases)
+        
+        # Expand each hospital into one column per free slot, capped at the number of cases
+        slot_hospital = []
+        slot_is_icu = []
+        for h_idx, hospital in enumerate(hospitals):
+            icu = min(hospital.get("icu_available", 0), len(cases))
+            beds = min(hospital.get("available_beds", 0), len(cases))
+            slot_hospital.extend([h_idx] * (icu + beds))
+            slot_is_icu.extend([True] * icu + [False] * beds)
+        if not slot_hospital:
+            return [None] * len(cases)
+        
+        slot_hospital = np.array(slot_hospital)
+        slot_is_icu = np.array(slot_is_icu)
+        
+        transfer_eta = self._eta_matrix(
+            case_lat,
+            case_lng,
+            np.array([h["location_lat"] for h in hospitals], dtype=float),
+            np.array([h["location_lng"] for h in hospitals], dtype=float),
+        )[:, slot_hospital]
+        
+        needs_icu = np.array([c.get("severity_level") == "critical" for c in cases])
+        weights = np.array(
+            [SEVERITY_WEIGHTS.get(c.get("severity_level"), 1.0) for c in cases]
+        )
+        
+        cost = weights[:, None] * transfer_eta
+        # Keep ICU beds for critical cases unless a general bed is much further away
+        cost[~needs_icu[:, None] & slot_is_icu[None, :]] += self.icu_reserve_penalty_minutes
+        cost[needs_icu[:, None] & ~slot_is_icu[None, :]] = INFEASIBLE_COST
+        
+        case_idx, slot_idx = linear_sum_assignment(cost)
+        hospital_ids: List[Optional[str]] = [None] * len(cases)
+        for i, s in zip(case_idx, slot_idx):
+            if cost[i, s] < INFEASIBLE_COST:
+                hospital_ids[i] = hospitals[slot_hospital[s]].get("hospital_id")
+        
+        return hospital_ids
+    
+    def _eta_matrix(
+        self,
+        lat1: np.ndarray,
+        lng1: np.ndarray,
+        lat2: np.ndarray,
+        lng2: np.ndarray,
+    ) -> np.ndarray:
+        """Estimated driving time in minutes between two sets of points"""
+        distance_km = haversine_matrix(lat1, lng1, lat2, lng2) * self.road_factor
+        return distance_km / self.avg_speed_kmh * 60
+    
+    async def _get_open_cases(self) -> Optional[List[Dict[str, Any]]]:
+        """Get open cases without an assigned ambulance"""
+        cases = await self._get_all("/api/v1/emergency/", {"status": "open"}, "cases")
+        if cases is None:
+            return None
+        return [case for case in cases if not case.get("assigned_ambulance_id")]
+    
+    async def _get_available_ambulances(self) -> Optional[List[Dict[str, Any]]]:
+        """Get available ambulances"""
+        return await self._get_all("/api/v1/ambulance/", {"status": "available"}, "ambulances")
+    
+    async def _get_hospitals(self) -> Optional[List[Dict[str, Any]]]:
+        """Get active hospitals"""
+        return await self._get_all("/api/v1/hospital/", {"is_active": True}, "hospitals")
+    
+    async def _get_all(self, path: str, params: Dict[str, Any], key: str) -> Optional[List[Dict[str, Any]]]:
+        """Every page of a backend list endpoint; None if any page fails"""
+        # Lists are newest-first, so stopping at one page would starve the oldest cases
+        items: List[Dict[str, Any]] = []
+        cursor = None
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                while True:
+                    page_params = {**params, "limit": self.page_size}
+                    if cursor:
+                        page_params["cursor"] = cursor
+                    response = await client.get(f"{self.backend_url}{path}", params=page_params)
+                    if response.status_code != 200:
+                        logger.error(f"Error fetching {path}: HTTP {response.status_code}")
+                        return None
+                    data = response.json()
+                    items.extend(data.get(key, []))
+                    cursor = data.get("next_cursor")
+                    if not cursor:
+                        return items
+        except Exception as e:
+            logger.error(f"Error fetching {path}: {e}")
+            return None
@@ -2,17 +2,19 @@
 Hospital Notification System
 Bed/ICU status, doctor on-call notifications
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from loguru import logger
 import httpx
 
+from shared.service_auth import backend_url, service_headers
+
 
 class HospitalNotificationService:
     """Service for hospital notifications"""
     
     def __init__(self):
         """Initialize the service"""
-        self.backend_url = "http://localhost:8000"
+        self.backend_url = backend_url()
     
     async def notify_hospital(
         self,
@@ -32,8 +34,14 @@ class HospitalNotificationService:
                 "error": "Hospital not found",
             }
         
-        # Check resource availability
-        resources_available = await self._check_resources(hospital, patient_info)
+        # Hold a bed/ICU bed before notifying so two ambulances can't take the same one
+        reservation = await self._reserve_resources(hospital_id, case_id, patient_info)
+        resources_available = reservation is not None
+        
+        # Suggest better-placed hospitals when the chosen one is out of capacity
+        alternatives = []
+        if not resources_available:
+            alternatives = await self.rank_hospitals(hospital, patient_info)
         
         # Send notification
         notification_sent = await self._send_notification(
@@ -48,6 +56,8 @@ class HospitalNotificationService:
             "hospital_id": hospital_id,
             "case_id": case_id,
             "resources_available": resources_available,
+            "reservation_id": reservation.get("reservation_id") if reservation else None,
+            "alternatives": alternatives,
             "eta_minutes": eta_minutes,
         }
     
@@ -66,10 +76,42 @@ class HospitalNotificationService:
             "resources": resources,
         }
     
+    async def rank_hospitals(
+        self,
+        hospital: Dict[str, Any],
+        patient_info: Dict[str, Any],
+        limit: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Get hospitals ranked by ETA, capacity and capabilities from the backend"""
+        lat = patient_info.get("lat", hospital.get("location_lat"))
+        lng = patient_info.get("lng", hospital.get("location_lng"))
+        if lat is None or lng is None:
+            return []
+        
+        params = {
+            "lat": lat,
+            "lng": lng,
+            "severity": patient_info.get("severity", "medium"),
+            "specialties": patient_info.get("specialties", []),
+            "equipment": patient_info.get("equipment", []),
+            "limit": limit,
+        }
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                response = await client.get(
+                    f"{self.backend_url}/api/v1/hospital/rank",
+                    params=params,
+                )
+                if response.status_code == 200:
+                    return response.json().get("hospitals", [])
+        except Exception as e:
+            logger.error(f"Error ranking hospitals: {e}")
+        return []
+    
     async def _get_hospital(self, hospital_id: str) -> Optional[Dict[str, Any]]:
         """Get hospital data"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
                 response = await client.get(
                     f"{self.backend_url}/api/v1/hospital/{hospital_id}"
                 )
@@ -79,22 +121,29 @@ class HospitalNotificationService:
             logger.error(f"Error fetching hospital: {e}")
         return None
     
-    async def _check_resources(
+    async def _reserve_resources(
         self,
-        hospital: Dict[str, Any],
+        hospital_id: str,
+        case_id: str,
         patient_info: Dict[str, Any],
-    ) -> bool:
-        """Check if hospital has required resources"""
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically reserve an ICU bed (critical cases) or a bed"""
         severity = patient_info.get("severity", "medium")
+        resource_type = "icu" if severity == "critical" else "bed"
         
-        # Check ICU availability for critical cases
-        if severity == "critical":
-            icu_available = hospital.get("icu_available", 0)
-            return icu_available > 0
-        
-        # Check bed availability for other cases
-        beds_available = hospital.get("available_beds", 0)
-        return beds_available > 0
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                response = await client.post(
+                    f"{self.backend_url}/api/v1/hospital/{hospital_id}/reservations",
+                    json={"case_id": case_id, "resource_type": resource_type},
+                )
+                if response.status_code == 201:
+                    return response.json()
+                if response.status_code == 409:
+                    logger.warning(f"Hospital {hospital_id} has no {resource_type} available")
+        except Exception as e:
+            logger.error(f"Error reserving hospital resources: {e}")
+        return None
     
     async def _send_notification(
         self,
@@ -3,16 +3,36 @@ Action Systems Service - FastAPI application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
 
 from ambulance_dispatch.service import AmbulanceDispatchService
 from hospital_notification.service import HospitalNotificationService
 from police_alert.service import PoliceAlertService
 from road_clearance.service import RoadClearanceService
+from dispatch_optimizer.service import DispatchOptimizerService
+from shared.responses import FastJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan events"""
+    # Startup
+    dispatch_optimizer.start()
+    yield
+    # Shutdown
+    await dispatch_optimizer.stop()
+    await road_clearance_service.scheduler.stop()
+
 
 app = FastAPI(
     title="Shivay Action Systems Service",
     description="Action and response execution systems",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -28,6 +48,7 @@ ambulance_service = AmbulanceDispatchService()
 hospital_service = HospitalNotificationService()
 police_service = PoliceAlertService()
 road_clearance_service = RoadClearanceService()
+dispatch_optimizer = DispatchOptimizerService(ambulance_service)
 
 
 @app.get("/")
@@ -41,6 +62,7 @@ async def root():
             "hospital_notification",
             "police_alert",
             "road_clearance",
+            "dispatch_optimizer",
         ],
     }
 
@@ -55,7 +77,20 @@ async def dispatch_ambulance(request: dict):
         destination_lng=request.get("destination_lng"),
         hospital_id=request.get("hospital_id"),
     )
-    return result
+    return FastJSONResponse(result)
+
+
+@app.post("/ambulance/optimize")
+async def optimize_dispatch(request: dict):
+    """Solve batch dispatch for the given (or all open) cases"""
+    if "cases" in request:
+        assignments = dispatch_optimizer.optimize(
+            cases=request.get("cases", []),
+            ambulances=request.get("ambulances", []),
+            hospitals=request.get("hospitals", []),
+        )
+        return FastJSONResponse({"success": True, "assignments": assignments})
+    return FastJSONResponse(await dispatch_optimizer.run_round())
 
 
 @app.post("/hospital/notify")
@@ -67,7 +102,7 @@ async def notify_hospital(request: dict):
         patient_info=request.get("patient_info", {}),
         eta_minutes=request.get("eta_minutes"),
     )
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/police/alert")
@@ -77,8 +112,9 @@ async def send_police_alert(request: dict):
         case_id=request.get("case_id"),
         severity=request.get("severity", "medium"),
         num_officers=request.get("num_officers", 3),
+        location=request.get("location"),
     )
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/road-clearance/request")
@@ -89,5 +125,40 @@ async def request_road_clearance(request: dict):
         route=request.get("route", {}),
         priority=request.get("priority", "high"),
     )
-    return result
+    return FastJSONResponse(result)
+
+
+
+class RoadClearancePosition(BaseModel):
+    """Ambulance GPS ping for a clearance plan"""
+    case_id: str
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    timestamp: Optional[datetime] = None
+    
+    @field_validator("timestamp")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Clearance plans keep naive UTC times; convert zoned timestamps"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+@app.post("/road-clearance/position")
+async def update_road_clearance_position(request: RoadClearancePosition):
+    """Update clearance schedule from ambulance GPS ping"""
+    result = await road_clearance_service.update_position(
+        case_id=request.case_id,
+        lat=request.lat,
+        lng=request.lng,
+        timestamp=request.timestamp,
+    )
+    return FastJSONResponse(result)
+
 
+@app.delete("/road-clearance/{case_id}")
+async def cancel_road_clearance(case_id: str):
+    """Drop a closed case's clearance plan and unsent requests"""
+    road_clearance_service.cancel_clearance(case_id)
+    return FastJSONResponse({"success": True, "case_id": case_id})
@@ -4,15 +4,29 @@ Notify 3 senior officers, override capabilities
 """
 from typing import Dict, Any, List, Optional
 from loguru import logger
+import asyncio
 import httpx
 
+from shared.service_auth import backend_url, service_headers
+
+
+# Minimum officer rank to alert per case severity
+SEVERITY_MIN_RANK = {
+    "critical": "inspector",
+    "high": "si",
+    "medium": "asi",
+    "low": None,
+}
+
 
 class PoliceAlertService:
     """Service for police alerts"""
     
     def __init__(self):
         """Initialize the service"""
-        self.backend_url = "http://localhost:8000"
+        self.backend_url = backend_url()
+        self.max_concurrent_notifications = 10
+        self.notify_timeout_seconds = 5.0
     
     async def send_alert(
         self,
@@ -20,12 +34,13 @@ class PoliceAlertService:
         severity: str,
         num_officers: int = 3,
         override: bool = False,
+        location: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Send alert to police officers"""
         logger.info(f"Sending police alert for case {case_id}, severity: {severity}")
         
         # Get available officers
-        officers = await self._get_available_officers(severity, num_officers)
+        officers = await self._get_available_officers(severity, num_officers, location)
         
         if not officers:
             return {
@@ -33,15 +48,20 @@ class PoliceAlertService:
                 "error": "No available officers found",
             }
         
-        # Send notifications
-        notifications_sent = []
-        for officer in officers:
-            sent = await self._notify_officer(officer, case_id, severity)
-            if sent:
-                notifications_sent.append(officer.get("officer_id"))
+        # Send notifications concurrently so the alert takes about one round trip
+        semaphore = asyncio.Semaphore(self.max_concurrent_notifications)
+        results = await asyncio.gather(
+            *(
+                self._notify_with_timeout(semaphore, officer, case_id, severity)
+                for officer in officers
+            )
+        )
+        notified = [officer for officer, sent in zip(officers, results) if sent]
+        notifications_sent = [officer.get("officer_id") for officer in notified]
         
-        # Log action
-        await self._log_alert_action(case_id, officers, severity)
+        # Log action; only officers who actually got the alert are marked busy
+        if notified:
+            await self._log_alert_action(case_id, notified, severity)
         
         return {
             "success": len(notifications_sent) > 0,
@@ -73,21 +93,48 @@ class PoliceAlertService:
         self,
         severity: str,
         num_officers: int,
+        location: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        """Get available officers based on severity"""
-        # In real implementation, query database for available officers
-        # Filter by rank (senior officers for high severity)
+        """Get nearest available officers, senior officers for high severity"""
+        params: Dict[str, Any] = {"limit": num_officers}
+        min_rank = SEVERITY_MIN_RANK.get(severity)
+        if min_rank:
+            params["min_rank"] = min_rank
+        if location and location.get("lat") is not None and location.get("lng") is not None:
+            params["lat"] = location["lat"]
+            params["lng"] = location["lng"]
         
-        # Mock officers
-        return [
-            {
-                "officer_id": f"OFFICER-{i}",
-                "officer_name": f"Officer {i}",
-                "officer_rank": "inspector",
-                "officer_phone": f"+91123456789{i}",
-            }
-            for i in range(1, num_officers + 1)
-        ]
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                response = await client.get(
+                    f"{self.backend_url}/api/v1/police/officers/available",
+                    params=params,
+                )
+                if response.status_code == 200:
+                    return response.json().get("officers", [])
+        except Exception as e:
+            logger.error(f"Error fetching available officers: {e}")
+        return []
+    
+    async def _notify_with_timeout(
+        self,
+        semaphore: asyncio.Semaphore,
+        officer: Dict[str, Any],
+        case_id: str,
+        severity: str,
+    ) -> bool:
+        """Notify an officer under the concurrency limit and per-officer timeout"""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._notify_officer(officer, case_id, severity),
+                    timeout=self.notify_timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out notifying officer {officer.get('officer_id')}")
+            except Exception as e:
+                logger.error(f"Error notifying officer {officer.get('officer_id')}: {e}")
+        return False
     
     async def _notify_officer(
         self,
@@ -107,8 +154,25 @@ class PoliceAlertService:
         severity: str,
     ):
         """Log alert action"""
-        # In real implementation, save to database
-        pass
+        # Logged actions also mark the officers busy in the backend availability index
+        try:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
+                await asyncio.gather(
+                    *(
+                        client.post(
+                            f"{self.backend_url}/api/v1/police/actions",
+                            json={
+                                "officer_id": officer.get("officer_id"),
+                                "case_id": case_id,
+                                "action_type": "alerted",
+                                "action_description": f"Alerted for {severity} severity case",
+                            },
+                        )
+                        for officer in officers
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Error logging alert action: {e}")
     
     async def _log_override(
         self,
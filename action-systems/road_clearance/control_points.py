@@ -0,0 +1,218 @@
+"""
+Traffic control point index and route clearance plans
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+from loguru import logger
+import bisect
+import json
+import math
+import os
+
+
+EARTH_RADIUS_M = 6371000.0
+
+# Upper bound on observed speed, guards against GPS jumps
+MAX_SPEED_MPS = 40.0
+
+# Bundled city control points, used when TRAFFIC_CONTROL_POINTS_FILE is not set
+DEFAULT_POINTS_FILE = os.path.join(os.path.dirname(__file__), "control_points.json")
+
+
+def _to_xy(lat: float, lng: float, ref_lat: float) -> Tuple[float, float]:
+    """Project lat/lng to local planar meters (equirectangular)"""
+    x = math.radians(lng) * EARTH_RADIUS_M * math.cos(math.radians(ref_lat))
+    y = math.radians(lat) * EARTH_RADIUS_M
+    return x, y
+
+
+def _project_on_segment(
+    p: Tuple[float, float],
+    a: Tuple[float, float],
+    b: Tuple[float, float],
+) -> Tuple[float, float]:
+    """Return (fraction along segment, distance in meters) of p's projection onto a-b"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    px, py = a[0] + t * dx, a[1] + t * dy
+    return t, math.hypot(p[0] - px, p[1] - py)
+
+
+class ControlPointIndex:
+    """Spatial grid of intersections and traffic signals"""
+    
+    def __init__(self, cell_size_deg: float = 0.002):
+        """Initialize the index (default cell is roughly 200m)"""
+        self.cell_size_deg = cell_size_deg
+        self.cells: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+        self.size = 0
+    
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_size_deg)), int(math.floor(lng / self.cell_size_deg)))
+    
+    def add(self, point: Dict[str, Any]):
+        """Index a control point with point_id, type and location {lat, lng}"""
+        location = point["location"]
+        self.cells[self._cell(location["lat"], location["lng"])].append(point)
+        self.size += 1
+    
+    def load(self, points: List[Dict[str, Any]]):
+        """Replace the index contents"""
+        self.cells = defaultdict(list)
+        self.size = 0
+        for point in points:
+            self.add(point)
+        logger.info(f"Indexed {self.size} traffic control points")
+    
+    def load_file(self, path: str):
+        """Load control points from a JSON file"""
+        with open(path) as f:
+            self.load(json.load(f))
+    
+    def candidates_near_segment(
+        self,
+        lat1: float,
+        lng1: float,
+        lat2: float,
+        lng2: float,
+    ) -> List[Dict[str, Any]]:
+        """Control points in grid cells overlapping a segment's bounding box (plus one cell)"""
+        c1 = self._cell(min(lat1, lat2), min(lng1, lng2))
+        c2 = self._cell(max(lat1, lat2), max(lng1, lng2))
+        
+        points = []
+        for i in range(c1[0] - 1, c2[0] + 2):
+            for j in range(c1[1] - 1, c2[1] + 2):
+                points.extend(self.cells.get((i, j), ()))
+        return points
+
+
+class RouteClearancePlan:
+    """Timed control-point schedule for one ambulance route"""
+    
+    def __init__(
+        self,
+        case_id: str,
+        polyline: List[Dict[str, float]],
+        index: ControlPointIndex,
+        duration_seconds: Optional[float] = None,
+        match_radius_m: float = 30.0,
+        default_speed_mps: float = 11.0,
+    ):
+        self.case_id = case_id
+        self.polyline = polyline
+        self.match_radius_m = match_radius_m
+        
+        self.ref_lat = polyline[0]["lat"] if polyline else 0.0
+        self.xy = [_to_xy(p["lat"], p["lng"], self.ref_lat) for p in polyline]
+        
+        # Cumulative along-route distance at each vertex
+        self.cumulative_m = [0.0]
+        for a, b in zip(self.xy, self.xy[1:]):
+            self.cumulative_m.append(self.cumulative_m[-1] + math.hypot(b[0] - a[0], b[1] - a[1]))
+        self.length_m = self.cumulative_m[-1]
+        
+        if duration_seconds and self.length_m > 0:
+            self.speed_mps = self.length_m / duration_seconds
+        else:
+            self.speed_mps = default_speed_mps
+        
+        self.progress_m = 0.0
+        self.segment_index = 0
+        self.position_at = datetime.utcnow()
+        
+        self.control_points = self._match_control_points(index)
+        self._point_offsets = [p["distance_m"] for p in self.control_points]
+    
+    def _match_control_points(self, index: ControlPointIndex) -> List[Dict[str, Any]]:
+        """Match indexed control points against route segments"""
+        matched: Dict[str, Dict[str, Any]] = {}
+        
+        for i in range(len(self.polyline) - 1):
+            a, b = self.polyline[i], self.polyline[i + 1]
+            for point in index.candidates_near_segment(a["lat"], a["lng"], b["lat"], b["lng"]):
+                location = point["location"]
+                p = _to_xy(location["lat"], location["lng"], self.ref_lat)
+                t, distance = _project_on_segment(p, self.xy[i], self.xy[i + 1])
+                if distance > self.match_radius_m:
+                    continue
+                
+                along = self.cumulative_m[i] + t * (self.cumulative_m[i + 1] - self.cumulative_m[i])
+                existing = matched.get(point["point_id"])
+                # A point near several segments keeps its first (earliest) crossing
+                if existing is None or along < existing["distance_m"]:
+                    matched[point["point_id"]] = {
+                        "point_id": point["point_id"],
+                        "type": point.get("type", "intersection"),
+                        "location": location,
+                        "distance_m": along,
+                    }
+        
+        return sorted(matched.values(), key=lambda p: p["distance_m"])
+    
+    def schedule(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Upcoming control points with predicted arrival times"""
+        now = now or datetime.utcnow()
+        start = bisect.bisect_left(self._point_offsets, self.progress_m)
+        
+        schedule = []
+        for point in self.control_points[start:]:
+            eta_seconds = (point["distance_m"] - self.progress_m) / self.speed_mps
+            schedule.append({
+                **point,
+                "distance_m": round(point["distance_m"] - self.progress_m, 1),
+                "eta_seconds": round(eta_seconds, 1),
+                "eta_at": (now + timedelta(seconds=eta_seconds)).isoformat(),
+            })
+        return schedule
+    
+    def update_position(
+        self,
+        lat: float,
+        lng: float,
+        timestamp: Optional[datetime] = None,
+        window: int = 25,
+    ) -> List[Dict[str, Any]]:
+        """Advance along the route from a GPS ping and return the refreshed schedule"""
+        timestamp = timestamp or datetime.utcnow()
+        p = _to_xy(lat, lng, self.ref_lat)
+        
+        # Only search segments just ahead of the last known position
+        best = None
+        end = min(len(self.xy) - 1, self.segment_index + window)
+        for i in range(self.segment_index, end):
+            t, distance = _project_on_segment(p, self.xy[i], self.xy[i + 1])
+            if best is None or distance < best[1]:
+                best = (i, distance, t)
+        
+        if best is not None:
+            i, _, t = best
+            progress = self.cumulative_m[i] + t * (self.cumulative_m[i + 1] - self.cumulative_m[i])
+            elapsed = (timestamp - self.position_at).total_seconds()
+            if progress > self.progress_m and elapsed >= 1.0:
+                # Blend observed speed into the estimate to absorb traffic changes
+                observed = min((progress - self.progress_m) / elapsed, MAX_SPEED_MPS)
+                self.speed_mps = 0.7 * self.speed_mps + 0.3 * observed
+            self.progress_m = max(self.progress_m, progress)
+            self.segment_index = i
+        
+        self.position_at = timestamp
+        return self.schedule(timestamp)
+
+
+def load_default_index() -> ControlPointIndex:
+    """Build the control point index from TRAFFIC_CONTROL_POINTS_FILE, or the bundled points"""
+    index = ControlPointIndex()
+    path = os.getenv("TRAFFIC_CONTROL_POINTS_FILE") or DEFAULT_POINTS_FILE
+    try:
+        index.load_file(path)
+    except Exception as e:
+        logger.error(f"Failed to load traffic control points from {path}: {e}")
+    if not index.size:
+        logger.warning("No traffic control points indexed; clearance requests will match nothing")
+    return index
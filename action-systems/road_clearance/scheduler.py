@@ -0,0 +1,147 @@
+"""
+Green-wave signal pre-emption scheduler
+Issues clearance requests just ahead of each ambulance's arrival
+"""
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional, Set
+from loguru import logger
+import asyncio
+import heapq
+import itertools
+import time
+
+
+SendRequest = Callable[[Dict[str, Any], str, str], Awaitable[bool]]
+
+
+class GreenWaveScheduler:
+    """Priority-queue scheduler for time-staggered clearance requests"""
+    
+    def __init__(self, send_request: SendRequest, lead_seconds: float = 30.0):
+        """Initialize the scheduler"""
+        self.send_request = send_request
+        self.lead_seconds = lead_seconds
+        
+        # Heap of (fire_at, seq, case_id, point_id); superseded entries are
+        # skipped when popped, so rescheduling is a single O(log n) push
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        self._live: Dict[Tuple[str, str], int] = {}
+        self._payloads: Dict[Tuple[str, str], Tuple[Dict[str, Any], str]] = {}
+        # case_id -> point IDs in _live, so per-case work never scans other cases
+        self._by_case: Dict[str, Set[str]] = {}
+        self._sent: Dict[str, Set[str]] = {}
+        
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Strong references to in-flight sends; the loop only keeps weak ones
+        self._fires: Set[asyncio.Task] = set()
+    
+    def schedule(
+        self,
+        case_id: str,
+        schedule: List[Dict[str, Any]],
+        priority: str = "high",
+    ) -> List[str]:
+        """(Re)schedule clearance requests for a case from its ETA schedule"""
+        self._ensure_running()
+        now = time.monotonic()
+        sent = self._sent.setdefault(case_id, set())
+        
+        upcoming = set()
+        earliest = None
+        for point in schedule:
+            point_id = point["point_id"]
+            if point_id in sent:
+                continue
+            upcoming.add(point_id)
+            
+            fire_at = now + max(0.0, point["eta_seconds"] - self.lead_seconds)
+            seq = next(self._seq)
+            key = (case_id, point_id)
+            self._live[key] = seq
+            self._payloads[key] = (point, priority)
+            self._by_case.setdefault(case_id, set()).add(point_id)
+            heapq.heappush(self._heap, (fire_at, seq, case_id, point_id))
+            earliest = fire_at if earliest is None else min(earliest, fire_at)
+        
+        # Points no longer ahead of the ambulance are dropped
+        for point_id in self._by_case.get(case_id, set()) - upcoming:
+            self._discard((case_id, point_id))
+        
+        # Rebuild once superseded entries dominate the heap
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2:]) == entry[1]]
+            heapq.heapify(self._heap)
+        
+        if earliest is not None:
+            self._wakeup.set()
+        
+        return sorted(upcoming)
+    
+    def cancel(self, case_id: str):
+        """Cancel all pending requests for a case"""
+        for point_id in list(self._by_case.get(case_id, ())):
+            self._discard((case_id, point_id))
+        self._sent.pop(case_id, None)
+    
+    def pending(self, case_id: str) -> List[str]:
+        """Point IDs still waiting to be sent for a case"""
+        return sorted(self._by_case.get(case_id, ()))
+    
+    async def stop(self):
+        """Stop the scheduler loop and any in-flight sends"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in self._fires:
+            task.cancel()
+        await asyncio.gather(*self._fires, return_exceptions=True)
+        self._fires.clear()
+    
+    def _discard(self, key: Tuple[str, str]):
+        self._live.pop(key, None)
+        self._payloads.pop(key, None)
+        case_id, point_id = key
+        points = self._by_case.get(case_id)
+        if points is not None:
+            points.discard(point_id)
+            if not points:
+                del self._by_case[case_id]
+    
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        """Fire due requests, sleeping until the next one or a reschedule"""
+        while True:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, case_id, point_id = heapq.heappop(self._heap)
+                key = (case_id, point_id)
+                if self._live.get(key) != seq:
+                    continue
+                point, priority = self._payloads[key]
+                self._discard(key)
+                self._sent.setdefault(case_id, set()).add(point_id)
+                task = asyncio.create_task(self._fire(point, case_id, priority))
+                self._fires.add(task)
+                task.add_done_callback(self._fires.discard)
+            
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _fire(self, point: Dict[str, Any], case_id: str, priority: str):
+        """Send a single clearance request"""
+        try:
+            await self.send_request(point, case_id, priority)
+        except Exception as e:
+            logger.error(f"Error sending clearance request for point {point.get('point_id')}: {e}")
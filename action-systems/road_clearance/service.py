@@ -2,18 +2,38 @@
 Road Clearance System
 Traffic control requests
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import time
+from googlemaps.convert import decode_polyline
 from loguru import logger
 import httpx
 
+from road_clearance.control_points import (
+    ControlPointIndex,
+    RouteClearancePlan,
+    load_default_index,
+)
+from road_clearance.scheduler import GreenWaveScheduler
+
 
 class RoadClearanceService:
     """Service for road clearance requests"""
     
-    def __init__(self):
+    def __init__(self, control_points: Optional[ControlPointIndex] = None):
         """Initialize the service"""
         self.backend_url = "http://localhost:8000"
         self.communication_agent_url = "http://localhost:8001"
+        self.control_points = control_points or load_default_index()
+        self.plans: Dict[str, RouteClearancePlan] = {}
+        self.priorities: Dict[str, str] = {}
+        self.scheduler = GreenWaveScheduler(self._send_clearance_request)
+        
+        # Plans for cases that stop sending pings (closed, unit offline) are dropped after this
+        self.plan_idle_seconds = 1800.0
+        self.purge_interval_seconds = 60.0
+        self.last_activity: Dict[str, float] = {}
+        self._last_purge = time.monotonic()
     
     async def request_clearance(
         self,
@@ -23,42 +43,138 @@ class RoadClearanceService:
     ) -> Dict[str, Any]:
         """Request road clearance for emergency route"""
         logger.info(f"Requesting road clearance for case {case_id}")
+        self._touch(case_id)
         
         # Get route details
         origin = route.get("origin", {})
         destination = route.get("destination", {})
         
         # Identify traffic control points
-        control_points = await self._identify_control_points(route)
+        control_points = await self._identify_control_points(case_id, route)
         
-        # Send clearance requests
-        requests_sent = []
-        for point in control_points:
-            sent = await self._send_clearance_request(point, case_id, priority)
-            if sent:
-                requests_sent.append(point.get("point_id"))
+        # Stagger clearance requests so each fires just ahead of arrival
+        self.priorities[case_id] = priority
+        requests_scheduled = self.scheduler.schedule(case_id, control_points, priority)
         
         # Auto-call traffic control if critical
         if priority == "critical":
             await self._initiate_auto_call(case_id, route)
         
         return {
-            "success": len(requests_sent) > 0,
+            "success": len(requests_scheduled) > 0,
             "case_id": case_id,
             "control_points": len(control_points),
-            "requests_sent": requests_sent,
+            "requests_scheduled": requests_scheduled,
+            "schedule": control_points,
         }
     
-    async def _identify_control_points(self, route: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify traffic control points along route"""
-        # In real implementation, analyze route for intersections, traffic lights, etc.
-        return [
-            {
-                "point_id": "POINT-1",
-                "location": {"lat": 28.6139, "lng": 77.2090},
-                "type": "intersection",
+    async def update_position(
+        self,
+        case_id: str,
+        lat: float,
+        lng: float,
+        timestamp: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Advance a case's clearance schedule from an ambulance GPS ping"""
+        plan = self.plans.get(case_id)
+        if not plan:
+            self._purge_idle_plans()
+            return {
+                "success": False,
+                "error": "No clearance plan for case",
             }
-        ]
+        self._touch(case_id)
+        
+        schedule = plan.update_position(lat, lng, timestamp)
+        if schedule:
+            # Shift pending requests to the new ETAs
+            self.scheduler.schedule(case_id, schedule, self.priorities.get(case_id, "high"))
+        else:
+            # Route completed; drop the plan
+            self.cancel_clearance(case_id)
+        
+        return {
+            "success": True,
+            "case_id": case_id,
+            "schedule": schedule,
+            "pending_requests": self.scheduler.pending(case_id),
+        }
+    
+    def cancel_clearance(self, case_id: str):
+        """Drop a case's plan and any clearance requests not yet sent"""
+        self.plans.pop(case_id, None)
+        self.priorities.pop(case_id, None)
+        self.last_activity.pop(case_id, None)
+        self.scheduler.cancel(case_id)
+    
+    def _touch(self, case_id: str):
+        """Record activity for a case, purging plans that went idle"""
+        self.last_activity[case_id] = time.monotonic()
+        self._purge_idle_plans()
+    
+    def _purge_idle_plans(self, now: Optional[float] = None):
+        """Drop plans with no request or ping within the idle TTL"""
+        now = time.monotonic() if now is None else now
+        # Throttled so the scan costs one pass per interval, not one per ping
+        if now - self._last_purge < self.purge_interval_seconds:
+            return
+        self._last_purge = now
+        
+        cutoff = now - self.plan_idle_seconds
+        idle = [case_id for case_id, seen in self.last_activity.items() if seen < cutoff]
+        for case_id in idle:
+            self.cancel_clearance(case_id)
+        if idle:
+            logger.info(f"Dropped {len(idle)} idle road clearance plans")
+    
+    async def _identify_control_points(
+        self,
+        case_id: str,
+        route: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Identify traffic control points along route, with predicted arrival times"""
+        polyline = self._extract_polyline(route)
+        if len(polyline) < 2:
+            return []
+        
+        plan = RouteClearancePlan(
+            case_id,
+            polyline,
+            self.control_points,
+            duration_seconds=self._extract_duration(route),
+        )
+        self.plans[case_id] = plan
+        return plan.schedule()
+    
+    def _extract_polyline(self, route: Dict[str, Any]) -> List[Dict[str, float]]:
+        """Get route geometry from an encoded polyline, a Directions route, or endpoints"""
+        encoded = route.get("polyline") or route.get("overview_polyline", {}).get("points")
+        if not encoded and isinstance(route.get("route"), dict):
+            encoded = route["route"].get("overview_polyline", {}).get("points")
+        if encoded:
+            return decode_polyline(encoded)
+        
+        if route.get("points"):
+            return route["points"]
+        
+        origin = route.get("origin", {})
+        destination = route.get("destination", {})
+        if origin.get("lat") is not None and destination.get("lat") is not None:
+            return [
+                {"lat": origin["lat"], "lng": origin["lng"]},
+                {"lat": destination["lat"], "lng": destination["lng"]},
+            ]
+        return []
+    
+    def _extract_duration(self, route: Dict[str, Any]) -> Optional[float]:
+        """Get planned route duration in seconds, if known"""
+        if route.get("eta_minutes"):
+            return route["eta_minutes"] * 60
+        directions = route.get("route") if isinstance(route.get("route"), dict) else route
+        legs = directions.get("legs") or []
+        if legs:
+            return sum(leg["duration"]["value"] for leg in legs)
+        return None
     
     async def _send_clearance_request(
         self,
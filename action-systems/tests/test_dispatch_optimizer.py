@@ -0,0 +1,147 @@
+"""
+Tests for the global dispatch optimizer
+"""
+import numpy as np
+import pytest
+
+from dispatch_optimizer.service import DispatchOptimizerService
+
+
+class FakeDispatch:
+    """Dispatch service that always succeeds and records calls"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def dispatch_ambulance(self, ambulance_id, case_id, **kwargs):
+        self.calls.append((case_id, ambulance_id))
+        return {"success": True, "ambulance_id": ambulance_id, "case_id": case_id}
+
+
+def optimizer_with_stale_backend(persisted: bool) -> DispatchOptimizerService:
+    """Optimizer whose backend keeps listing the same case and ambulance as free"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    
+    async def get_all(path, params, key):
+        return {
+            "cases": [{"case_id": "CASE-1", "severity_level": "high", "location_lat": 28.61, "location_lng": 77.20}],
+            "ambulances": [{"ambulance_id": "AMB-1", "current_lat": 28.62, "current_lng": 77.21}],
+            "hospitals": [],
+        }[key]
+    
+    async def record_dispatch(assignment):
+        return persisted
+    
+    optimizer._get_all = get_all
+    optimizer._record_dispatch = record_dispatch
+    return optimizer
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_rounds_do_not_redispatch():
+    """An assignment the backend hasn't caught up with is not dispatched twice"""
+    optimizer = optimizer_with_stale_backend(persisted=False)
+    
+    first = await optimizer.run_round()
+    second = await optimizer.run_round()
+    
+    assert [(a["case_id"], a["ambulance_id"]) for a in first["assignments"]] == [("CASE-1", "AMB-1")]
+    assert second["assignments"] == []
+    assert optimizer.dispatch_service.calls == [("CASE-1", "AMB-1")]
+
+
+@pytest.mark.asyncio
+async def test_holds_expire():
+    """A hold that never shows up in the backend lapses, so the pair can be retried"""
+    optimizer = optimizer_with_stale_backend(persisted=False)
+    optimizer.assignment_hold_seconds = 0
+    
+    await optimizer.run_round()
+    optimizer._held_cases = {key: held_at - 1 for key, held_at in optimizer._held_cases.items()}
+    optimizer._held_ambulances = {key: held_at - 1 for key, held_at in optimizer._held_ambulances.items()}
+    await optimizer.run_round()
+    
+    assert len(optimizer.dispatch_service.calls) == 2
+
+
+# Points on the equator; 0.01 degrees of longitude is about 1.1 km
+def case(case_id, lng, severity="medium"):
+    return {"case_id": case_id, "severity_level": severity, "location_lat": 0.0, "location_lng": lng}
+
+
+def ambulance(ambulance_id, lng):
+    return {"ambulance_id": ambulance_id, "current_lat": 0.0, "current_lng": lng}
+
+
+def hospital(hospital_id, lng, beds=0, icu=0):
+    return {
+        "hospital_id": hospital_id,
+        "location_lat": 0.0,
+        "location_lng": lng,
+        "available_beds": beds,
+        "icu_available": icu,
+    }
+
+
+def pairs(assignments):
+    return sorted((a["case_id"], a["ambulance_id"]) for a in assignments)
+
+
+def test_optimize_finds_the_global_optimum():
+    """Greedy nearest-first would send AMB-1 to CASE-A (total 13 units); the optimum totals 5"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    cases = [case("CASE-A", 0.00), case("CASE-B", 0.06)]
+    ambulances = [ambulance("AMB-1", 0.04), ambulance("AMB-2", -0.03)]
+    
+    assert pairs(optimizer.optimize(cases, ambulances, [])) == [("CASE-A", "AMB-2"), ("CASE-B", "AMB-1")]
+
+
+def test_optimize_never_returns_infeasible_pairs():
+    """A case beyond the ETA horizon stays unassigned even with a spare ambulance"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    cases = [case("NEAR", 0.00), case("FAR", 5.00)]
+    ambulances = [ambulance("AMB-1", 0.01), ambulance("AMB-2", 0.02)]
+    
+    assignments = optimizer.optimize(cases, ambulances, [])
+    assert [a["case_id"] for a in assignments] == ["NEAR"]
+    assert all(a["eta_minutes"] <= optimizer.max_eta_minutes for a in assignments)
+    assert optimizer.optimize([case("FAR", 5.00)], ambulances, []) == []
+
+
+def test_optimize_weights_by_severity():
+    """With one ambulance, a further critical case outranks a nearer low one"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    cases = [case("LOW", 0.02, "low"), case("CRITICAL", -0.10, "critical")]
+    
+    assert pairs(optimizer.optimize(cases, [ambulance("AMB-1", 0.0)], [])) == [("CRITICAL", "AMB-1")]
+    
+    # Equal severities fall back to plain distance
+    cases = [case("NEAR", 0.02, "low"), case("FAR", -0.10, "low")]
+    assert pairs(optimizer.optimize(cases, [ambulance("AMB-1", 0.0)], [])) == [("NEAR", "AMB-1")]
+
+
+def test_critical_cases_get_icu_slots():
+    """Critical cases go to ICU capacity even when a general bed is closer"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    cases = [case("CRITICAL", 0.0, "critical"), case("MEDIUM", 0.0, "medium")]
+    hospitals = [hospital("BEDS-ONLY", 0.01, beds=1), hospital("ICU", 0.05, icu=1)]
+    ambulances = [ambulance("AMB-1", 0.0), ambulance("AMB-2", 0.0)]
+    
+    by_case = {a["case_id"]: a["hospital_id"] for a in optimizer.optimize(cases, ambulances, hospitals)}
+    assert by_case == {"CRITICAL": "ICU", "MEDIUM": "BEDS-ONLY"}
+
+
+def test_hospital_capacity_is_respected():
+    """No hospital takes more cases than it has slots; critical cases never take general beds"""
+    optimizer = DispatchOptimizerService(FakeDispatch())
+    cases = [case("CRITICAL", 0.0, "critical"), case("M1", 0.0), case("M2", 0.0)]
+    lat = np.zeros(3)
+    lng = np.zeros(3)
+    
+    hospital_ids = optimizer._assign_hospitals(cases, lat, lng, [hospital("H1", 0.01, beds=1)])
+    assert hospital_ids[0] is None
+    assert sorted(hospital_ids[1:], key=str) == ["H1", None]
+    
+    # An ICU bed still takes a non-critical case when no general bed is left
+    hospital_ids = optimizer._assign_hospitals(cases[1:2], lat[:1], lng[:1], [hospital("H2", 0.01, icu=1)])
+    assert hospital_ids == ["H2"]
@@ -0,0 +1,52 @@
+"""
+Tests for the green-wave clearance scheduler
+"""
+import asyncio
+
+import pytest
+
+from road_clearance.scheduler import GreenWaveScheduler
+
+
+def eta_schedule(*etas):
+    return [{"point_id": f"P{i}", "eta_seconds": eta} for i, eta in enumerate(etas)]
+
+
+@pytest.mark.asyncio
+async def test_reschedule_and_cancel_touch_only_their_case():
+    """Dropped and cancelled points are tracked per case"""
+    scheduler = GreenWaveScheduler(send_request=None, lead_seconds=0)
+    scheduler.schedule("CASE-1", eta_schedule(600, 900, 1200))
+    scheduler.schedule("CASE-2", eta_schedule(600, 900))
+    
+    # The ambulance passed P0, so it is no longer ahead
+    scheduler.schedule("CASE-1", eta_schedule(600, 900, 1200)[1:])
+    assert scheduler.pending("CASE-1") == ["P1", "P2"]
+    
+    scheduler.cancel("CASE-2")
+    assert scheduler.pending("CASE-2") == []
+    assert scheduler.pending("CASE-1") == ["P1", "P2"]
+    assert scheduler._by_case.keys() == {"CASE-1"}
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_due_points_are_sent_once():
+    """Points inside the lead time fire, and the send task is awaited on stop"""
+    sent = []
+    
+    async def send_request(point, case_id, priority):
+        sent.append((case_id, point["point_id"]))
+        return True
+    
+    scheduler = GreenWaveScheduler(send_request=send_request, lead_seconds=30)
+    scheduler.schedule("CASE-1", eta_schedule(10, 900))
+    await asyncio.sleep(0.05)
+    
+    assert sent == [("CASE-1", "P0")]
+    assert scheduler.pending("CASE-1") == ["P1"]
+    # Rescheduling never re-sends a point already cleared
+    scheduler.schedule("CASE-1", eta_schedule(5, 800))
+    await asyncio.sleep(0.05)
+    assert sent == [("CASE-1", "P0")]
+    await scheduler.stop()
@@ -0,0 +1,33 @@
+"""
+Tests for police alert fan-out
+"""
+import pytest
+
+from police_alert.service import PoliceAlertService
+
+
+@pytest.mark.asyncio
+async def test_only_notified_officers_are_logged():
+    """Officers whose notification failed stay available"""
+    service = PoliceAlertService()
+    logged = []
+    
+    async def get_available_officers(severity, num_officers, location=None):
+        return [{"officer_id": "OFF-1"}, {"officer_id": "OFF-2"}, {"officer_id": "OFF-3"}]
+    
+    async def notify_officer(officer, case_id, severity):
+        if officer["officer_id"] == "OFF-2":
+            raise ConnectionError("SMS gateway down")
+        return True
+    
+    async def log_alert_action(case_id, officers, severity):
+        logged.extend(officer["officer_id"] for officer in officers)
+    
+    service._get_available_officers = get_available_officers
+    service._notify_officer = notify_officer
+    service._log_alert_action = log_alert_action
+    
+    result = await service.send_alert("CASE-1", "high")
+    
+    assert result["officers_notified"] == ["OFF-1", "OFF-3"]
+    assert logged == ["OFF-1", "OFF-3"]
@@ -0,0 +1,81 @@
+"""
+Tests for road clearance plans and position updates
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from road_clearance.service import RoadClearanceService
+
+
+def test_position_without_coordinates_is_rejected():
+    """A ping missing lat/lng is a 422, not a 500 from the plan"""
+    client = TestClient(main.app)
+    response = client.post("/road-clearance/position", json={"case_id": "CASE-1", "lat": 28.6})
+    assert response.status_code == 422
+    
+    response = client.post("/road-clearance/position", json={"case_id": "CASE-1", "lat": 28.6, "lng": 77.2})
+    assert response.status_code == 200
+    assert response.json()["success"] is False
+
+
+
+def test_position_with_zoned_timestamp():
+    """A "Z" timestamp is normalised to naive UTC instead of failing against the plan's clock"""
+    client = TestClient(main.app)
+    main.road_clearance_service.control_points.add(
+        {"point_id": "TZ-1", "type": "signal", "location": {"lat": 28.64, "lng": 77.24}}
+    )
+    route = {"points": [{"lat": 28.60, "lng": 77.20}, {"lat": 28.65, "lng": 77.25}], "eta_minutes": 10}
+    client.post("/road-clearance/request", json={"case_id": "CASE-TZ", "route": route})
+    
+    response = client.post(
+        "/road-clearance/position",
+        json={"case_id": "CASE-TZ", "lat": 28.61, "lng": 77.21, "timestamp": "2026-10-19T12:00:00Z"},
+    )
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert main.road_clearance_service.plans["CASE-TZ"].position_at == datetime(2026, 10, 19, 12, 0)
+    
+    position = main.RoadClearancePosition(case_id="C", lat=0, lng=0, timestamp="2026-10-19T17:30:00+05:30")
+    assert position.timestamp == datetime(2026, 10, 19, 12, 0)
+    main.road_clearance_service.cancel_clearance("CASE-TZ")
+
+@pytest.mark.asyncio
+async def test_idle_plans_are_purged():
+    """Plans with no pings within the idle TTL are dropped with their requests"""
+    service = RoadClearanceService()
+    route = {"points": [{"lat": 28.60, "lng": 77.20}, {"lat": 28.65, "lng": 77.25}], "eta_minutes": 10}
+    await service.request_clearance("CASE-1", route)
+    await service.request_clearance("CASE-2", route)
+    assert service.plans.keys() == {"CASE-1", "CASE-2"}
+    
+    now = service.last_activity["CASE-2"]
+    service.last_activity["CASE-1"] = now - service.plan_idle_seconds - 1
+    service._purge_idle_plans(now + service.purge_interval_seconds)
+    
+    assert service.plans.keys() == {"CASE-2"}
+    assert service.last_activity.keys() == {"CASE-2"}
+    assert service.scheduler.pending("CASE-1") == []
+    
+    service.cancel_clearance("CASE-2")
+    assert not service.plans and not service.last_activity
+    await service.scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_default_points_cover_central_routes(monkeypatch):
+    """Without TRAFFIC_CONTROL_POINTS_FILE the bundled points are indexed and matched"""
+    monkeypatch.delenv("TRAFFIC_CONTROL_POINTS_FILE", raising=False)
+    service = RoadClearanceService()
+    assert service.control_points.size > 0
+    
+    # Through the original hard-coded intersection
+    route = {"points": [{"lat": 28.6100, "lng": 77.2090}, {"lat": 28.6200, "lng": 77.2090}], "eta_minutes": 5}
+    result = await service.request_clearance("CASE-1", route)
+    assert result["success"] is True
+    assert result["requests_scheduled"] == ["POINT-1"]
+    service.cancel_clearance("CASE-1")
+    await service.scheduler.stop()
@@ -1,55 +1,175 @@
 """
 Case Resolution Metrics
 """
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+import numpy as np
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 from loguru import logger
 
+from analytics_engine.tdigest import TDigest
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def resolution_minutes_pipeline(match: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Project each case to its status and resolution time, computed by MongoDB"""
+    pipeline = [{"$match": match}] if match else []
+    pipeline.append({"$project": {
+        "_id": 0,
+        "resolved": {"$eq": ["$status", "resolved"]},
+        "minutes": {"$cond": [
+            {"$and": [{"$eq": ["$status", "resolved"]}, {"$gt": ["$resolved_at", None]}]},
+            {"$divide": [{"$subtract": ["$resolved_at", "$created_at"]}, 60000]},
+            None,
+        ]},
+    }})
+    return pipeline
+
+
+class ResolutionStats:
+    """Streaming counts, mean and percentiles; partial results merge"""
+    
+    def __init__(self, compression: float = 200.0):
+        self.total_cases = 0
+        self.resolved_cases = 0
+        self.timed_cases = 0
+        self.mean = 0.0
+        self.digest = TDigest(compression)
+    
+    def update(self, total: int, resolved: int, minutes: np.ndarray):
+        """Fold in a batch: case counts plus the resolution times it contained"""
+        self.total_cases += total
+        self.resolved_cases += resolved
+        minutes = minutes[~np.isnan(minutes)]
+        if len(minutes):
+            self._combine_mean(len(minutes), float(minutes.mean()))
+            self.digest.update(minutes)
+    
+    def merge(self, other: "ResolutionStats") -> "ResolutionStats":
+        """Combine with stats from another shard or time range"""
+        self.total_cases += other.total_cases
+        self.resolved_cases += other.resolved_cases
+        if other.timed_cases:
+            self._combine_mean(other.timed_cases, other.mean)
+            self.digest.merge(other.digest)
+        return self
+    
+    def _combine_mean(self, count: int, mean: float):
+        """Running mean update without keeping a sum that can grow unbounded"""
+        self.timed_cases += count
+        self.mean += (mean - self.mean) * count / self.timed_cases
+    
+    def result(self) -> Dict[str, Any]:
+        """Metrics in the calculate_metrics shape, with percentiles"""
+        resolution_rate = (self.resolved_cases / self.total_cases * 100) if self.total_cases else 0.0
+        metrics = {
+            "total_cases": self.total_cases,
+            "resolved_cases": self.resolved_cases,
+            "resolution_rate": round(resolution_rate, 2),
+            "avg_resolution_time": round(self.mean, 2),
+        }
+        for percentile in PERCENTILES:
+            value = self.digest.quantile(percentile / 100)
+            metrics[f"p{percentile}_resolution_time"] = round(value, 2) if value is not None else 0.0
+        return metrics
+
 
 class CaseResolutionMetrics:
     """Metrics for case resolution"""
     
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+    
     def calculate_metrics(self, cases: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate resolution metrics"""
-        if not cases:
-            return {
-                "total_cases": 0,
-                "resolved_cases": 0,
-                "resolution_rate": 0.0,
-                "avg_resolution_time": 0.0,
-            }
+        """Calculate resolution metrics for cases already in memory"""
+        minutes = []
+        resolved = 0
+        for case in cases:
+            if case.get("status") != "resolved":
+                continue
+            resolved += 1
+            value = self._resolution_minutes(case)
+            if value is not None:
+                minutes.append(value)
         
-        total = len(cases)
-        resolved = sum(1 for c in cases if c.get("status") == "resolved")
-        resolution_rate = (resolved / total * 100) if total > 0 else 0.0
+        stats = ResolutionStats()
+        stats.update(len(cases), resolved, np.array(minutes, dtype=np.float64))
+        return stats.result()
+    
+    def _resolution_minutes(self, case: Dict[str, Any]) -> Optional[float]:
+        """Minutes from creation to resolution, or None if either time is missing or malformed"""
+        created, resolved = case.get("created_at"), case.get("resolved_at")
+        if not created or not resolved:
+            return None
+        try:
+            if isinstance(created, str):
+                created = datetime.fromisoformat(created)
+            if isinstance(resolved, str):
+                resolved = datetime.fromisoformat(resolved)
+            return (resolved - created).total_seconds() / 60
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping case {case.get('case_id')} with bad timestamps: {e}")
+            return None
+    
+    async def accumulate(
+        self,
+        collection,
+        match: Optional[Dict[str, Any]] = None,
+        stats: Optional[ResolutionStats] = None,
+    ) -> ResolutionStats:
+        """Stream cases from an async Mongo collection in batches; memory stays constant"""
+        stats = stats or ResolutionStats()
+        cursor = collection.aggregate(resolution_minutes_pipeline(match), batchSize=self.batch_size)
         
-        # Calculate average resolution time
-        resolution_times = []
-        for case in cases:
-            if case.get("status") == "resolved" and case.get("resolved_at"):
-                created = case.get("created_at")
-                resolved = case.get("resolved_at")
-                if created and resolved:
-                    try:
-                        if isinstance(created, str):
-                            created = datetime.fromisoformat(created)
-                        if isinstance(resolved, str):
-                            resolved = datetime.fromisoformat(resolved)
-                        delta = resolved - created
-                        resolution_times.append(delta.total_seconds() / 60)  # minutes
-                    except:
-                        pass
+        total = resolved = 0
+        minutes = np.empty(self.batch_size, dtype=np.float64)
+        filled = 0
+        async for row in cursor:
+            total += 1
+            if row["resolved"]:
+                resolved += 1
+            if row["minutes"] is not None:
+                minutes[filled] = row["minutes"]
+                filled += 1
+            if total == self.batch_size:
+                stats.update(total, resolved, minutes[:filled])
+                total = resolved = filled = 0
         
-        avg_resolution_time = (
-            sum(resolution_times) / len(resolution_times)
-            if resolution_times
-            else 0.0
-        )
+        stats.update(total, resolved, minutes[:filled])
+        return stats
+    
+    async def stream_metrics(self, collection, match: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Calculate resolution metrics over a collection without loading it"""
+        stats = await self.accumulate(collection, match)
+        return stats.result()
+    
+    async def server_metrics(self, collection, match: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Calculate resolution metrics entirely in MongoDB (7.0+ for $percentile)"""
+        pipeline = resolution_minutes_pipeline(match)
+        pipeline.append({"$group": {
+            "_id": None,
+            "total_cases": {"$sum": 1},
+            "resolved_cases": {"$sum": {"$cond": ["$resolved", 1, 0]}},
+            "avg_resolution_time": {"$avg": "$minutes"},
+            "percentiles": {"$percentile": {
+                "input": "$minutes",
+                "p": [percentile / 100 for percentile in PERCENTILES],
+                "method": "approximate",
+            }},
+        }})
+        result = await collection.aggregate(pipeline).to_list(length=1)
+        if not result:
+            return ResolutionStats().result()
         
-        return {
+        row = result[0]
+        total = row["total_cases"]
+        metrics = {
             "total_cases": total,
-            "resolved_cases": resolved,
-            "resolution_rate": round(resolution_rate, 2),
-            "avg_resolution_time": round(avg_resolution_time, 2),
+            "resolved_cases": row["resolved_cases"],
+            "resolution_rate": round(row["resolved_cases"] / total * 100, 2) if total else 0.0,
+            "avg_resolution_time": round(row["avg_resolution_time"] or 0.0, 2),
         }
-
+        for percentile, value in zip(PERCENTILES, row["percentiles"]):
+            metrics[f"p{percentile}_resolution_time"] = round(value, 2) if value is not None else 0.0
+        return metrics
@@ -1,51 +1,179 @@
 """
-Graph Analytics using NetworkX
+Graph Analytics for incident networks
 """
 import networkx as nx
-from typing import Dict, Any, List
+import numpy as np
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from loguru import logger
 
 
 class GraphAnalytics:
-    """Graph analytics for incident networks"""
+    """Incident graph kept incrementally: interned IDs, union-find components, CSR adjacency on demand"""
     
     def __init__(self):
         """Initialize graph analytics"""
-        self.graph = nx.Graph()
+        self.clear()
     
-    def build_incident_graph(self, incidents: List[Dict[str, Any]]):
-        """Build graph from incidents"""
-        self.graph.clear()
-        
+    def clear(self):
+        """Drop all nodes and edges"""
+        # incident_id <-> dense int node index
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        # Union-find over node indices
+        self.parent = array("l")
+        self.size = array("l")
+        self.components = 0
+        # Undirected edges packed as (low << 32) | high; deduplicated when the CSR is built
+        self._edges = array("q")
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    
+    def _node(self, incident_id: str) -> int:
+        """Index for an incident, adding it as a singleton component if new"""
+        node = self.index.get(incident_id)
+        if node is None:
+            node = len(self.ids)
+            self.index[incident_id] = node
+            self.ids.append(incident_id)
+            self.parent.append(node)
+            self.size.append(1)
+            self.components += 1
+            # The cached CSR is sized to the old node count
+            self._csr = None
+        return node
+    
+    def _find(self, node: int) -> int:
+        """Component root, halving the path as it goes"""
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+    
+    def _union(self, a: int, b: int):
+        """Merge two components, attaching the smaller under the larger"""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.components -= 1
+    
+    def add_incident(self, incident: Dict[str, Any]):
+        """Add one incident and its related_incidents links; only IDs are kept"""
+        node = self._node(incident.get("incident_id"))
+        for related_id in incident.get("related_incidents", []):
+            other = self._node(related_id)
+            if other == node:
+                continue
+            self._union(node, other)
+            low, high = (node, other) if node < other else (other, node)
+            self._edges.append((low << 32) | high)
+            self._csr = None
+    
+    def add_incidents(self, incidents: Iterable[Dict[str, Any]]):
+        """Add incidents as they arrive, without rebuilding"""
         for incident in incidents:
-            incident_id = incident.get("incident_id")
-            self.graph.add_node(incident_id, **incident)
-            
-            # Add edges based on relationships
-            related = incident.get("related_incidents", [])
-            for related_id in related:
-                self.graph.add_edge(incident_id, related_id)
-        
-        logger.info(f"Built graph with {self.graph.number_of_nodes()} nodes")
+            self.add_incident(incident)
+    
+    def build_incident_graph(self, incidents: Iterable[Dict[str, Any]]):
+        """Build graph from incidents, replacing any previous graph"""
+        self.clear()
+        self.add_incidents(incidents)
+        logger.info(f"Built graph with {len(self.ids)} nodes")
+    
+    def _adjacency(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR (indptr, neighbors) for the current edges, cached until the next change"""
+        if self._csr is None:
+            packed = np.unique(np.frombuffer(self._edges, dtype=np.int64))
+            # Compacting the edge log keeps duplicates from accumulating
+            self._edges = array("q", packed.tobytes())
+            low, high = packed >> 32, packed & 0xFFFFFFFF
+            sources = np.concatenate([low, high])
+            targets = np.concatenate([high, low])
+            order = np.argsort(sources, kind="stable")
+            indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=len(self.ids)), out=indptr[1:])
+            self._csr = (indptr, targets[order])
+        return self._csr
     
-    def analyze_network(self) -> Dict[str, Any]:
+    def number_of_edges(self) -> int:
+        """Distinct undirected edges"""
+        indptr, _ = self._adjacency()
+        return int(indptr[-1]) // 2
+    
+    def component_of(self, incident_id: str) -> List[str]:
+        """IDs of every incident connected to incident_id"""
+        node = self.index.get(incident_id)
+        if node is None:
+            return []
+        root = self._find(node)
+        return [self.ids[other] for other in range(len(self.ids)) if self._find(other) == root]
+    
+    def connected(self, first_id: str, second_id: str) -> bool:
+        """Whether two incidents are in the same component"""
+        if first_id not in self.index or second_id not in self.index:
+            return False
+        return self._find(self.index[first_id]) == self._find(self.index[second_id])
+    
+    def clusters(self, top_n: int = 10, min_size: int = 2) -> List[List[str]]:
+        """Largest connected components as ID lists"""
+        roots = np.fromiter((self._find(node) for node in range(len(self.ids))), dtype=np.int64, count=len(self.ids))
+        sizes = np.bincount(roots, minlength=len(self.ids))
+        largest = [root for root in np.argsort(-sizes, kind="stable")[:top_n] if sizes[root] >= min_size]
+        members = {int(root): [] for root in largest}
+        for node in np.flatnonzero(np.isin(roots, largest)):
+            members[int(roots[node])].append(self.ids[node])
+        return [members[int(root)] for root in largest]
+    
+    def analyze_network(self, top_n: int = 10) -> Dict[str, Any]:
         """Analyze network structure"""
-        if self.graph.number_of_nodes() == 0:
+        nodes = len(self.ids)
+        if nodes == 0:
             return {}
         
+        edges = self.number_of_edges()
         return {
-            "nodes": self.graph.number_of_nodes(),
-            "edges": self.graph.number_of_edges(),
-            "density": nx.density(self.graph),
-            "clusters": list(nx.connected_components(self.graph)),
+            "nodes": nodes,
+            "edges": edges,
+            "density": 2 * edges / (nodes * (nodes - 1)) if nodes > 1 else 0.0,
+            "components": self.components,
+            "clusters": self.clusters(top_n),
         }
     
     def find_central_nodes(self, top_n: int = 10) -> List[str]:
-        """Find most central nodes"""
-        if self.graph.number_of_nodes() == 0:
+        """Find most central nodes (degree centrality)"""
+        if not self.ids:
             return []
         
-        centrality = nx.degree_centrality(self.graph)
-        sorted_nodes = sorted(centrality.items(), key=lambda x: x[1], reverse=True)
-        return [node for node, _ in sorted_nodes[:top_n]]
-
+        indptr, _ = self._adjacency()
+        degrees = np.diff(indptr)
+        top_n = min(top_n, len(degrees))
+        top = np.argpartition(-degrees, top_n - 1)[:top_n]
+        top = top[np.argsort(-degrees[top], kind="stable")]
+        return [self.ids[node] for node in top]
+    
+    def communities(
+        self,
+        resolution: float = 1.0,
+        seed: Optional[int] = None,
+        min_size: int = 2,
+    ) -> List[List[str]]:
+        """Louvain communities, computed on demand from the integer edge list"""
+        indptr, neighbors = self._adjacency()
+        if not len(neighbors):
+            return []
+        
+        # Each edge appears once per endpoint in the CSR; keep the low -> high copy
+        sources = np.repeat(np.arange(len(self.ids)), np.diff(indptr))
+        forward = sources < neighbors
+        graph = nx.Graph()
+        graph.add_edges_from(zip(sources[forward].tolist(), neighbors[forward].tolist()))
+        found = nx.community.louvain_communities(graph, resolution=resolution, seed=seed)
+        return sorted(
+            ([self.ids[node] for node in community] for community in found if len(community) >= min_size),
+            key=len,
+            reverse=True,
+        )
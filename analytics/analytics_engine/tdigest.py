@@ -0,0 +1,110 @@
+"""
+Mergeable t-digest for streaming percentiles
+"""
+import numpy as np
+from typing import Dict, Any, Optional
+
+
+class TDigest:
+    """Approximate quantiles in bounded memory; digests of disjoint data merge exactly like the data would"""
+    
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer_means = []
+        self._buffer_weights = []
+        self._buffered = 0
+        # Values are buffered and folded in bulk so updates stay vectorized
+        self._buffer_limit = int(compression * 20)
+    
+    @property
+    def count(self) -> float:
+        """Total weight added"""
+        return float(self.weights.sum()) + sum(float(w.sum()) for w in self._buffer_weights)
+    
+    def update(self, values: np.ndarray, weights: Optional[np.ndarray] = None):
+        """Add a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        if weights is None:
+            weights = np.ones(len(values), dtype=np.float64)
+        self._buffer_means.append(values)
+        self._buffer_weights.append(np.asarray(weights, dtype=np.float64))
+        self._buffered += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= self._buffer_limit:
+            self._compress()
+    
+    def add(self, value: float, weight: float = 1.0):
+        """Add one value"""
+        self.update(np.array([value]), np.array([weight]))
+    
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest's centroids into this one"""
+        other._compress()
+        if len(other.means):
+            self.update(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+    
+    def _compress(self):
+        """Merge buffered values and centroids so each centroid spans at most one k-unit"""
+        if not self._buffered:
+            return
+        means = np.concatenate([self.means, *self._buffer_means])
+        weights = np.concatenate([self.weights, *self._buffer_weights])
+        self._buffer_means, self._buffer_weights, self._buffered = [], [], 0
+        
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        
+        # k1 scale function: small centroids at the tails, large ones in the middle
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        _, groups = np.unique(np.floor(k), return_inverse=True)
+        
+        self.weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=means * weights) / self.weights
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile q (0..1)"""
+        self._compress()
+        if not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form, for shipping partial results between workers"""
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min if len(self.means) else None,
+            "max": self.max if len(self.means) else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        """Rebuild a digest from to_dict output"""
+        digest = cls(data["compression"])
+        digest.means = np.asarray(data["means"], dtype=np.float64)
+        digest.weights = np.asarray(data["weights"], dtype=np.float64)
+        if len(digest.means):
+            digest.min, digest.max = data["min"], data["max"]
+        return digest
@@ -1,12 +1,171 @@
 """
 Trend Analysis Engine
 """
-import pandas as pd
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+import numpy as np
+from scipy import stats
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 
 
+# Relative change over the window below which a significant slope is still "stable"
+STABLE_THRESHOLD = 5.0
+
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+
+def naive_utc(time: datetime) -> datetime:
+    """Naive UTC datetime; zoned datetimes are converted, naive ones are taken as UTC"""
+    if time.tzinfo is None:
+        return time
+    return time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_arrays(data: List[Dict[str, Any]], metric: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Timestamps (datetime64[s], UTC) and float values for rows that have the metric"""
+    rows = [
+        (row.get("date") or row.get("bucket_start"), row[metric])
+        for row in data
+        if row.get(metric) is not None
+    ]
+    if not rows:
+        return np.array([], dtype="datetime64[s]"), np.array([], dtype=np.float64)
+    
+    times, values = zip(*rows)
+    if isinstance(times[0], str):
+        # ISO strings may carry an offset ("Z", "+05:30"), which numpy parses only with a deprecation warning
+        times = [datetime.fromisoformat(time) for time in times]
+    # Integer seconds convert an order of magnitude faster than datetime objects
+    stamps = np.fromiter(
+        ((naive_utc(time) - EPOCH) // ONE_SECOND for time in times),
+        dtype=np.int64,
+        count=len(times),
+    ).astype("datetime64[s]")
+    return stamps, np.fromiter(values, dtype=np.float64, count=len(values))
+
+
+def resample(
+    times: np.ndarray,
+    values: np.ndarray,
+    start: datetime,
+    end: datetime,
+    step: timedelta,
+    how: str = "sum",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket values onto a fixed grid; empty buckets are 0 for sums and NaN for means"""
+    origin = np.datetime64(naive_utc(start), "s")
+    step_s = np.timedelta64(int(step.total_seconds()), "s")
+    size = max(int(np.ceil((np.datetime64(naive_utc(end), "s") - origin) / step_s)), 0)
+    grid = origin + np.arange(size) * step_s
+    
+    index = ((times - origin) // step_s).astype(np.int64)
+    inside = (index >= 0) & (index < size)
+    index, values = index[inside], values[inside]
+    
+    sums = np.bincount(index, weights=values, minlength=size)
+    if how == "sum":
+        return grid, sums
+    counts = np.bincount(index, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return grid, np.where(counts > 0, sums / counts, np.nan)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over up to window buckets, ignoring NaN gaps"""
+    if window < 1:
+        raise ValueError(f"window must be at least 1, got {window}")
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.where(present, values, 0.0))
+    counts = np.cumsum(present)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def linear_trend(values: np.ndarray, confidence: float = 0.95) -> Dict[str, float]:
+    """Least-squares slope per bucket with a confidence interval"""
+    x = np.flatnonzero(~np.isnan(values)).astype(np.float64)
+    y = values[~np.isnan(values)]
+    n = len(y)
+    if n < 3:
+        return {"slope": 0.0, "intercept": float(y.mean()) if n else 0.0, "slope_low": 0.0,
+                "slope_high": 0.0, "p_value": 1.0, "r_squared": 0.0}
+    
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = np.sum((x - x_mean) ** 2)
+    slope = np.sum((x - x_mean) * (y - y_mean)) / sxx
+    intercept = y_mean - slope * x_mean
+    residuals = y - (intercept + slope * x)
+    ss_res = np.sum(residuals ** 2)
+    ss_tot = np.sum((y - y_mean) ** 2)
+    
+    stderr = np.sqrt(ss_res / (n - 2) / sxx)
+    margin = stats.t.ppf(0.5 + confidence / 2, n - 2) * stderr
+    if stderr > 0:
+        p_value = 2 * stats.t.sf(abs(slope / stderr), n - 2)
+    else:
+        p_value = 0.0 if slope != 0 else 1.0
+    
+    return {
+        "slope": float(slope),
+        "intercept": float(intercept),
+        "slope_low": float(slope - margin),
+        "slope_high": float(slope + margin),
+        "p_value": float(p_value),
+        "r_squared": float(1 - ss_res / ss_tot) if ss_tot > 0 else 0.0,
+    }
+
+
+def seasonal_anomalies(
+    grid: np.ndarray,
+    values: np.ndarray,
+    step: timedelta,
+    threshold: float = 3.0,
+    min_samples: int = 3,
+) -> List[Dict[str, Any]]:
+    """Buckets far from their day-of-week (and hour-of-day, for sub-daily steps) baseline"""
+    seconds = grid.astype("datetime64[s]").astype(np.int64)
+    # 1970-01-01 was a Thursday; shift so Monday is 0
+    day_of_week = (seconds // 86400 + 3) % 7
+    if step < timedelta(days=1):
+        slot = day_of_week * 24 + (seconds % 86400) // 3600
+        slots = 7 * 24
+    else:
+        slot, slots = day_of_week, 7
+    
+    present = ~np.isnan(values)
+    slot_p, values_p = slot[present], values[present]
+    counts = np.bincount(slot_p, minlength=slots)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(slot_p, weights=values_p, minlength=slots) / counts
+        variance = np.bincount(slot_p, weights=values_p ** 2, minlength=slots) / counts - mean ** 2
+        std = np.sqrt(np.maximum(variance, 0.0))
+        z_scores = (values - mean[slot]) / std[slot]
+    
+    flagged = present & (counts[slot] >= min_samples) & (std[slot] > 0) & (np.abs(z_scores) > threshold)
+    return [
+        {
+            "date": grid[i].astype(datetime),
+            "value": float(values[i]),
+            "expected": round(float(mean[slot[i]]), 2),
+            "z_score": round(float(z_scores[i]), 2),
+        }
+        for i in np.flatnonzero(flagged)
+    ]
+
+
+def default_step(start_date: datetime, end_date: datetime) -> timedelta:
+    """Bucket size matching the rollup granularity used for the range"""
+    span = end_date - start_date
+    if span <= timedelta(hours=6):
+        return timedelta(minutes=1)
+    if span <= timedelta(days=14):
+        return timedelta(hours=1)
+    return timedelta(days=1)
+
+
 class TrendAnalysisEngine:
     """Engine for trend analysis"""
     
@@ -16,57 +175,63 @@ class TrendAnalysisEngine:
         metric: str,
         start_date: datetime,
         end_date: datetime,
+        step: Optional[timedelta] = None,
+        how: str = "sum",
+        window: int = 24,
     ) -> Dict[str, Any]:
-        """Analyze trends for a metric"""
+        """Analyze trends for a metric over rollup rows; bad input raises ValueError instead of reading as stable"""
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        step = step or default_step(start_date, end_date)
         try:
-            df = pd.DataFrame(data)
-            
-            if df.empty:
-                return {
-                    "trend": "stable",
-                    "change_percentage": 0.0,
-                    "data_points": [],
-                }
-            
-            # Convert dates
-            if "date" in df.columns:
-                df["date"] = pd.to_datetime(df["date"])
-                df = df.sort_values("date")
-            
-            # Calculate trend
-            if len(df) > 1:
-                first_value = df[metric].iloc[0]
-                last_value = df[metric].iloc[-1]
-                
-                if first_value > 0:
-                    change_percentage = ((last_value - first_value) / first_value) * 100
-                else:
-                    change_percentage = 0.0
-                
-                if change_percentage > 5:
-                    trend = "increasing"
-                elif change_percentage < -5:
-                    trend = "decreasing"
-                else:
-                    trend = "stable"
-            else:
-                trend = "stable"
-                change_percentage = 0.0
-            
-            # Prepare data points
-            data_points = df.to_dict("records")
-            
-            return {
-                "trend": trend,
-                "change_percentage": round(change_percentage, 2),
-                "data_points": data_points,
-            }
-            
-        except Exception as e:
-            logger.error(f"Error analyzing trends: {e}")
+            times, values = to_arrays(data, metric)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error reading {metric} for trend analysis: {e}")
+            raise ValueError(f"Unreadable {metric} rows: {e}") from e
+        if not len(values):
             return {
                 "trend": "stable",
                 "change_percentage": 0.0,
                 "data_points": [],
+                "anomalies": [],
             }
-
+        
+        grid, series = resample(times, values, start_date, end_date, step, how=how)
+        smoothed = rolling_mean(series, window)
+        fit = linear_trend(series)
+        
+        # Change across the window along the fitted line, not between two noisy points
+        fitted_start = fit["intercept"]
+        fitted_end = fit["intercept"] + fit["slope"] * (len(series) - 1)
+        baseline = fitted_start if fitted_start > 0 else np.nanmean(series)
+        change_percentage = ((fitted_end - fitted_start) / baseline) * 100 if baseline > 0 else 0.0
+        
+        significant = fit["slope_low"] > 0 or fit["slope_high"] < 0
+        if significant and change_percentage > STABLE_THRESHOLD:
+            trend = "increasing"
+        elif significant and change_percentage < -STABLE_THRESHOLD:
+            trend = "decreasing"
+        else:
+            trend = "stable"
+        
+        # Convert whole arrays at once; per-element numpy scalar access dominates otherwise
+        data_points = [
+            {
+                "date": date,
+                metric: None if value != value else value,
+                "rolling_mean": None if mean != mean else mean,
+            }
+            for date, value, mean in zip(
+                grid.astype(datetime).tolist(),
+                series.tolist(),
+                np.round(smoothed, 4).tolist(),
+            )
+        ]
+        
+        return {
+            "trend": trend,
+            "change_percentage": round(float(change_percentage), 2),
+            "regression": fit,
+            "data_points": data_points,
+            "anomalies": seasonal_anomalies(grid, series, step),
+        }
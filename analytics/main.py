@@ -0,0 +1,53 @@
+"""
+Analytics Service - FastAPI application
+"""
+from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from tagwise_db.connection import TagwiseDatabase
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan events"""
+    # Startup
+    await tagwise_db.ensure_indexes()
+    yield
+    # Shutdown
+    tagwise_db.client.close()
+
+
+app = FastAPI(
+    title="Shivay Analytics Service",
+    description="Tagged incident analytics",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Initialize services
+tagwise_db = TagwiseDatabase()
+
+
+@app.get("/")
+async def root():
+    """Root endpoint"""
+    return {
+        "service": "Shivay Analytics",
+        "status": "operational",
+    }
+
+
+@app.get("/tags/{tag}/counts")
+async def count_tag_values(
+    tag: str,
+    status: Optional[str] = Query(None, description="Only incidents with this status tag"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Incident counts per value of a tag"""
+    filters = {"tags.status": status} if status else None
+    try:
+        counts = await tagwise_db.count_by_tag(tag, filters=filters, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tag": tag, "counts": counts}
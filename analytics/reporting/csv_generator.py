@@ -2,35 +2,66 @@
 CSV Report Generator
 """
 import csv
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
 from loguru import logger
 
+from shared.csv_stream import Rows, iter_csv
+
 
 class CSVReportGenerator:
     """Generate CSV reports"""
     
+    def __init__(self, chunk_size: int = 64 * 1024):
+        self.chunk_size = chunk_size
+    
     def generate_report(
         self,
         data: List[Dict[str, Any]],
         output_path: str,
+        columns: Optional[List[str]] = None,
     ) -> bool:
-        """Generate CSV report"""
+        """Generate CSV report from rows already in memory"""
         try:
             if not data:
                 return False
             
-            # Get all keys from first item
-            fieldnames = list(data[0].keys())
+            fieldnames = columns or list(data[0].keys())
             
             with open(output_path, "w", newline="") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction="ignore")
                 writer.writeheader()
                 writer.writerows(data)
             
             logger.info(f"CSV report generated: {output_path}")
             return True
-            
-        except Exception as e:
+        
+        except (OSError, csv.Error) as e:
             logger.error(f"Error generating CSV report: {e}")
             return False
-
+    
+    def stream_report(
+        self,
+        rows: Rows,
+        columns: Optional[List[str]] = None,
+        compress: bool = False,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[bytes]:
+        """CSV chunks for rows from an async cursor or any iterable"""
+        return iter_csv(rows, columns, compress=compress, chunk_size=self.chunk_size, stats=stats)
+    
+    async def write_report(
+        self,
+        rows: Rows,
+        output_path: str,
+        columns: Optional[List[str]] = None,
+        compress: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Stream rows to a file (gzip when the path ends in .gz); returns write stats"""
+        if compress is None:
+            compress = output_path.endswith(".gz")
+        stats: Dict[str, Any] = {}
+        with open(output_path, "wb", buffering=self.chunk_size) as output:
+            async for chunk in self.stream_report(rows, columns, compress=compress, stats=stats):
+                output.write(chunk)
+        logger.info(f"CSV report generated: {output_path}")
+        return stats
@@ -3,8 +3,33 @@ Tagwise Database Connection
 Stores tagged incident data for analytics
 """
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from datetime import datetime
 from loguru import logger
+import asyncio
 import os
+import time
+
+
+# Tags most analytics filter on; each gets a (tag, tagged_at) index for range scans
+COMMON_TAGS = ("emergency_type", "severity_level", "status", "zone")
+
+
+def tag_field(tag: str) -> str:
+    """Dotted path for a tag key, rejecting keys that would change the query"""
+    if not tag or tag.startswith("$") or "." in tag:
+        raise ValueError(f"Invalid tag name: {tag!r}")
+    return f"tags.{tag}"
+
+
+def tag_update(tags: dict, now: datetime) -> Dict[str, Any]:
+    """Upsert replacing tags; tagged_at is only set when the incident is first stored"""
+    return {
+        "$set": {"tags": tags, "retagged_at": now},
+        "$setOnInsert": {"tagged_at": now},
+    }
 
 
 class TagwiseDatabase:
@@ -29,30 +54,212 @@ class TagwiseDatabase:
         except Exception as e:
             logger.error(f"Failed to connect to Tagwise database: {e}")
     
+    async def ensure_indexes(self):
+        """Create indexes for incident lookups and tag filters
+        
+        Existing duplicate incident_ids don't block startup: the unique index
+        is skipped with an error log and lookups fall back to a plain index.
+        """
+        await self.ensure_incident_id_index()
+        await self.db.incidents.create_indexes([
+            IndexModel([("tagged_at", ASCENDING)]),
+            # Wildcard index serves equality/range filters on any tag key
+            IndexModel([("tags.$**", ASCENDING)]),
+            *[
+                IndexModel([(tag_field(tag), ASCENDING), ("tagged_at", ASCENDING)])
+                for tag in COMMON_TAGS
+            ],
+        ])
+        logger.info("Tagwise indexes ensured")
+    
+    async def ensure_incident_id_index(self) -> bool:
+        """Create the unique incident_id index; returns False if duplicates prevent it"""
+        try:
+            await self.db.incidents.create_index([("incident_id", ASCENDING)], unique=True)
+            return True
+        except OperationFailure as e:
+            failure = e
+        
+        duplicates = await self.db.incidents.aggregate([
+            {"$group": {"_id": "$incident_id", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$count": "incident_ids"},
+        ]).to_list(length=1)
+        if not duplicates:
+            # Duplicates were cleaned up since a plain fallback index was built; upgrade it
+            try:
+                await self.db.incidents.drop_index("incident_id_1")
+                await self.db.incidents.create_index([("incident_id", ASCENDING)], unique=True)
+                return True
+            except OperationFailure as e:
+                failure = e
+        
+        logger.error(
+            f"Unique incident_id index not created ({failure.code}): "
+            f"{duplicates[0]['incident_ids'] if duplicates else 0} incident_ids are duplicated. "
+            "Remove the duplicates and restart to enforce uniqueness"
+        )
+        
+        # Without uniqueness, a plain index still serves lookups and upserts
+        try:
+            await self.db.incidents.create_index([("incident_id", ASCENDING)])
+        except OperationFailure as e:
+            logger.error(f"Error creating incident_id index: {e}")
+        return False
+    
     async def tag_incident(
         self,
         incident_id: str,
         tags: dict,
     ):
-        """Tag an incident"""
+        """Tag an incident
+        
+        Replaces the tags; tagged_at is kept from the first tagging and
+        retagged_at records the latest write.
+        """
         try:
             await self.db.incidents.update_one(
                 {"incident_id": incident_id},
-                {"$set": {"tags": tags, "incident_id": incident_id}},
+                tag_update(tags, datetime.utcnow()),
                 upsert=True,
             )
             logger.info(f"Tagged incident: {incident_id}")
         except Exception as e:
             logger.error(f"Error tagging incident: {e}")
     
-    async def get_tagged_incidents(self, filters: dict = None):
-        """Get tagged incidents"""
+    async def tag_incidents_bulk(
+        self,
+        incidents: Union[Iterable[Tuple[str, dict]], AsyncIterable[Tuple[str, dict]]],
+        batch_size: int = 1000,
+        max_concurrency: int = 4,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Upsert (incident_id, tags) pairs in unordered bulk_write batches
+        
+        A batch that fails outright (network error, timeout) counts every
+        incident in it as an error. Existing incidents keep their tagged_at,
+        so a taxonomy retag over the archive leaves the time axis of the
+        (tag, tagged_at) indexes intact; retagged_at gets the run's start.
+        """
+        stats = {"processed": 0, "upserted": 0, "modified": 0, "errors": 0, "failed_batches": 0}
+        started = time.perf_counter()
+        slots = asyncio.Semaphore(max_concurrency)
+        # Kept until the end so no batch's outcome (or exception) is dropped
+        tasks: List[asyncio.Task] = []
+        
+        def report():
+            elapsed = time.perf_counter() - started
+            progress = {**stats, "elapsed_seconds": round(elapsed, 2),
+                        "per_second": round(stats["processed"] / elapsed, 1) if elapsed else 0.0}
+            if on_progress:
+                on_progress(progress)
+            return progress
+        
+        async def write(batch: List[UpdateOne]):
+            try:
+                # Unordered: one bad document doesn't stop the rest of the batch
+                result = await self.db.incidents.bulk_write(batch, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                stats["errors"] += len(details.get("writeErrors", []))
+                logger.warning(f"Bulk tagging batch had {len(details.get('writeErrors', []))} errors")
+            except PyMongoError as e:
+                details = {}
+                stats["errors"] += len(batch)
+                stats["failed_batches"] += 1
+                logger.error(f"Bulk tagging batch of {len(batch)} failed: {e}")
+            finally:
+                slots.release()
+            stats["processed"] += len(batch)
+            stats["upserted"] += details.get("nUpserted", 0)
+            stats["modified"] += details.get("nModified", 0)
+            report()
+        
+        async def submit(batch: List[UpdateOne]):
+            # Bounded concurrency: wait for a slot before reading further input
+            await slots.acquire()
+            tasks.append(asyncio.create_task(write(batch)))
+        
+        async def pairs():
+            if hasattr(incidents, "__aiter__"):
+                async for pair in incidents:
+                    yield pair
+            else:
+                for pair in incidents:
+                    yield pair
+        
+        now = datetime.utcnow()
+        batch = []
+        async for incident_id, tags in pairs():
+            batch.append(UpdateOne(
+                {"incident_id": incident_id},
+                tag_update(tags, now),
+                upsert=True,
+            ))
+            if len(batch) >= batch_size:
+                await submit(batch)
+                batch = []
+        if batch:
+            await submit(batch)
+        if tasks:
+            await asyncio.gather(*tasks)
+        
+        progress = report()
+        logger.info(
+            f"Bulk tagged {progress['processed']} incidents in {progress['elapsed_seconds']}s "
+            f"({progress['per_second']}/s, {progress['errors']} errors)"
+        )
+        return progress
+    
+    async def iter_tagged_incidents(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[tuple]] = None,
+        batch_size: int = 1000,
+        limit: int = 0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream tagged incidents; only one batch is held in memory at a time"""
+        cursor = self.db.incidents.find(
+            filters or {},
+            projection=projection,
+            sort=sort,
+            batch_size=batch_size,
+            limit=limit,
+        )
+        async for incident in cursor:
+            yield incident
+    
+    async def get_tagged_incidents(
+        self,
+        filters: dict = None,
+        projection: Optional[Dict[str, Any]] = None,
+        limit: int = 1000,
+    ):
+        """Get tagged incidents, at most limit of them (use iter_tagged_incidents for more)"""
         try:
-            query = filters or {}
-            cursor = self.db.incidents.find(query)
-            incidents = await cursor.to_list(length=None)
-            return incidents
+            return [
+                incident
+                async for incident in self.iter_tagged_incidents(filters, projection=projection, limit=limit)
+            ]
         except Exception as e:
             logger.error(f"Error getting tagged incidents: {e}")
             return []
-
+    
+    async def count_by_tag(
+        self,
+        tag: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Incident counts per value of a tag, most common first"""
+        field = tag_field(tag)
+        match = {**(filters or {}), field: {"$exists": True}}
+        rows = await self.db.incidents.aggregate([
+            {"$match": match},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": DESCENDING, "_id": ASCENDING}},
+            {"$limit": limit},
+        ]).to_list(length=limit)
+        return [{"value": row["_id"], "count": row["count"]} for row in rows]
@@ -0,0 +1,103 @@
+"""
+Retag the incident archive after a taxonomy change
+
+Run from analytics/: python -m tagwise_db.retag taxonomy.json [--batch-size 1000] [--concurrency 4] [--dry-run]
+
+The taxonomy file maps old tag keys and values to new ones:
+    {"rename": {"type": "emergency_type"},
+     "values": {"severity_level": {"sev1": "critical", "sev2": "high"}}}
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from loguru import logger
+
+from tagwise_db.connection import TagwiseDatabase
+
+
+def apply_taxonomy(tags: Dict[str, Any], taxonomy: Dict[str, Any]) -> Dict[str, Any]:
+    """Tags with keys renamed and values remapped"""
+    renames = taxonomy.get("rename", {})
+    values = taxonomy.get("values", {})
+    result = {}
+    for key, value in tags.items():
+        key = renames.get(key, key)
+        mapping = values.get(key, {})
+        result[key] = mapping.get(value, value) if isinstance(value, str) else value
+    return result
+
+
+async def retagged(
+    db: TagwiseDatabase,
+    taxonomy: Dict[str, Any],
+    batch_size: int,
+    counts: Dict[str, int],
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """(incident_id, new tags) for every incident whose tags change"""
+    async for incident in db.iter_tagged_incidents(
+        projection={"_id": 0, "incident_id": 1, "tags": 1},
+        sort=[("_id", 1)],
+        batch_size=batch_size,
+    ):
+        counts["scanned"] += 1
+        tags = incident.get("tags") or {}
+        new_tags = apply_taxonomy(tags, taxonomy)
+        if new_tags != tags:
+            counts["changed"] += 1
+            yield incident["incident_id"], new_tags
+
+
+async def run(args):
+    with open(args.taxonomy) as f:
+        taxonomy = json.load(f)
+    
+    db = TagwiseDatabase()
+    counts = {"scanned": 0, "changed": 0}
+    last_reported = [0]
+    
+    def progress(stats: Dict[str, Any]):
+        if stats["processed"] - last_reported[0] >= args.report_every:
+            last_reported[0] = stats["processed"]
+            logger.info(
+                f"Retagged {stats['processed']} of {counts['scanned']} scanned "
+                f"({stats['per_second']}/s, {stats['errors']} errors)"
+            )
+    
+    changes = retagged(db, taxonomy, args.batch_size, counts)
+    result = None
+    if args.dry_run:
+        async for _ in changes:
+            pass
+        logger.info(f"Dry run: {counts['changed']} of {counts['scanned']} incidents would be retagged")
+    else:
+        result = await db.tag_incidents_bulk(
+            changes,
+            batch_size=args.batch_size,
+            max_concurrency=args.concurrency,
+            on_progress=progress,
+        )
+        if result["errors"]:
+            logger.error(f"Retag incomplete: {counts['scanned']} scanned, {result}")
+        else:
+            logger.info(f"Retag complete: {counts['scanned']} scanned, {result}")
+    db.client.close()
+    return result
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Retag the incident archive after a taxonomy change")
+    parser.add_argument("taxonomy", help="JSON file with 'rename' and 'values' mappings")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--report-every", type=int, default=50000, help="Log progress every N incidents")
+    parser.add_argument("--dry-run", action="store_true", help="Count changes without writing")
+    result = asyncio.run(run(parser.parse_args(argv)))
+    if result and result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
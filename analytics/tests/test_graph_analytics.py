@@ -0,0 +1,93 @@
+"""
+Tests for the incremental incident graph
+"""
+import random
+
+import networkx as nx
+import numpy as np
+
+from analytics_engine.graph_analytics import GraphAnalytics
+
+
+def random_incidents(nodes=200, links=150, seed=3):
+    """Incidents with random related links, including duplicates and self-links"""
+    rng = random.Random(seed)
+    related = {f"INC-{i}": [] for i in range(nodes)}
+    for _ in range(links):
+        a, b = rng.randrange(nodes), rng.randrange(nodes)
+        related[f"INC-{a}"].append(f"INC-{b}")
+    related["INC-0"] += ["INC-1", "INC-1", "INC-0"]
+    return [{"incident_id": incident_id, "related_incidents": links} for incident_id, links in related.items()]
+
+
+def reference_graph(incidents):
+    graph = nx.Graph()
+    for incident in incidents:
+        graph.add_node(incident["incident_id"])
+        for related_id in incident["related_incidents"]:
+            if related_id != incident["incident_id"]:
+                graph.add_edge(incident["incident_id"], related_id)
+    return graph
+
+
+def test_union_find_components_match_networkx():
+    """Components, their count and connectivity agree with networkx"""
+    incidents = random_incidents()
+    graph = GraphAnalytics()
+    graph.build_incident_graph(incidents)
+    reference = reference_graph(incidents)
+    
+    expected = {frozenset(component) for component in nx.connected_components(reference)}
+    assert graph.components == len(expected)
+    assert {frozenset(graph.component_of(incident_id)) for incident_id in graph.ids} == expected
+    assert graph.connected("INC-0", "INC-1")
+    assert not graph.connected("INC-0", "MISSING")
+
+
+def test_csr_degrees_match_networkx():
+    """Duplicate links collapse and each edge counts once per endpoint"""
+    incidents = random_incidents()
+    graph = GraphAnalytics()
+    graph.build_incident_graph(incidents)
+    reference = reference_graph(incidents)
+    
+    indptr, neighbors = graph._adjacency()
+    degrees = dict(zip(graph.ids, np.diff(indptr).tolist()))
+    assert degrees == dict(reference.degree())
+    assert graph.number_of_edges() == reference.number_of_edges()
+    assert sorted(neighbors[indptr[0]:indptr[1]].tolist()) == sorted(
+        graph.index[other] for other in reference.neighbors("INC-0")
+    )
+
+
+def test_incremental_adds_after_a_query():
+    """Nodes added after the CSR was built, with or without links, are seen by later queries"""
+    graph = GraphAnalytics()
+    graph.add_incident({"incident_id": "a", "related_incidents": ["b"]})
+    graph.communities()
+    
+    graph.add_incident({"incident_id": "c"})
+    assert graph.communities(seed=1) == [["a", "b"]]
+    assert set(graph.find_central_nodes(top_n=3)) == {"a", "b", "c"}
+    assert graph.components == 2
+    
+    graph.add_incident({"incident_id": "d", "related_incidents": ["c"]})
+    assert graph.number_of_edges() == 2
+    assert sorted(map(sorted, graph.communities(seed=1))) == [["a", "b"], ["c", "d"]]
+
+
+def test_louvain_separates_two_cliques():
+    """Two 5-cliques joined by one bridge are found as two communities"""
+    incidents = []
+    for prefix in ("x", "y"):
+        members = [f"{prefix}{i}" for i in range(5)]
+        for i, member in enumerate(members):
+            incidents.append({"incident_id": member, "related_incidents": members[i + 1:]})
+    incidents.append({"incident_id": "x0", "related_incidents": ["y0"]})
+    
+    graph = GraphAnalytics()
+    graph.build_incident_graph(incidents)
+    
+    found = sorted(sorted(community) for community in graph.communities(seed=42))
+    assert found == [[f"x{i}" for i in range(5)], [f"y{i}" for i in range(5)]]
+    assert graph.analyze_network()["components"] == 1
@@ -0,0 +1,85 @@
+"""
+Tests for t-digest percentiles and case resolution metrics
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analytics_engine.case_resolution_metrics import CaseResolutionMetrics, ResolutionStats
+from analytics_engine.tdigest import TDigest
+
+
+@pytest.fixture
+def minutes():
+    """Skewed resolution times, like real incident data"""
+    return np.random.default_rng(7).lognormal(3, 0.8, 200_000)
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.99])
+def test_tdigest_quantiles_are_accurate(minutes, q):
+    """Quantiles stay within 0.5% of the exact value at the default compression"""
+    digest = TDigest()
+    for batch in np.array_split(minutes, 50):
+        digest.update(batch)
+    
+    exact = np.quantile(minutes, q)
+    assert digest.quantile(q) == pytest.approx(exact, rel=0.005)
+    assert len(digest.means) <= digest.compression
+
+
+def test_tdigest_merge_matches_concatenated_data(minutes):
+    """Merging shard digests gives the quantiles of one digest over all the data"""
+    shards = [TDigest() for _ in range(4)]
+    for shard, part in zip(shards, np.array_split(minutes, 4)):
+        shard.update(part)
+    whole = TDigest()
+    whole.update(minutes)
+    
+    merged = TDigest()
+    for shard in shards:
+        merged.merge(TDigest.from_dict(shard.to_dict()))
+    
+    assert merged.count == whole.count == len(minutes)
+    assert (merged.min, merged.max) == (minutes.min(), minutes.max())
+    for q in (0.01, 0.5, 0.9, 0.99):
+        assert merged.quantile(q) == pytest.approx(whole.quantile(q), rel=0.005)
+    assert TDigest().quantile(0.5) is None
+
+
+def test_resolution_stats_merge_matches_single_pass(minutes):
+    """Stats merged from shards equal stats accumulated in one pass"""
+    parts = np.array_split(minutes, 3)
+    shards = []
+    for part in parts:
+        stats = ResolutionStats()
+        stats.update(len(part) + 10, len(part), part)
+        shards.append(stats)
+    
+    single = ResolutionStats()
+    single.update(len(minutes) + 30, len(minutes), minutes)
+    merged = shards[0].merge(shards[1]).merge(shards[2]).merge(ResolutionStats())
+    
+    assert merged.total_cases == single.total_cases
+    assert merged.timed_cases == single.timed_cases == len(minutes)
+    assert merged.mean == pytest.approx(minutes.mean())
+    result, expected = merged.result(), single.result()
+    assert result["resolution_rate"] == expected["resolution_rate"]
+    assert result["p99_resolution_time"] == pytest.approx(expected["p99_resolution_time"], rel=0.005)
+
+
+def test_calculate_metrics_skips_bad_timestamps():
+    """Unresolved cases count toward the total; malformed times are not timed"""
+    created = datetime(2024, 1, 1)
+    cases = [
+        {"status": "resolved", "created_at": created, "resolved_at": created + timedelta(minutes=30)},
+        {"status": "resolved", "created_at": created.isoformat(), "resolved_at": (created + timedelta(minutes=60)).isoformat()},
+        {"status": "resolved", "created_at": "not a date", "resolved_at": created},
+        {"status": "pending", "created_at": created},
+    ]
+    metrics = CaseResolutionMetrics().calculate_metrics(cases)
+    
+    assert metrics["total_cases"] == 4
+    assert metrics["resolved_cases"] == 3
+    assert metrics["resolution_rate"] == 75.0
+    assert metrics["avg_resolution_time"] == 45.0
@@ -0,0 +1,119 @@
+"""
+Tests for the Tagwise incident store: bulk tagging and index setup
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from tagwise_db.connection import TagwiseDatabase
+
+
+class FlakyCollection:
+    """Collection whose bulk_write fails for chosen batches"""
+    
+    def __init__(self, failing_batches):
+        self.failing_batches = set(failing_batches)
+        self.calls = 0
+    
+    async def bulk_write(self, batch, ordered=True):
+        self.calls += 1
+        if self.calls in self.failing_batches:
+            raise AutoReconnect("connection reset")
+        return SimpleNamespace(bulk_api_result={"nUpserted": len(batch), "nModified": 0})
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_counted_as_errors():
+    """A batch lost to a network error shows up in errors, not as success"""
+    db = TagwiseDatabase()
+    db.db = SimpleNamespace(incidents=FlakyCollection(failing_batches=[2]))
+    incidents = ((f"INC-{i}", {"zone": "north"}) for i in range(20000))
+    
+    stats = await db.tag_incidents_bulk(incidents, batch_size=1000, max_concurrency=4)
+    
+    assert stats["processed"] == 20000
+    assert stats["upserted"] == 19000
+    assert stats["errors"] == 1000
+    assert stats["failed_batches"] == 1
+
+
+class IndexCollection:
+    """Collection whose unique index build fails while duplicates exist"""
+    
+    def __init__(self, duplicates):
+        self.duplicates = duplicates
+        self.indexes = {}
+    
+    async def create_index(self, keys, unique=False):
+        if unique and (self.duplicates or "incident_id_1" in self.indexes):
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+        self.indexes["incident_id_1"] = unique
+    
+    async def create_indexes(self, models):
+        for model in models:
+            self.indexes[model.document["name"]] = False
+    
+    async def drop_index(self, name):
+        del self.indexes[name]
+    
+    def aggregate(self, pipeline):
+        rows = [{"incident_ids": self.duplicates}] if self.duplicates else []
+        return SimpleNamespace(to_list=lambda length: asyncio.sleep(0, rows))
+
+
+@pytest.mark.asyncio
+async def test_duplicate_incident_ids_do_not_block_startup():
+    """Duplicates leave a plain incident_id index; once removed it becomes unique"""
+    db = TagwiseDatabase()
+    collection = IndexCollection(duplicates=3)
+    db.db = SimpleNamespace(incidents=collection)
+    
+    await db.ensure_indexes()
+    assert collection.indexes["incident_id_1"] is False
+    assert "tagged_at_1" in collection.indexes
+    
+    collection.duplicates = 0
+    assert await db.ensure_incident_id_index() is True
+    assert collection.indexes["incident_id_1"] is True
+
+
+class UpsertCollection:
+    """Collection applying $set/$setOnInsert upserts to an in-memory store"""
+    
+    def __init__(self):
+        self.docs = {}
+    
+    def apply(self, incident_id, update):
+        doc = self.docs.get(incident_id)
+        if doc is None:
+            doc = self.docs[incident_id] = {"incident_id": incident_id, **update.get("$setOnInsert", {})}
+        doc.update(update["$set"])
+    
+    async def update_one(self, query, update, upsert=False):
+        self.apply(query["incident_id"], update)
+    
+    async def bulk_write(self, batch, ordered=True):
+        for op in batch:
+            self.apply(op._filter["incident_id"], op._doc)
+        return SimpleNamespace(bulk_api_result={"nUpserted": 0, "nModified": len(batch)})
+
+
+@pytest.mark.asyncio
+async def test_retag_keeps_original_tagged_at():
+    """A retag replaces tags and sets retagged_at, but tagged_at keeps the first tagging time"""
+    db = TagwiseDatabase()
+    collection = UpsertCollection()
+    db.db = SimpleNamespace(incidents=collection)
+    
+    await db.tag_incident("INC-1", {"zone": "north"})
+    first = collection.docs["INC-1"]["tagged_at"]
+    await asyncio.sleep(0.01)
+    await db.tag_incidents_bulk([("INC-1", {"zone": "N"}), ("INC-2", {"zone": "S"})])
+    
+    retagged = collection.docs["INC-1"]
+    assert retagged["tags"] == {"zone": "N"}
+    assert retagged["tagged_at"] == first
+    assert retagged["retagged_at"] > first
+    assert collection.docs["INC-2"]["tagged_at"] == collection.docs["INC-2"]["retagged_at"]
@@ -0,0 +1,158 @@
+"""
+Tests for the trend analysis engine
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from analytics_engine.trend_analysis import (
+    TrendAnalysisEngine,
+    default_step,
+    linear_trend,
+    resample,
+    rolling_mean,
+    seasonal_anomalies,
+    to_arrays,
+)
+
+
+START = datetime(2024, 1, 1)
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def hourly_rows(values, metric="count"):
+    return [{"bucket_start": START + i * HOUR, metric: value} for i, value in enumerate(values)]
+
+
+def test_to_arrays_reads_datetimes_and_strings():
+    """Rollup rows and ISO date rows give the same timestamps; missing metrics are skipped"""
+    rows = [{"bucket_start": START, "count": 3}, {"bucket_start": START + HOUR, "count": None}]
+    times, values = to_arrays(rows, "count")
+    assert times.tolist() == [START]
+    assert values.tolist() == [3.0]
+    
+    times, _ = to_arrays([{"date": "2024-01-01T00:00:00", "count": 1}], "count")
+    assert times.tolist() == [START]
+
+
+def test_to_arrays_normalizes_zoned_times_to_utc():
+    """Zoned datetimes and offset ISO strings land on the same naive UTC timestamps"""
+    ist = timezone(timedelta(hours=5, minutes=30))
+    rows = [
+        {"bucket_start": START.replace(tzinfo=timezone.utc), "count": 1},
+        {"bucket_start": (START + HOUR).replace(tzinfo=timezone.utc).astimezone(ist), "count": 2},
+    ]
+    times, _ = to_arrays(rows, "count")
+    assert times.tolist() == [START, START + HOUR]
+    
+    iso_rows = [{"date": "2024-01-01T05:30:00+05:30", "count": 1}, {"date": "2024-01-01T01:00:00Z", "count": 1}]
+    times, _ = to_arrays(iso_rows, "count")
+    assert times.tolist() == [START, START + HOUR]
+    
+    start = START.replace(tzinfo=timezone.utc)
+    grid, sums = resample(times, np.ones(2), start, start + 2 * HOUR, HOUR)
+    assert grid.astype(datetime).tolist() == [START, START + HOUR]
+    assert sums.tolist() == [1.0, 1.0]
+
+
+def test_resample_fills_empty_buckets():
+    """Sums are zero-filled, means are NaN, and rows outside the range are dropped"""
+    times, values = to_arrays(
+        [
+            {"bucket_start": START, "count": 2},
+            {"bucket_start": START + timedelta(minutes=30), "count": 4},
+            {"bucket_start": START + 3 * HOUR, "count": 5},
+            {"bucket_start": START + 9 * HOUR, "count": 100},
+        ],
+        "count",
+    )
+    grid, sums = resample(times, values, START, START + 4 * HOUR, HOUR)
+    assert grid.astype(datetime).tolist() == [START + i * HOUR for i in range(4)]
+    assert sums.tolist() == [6.0, 0.0, 0.0, 5.0]
+    
+    _, means = resample(times, values, START, START + 4 * HOUR, HOUR, how="mean")
+    assert means[0] == 3.0 and means[3] == 5.0
+    assert np.isnan(means[1:3]).all()
+
+
+def test_rolling_mean_skips_gaps():
+    """The trailing window averages only the buckets that have values"""
+    smoothed = rolling_mean(np.array([1.0, np.nan, 3.0, 5.0, np.nan]), window=2)
+    assert smoothed.tolist() == [1.0, 1.0, 3.0, 4.0, 5.0]
+
+
+@pytest.mark.parametrize("window", [0, -1])
+def test_rolling_mean_rejects_empty_window(window):
+    with pytest.raises(ValueError):
+        rolling_mean(np.ones(3), window)
+
+
+def test_linear_trend_recovers_known_slope():
+    """A noisy line's slope falls inside the interval and is highly significant"""
+    rng = np.random.default_rng(42)
+    x = np.arange(200, dtype=np.float64)
+    fit = linear_trend(2.0 * x + 10.0 + rng.normal(0, 5, len(x)))
+    
+    assert fit["slope"] == pytest.approx(2.0, abs=0.05)
+    assert fit["slope_low"] < 2.0 < fit["slope_high"]
+    assert fit["p_value"] < 1e-10
+    assert fit["r_squared"] > 0.99
+
+
+def test_linear_trend_on_noise_is_not_significant():
+    """Pure noise has an interval spanning zero; NaN gaps are ignored"""
+    rng = np.random.default_rng(7)
+    values = rng.normal(50, 5, 200)
+    values[::10] = np.nan
+    fit = linear_trend(values)
+    
+    assert fit["slope_low"] < 0 < fit["slope_high"]
+    assert fit["p_value"] > 0.05
+    assert linear_trend(np.array([1.0, 2.0]))["p_value"] == 1.0
+
+
+def test_seasonal_anomalies_flag_only_the_outlier():
+    """A spike is judged against its own weekday, so the weekly cycle is not flagged"""
+    days = 20 * 7
+    grid = np.datetime64(START, "s") + np.arange(days) * np.timedelta64(86400, "s")
+    rng = np.random.default_rng(1)
+    # Weekends run at twice the weekday volume
+    values = np.where(np.arange(days) % 7 >= 5, 200.0, 100.0) + rng.normal(0, 2, days)
+    values[30] = 130.0
+    
+    anomalies = seasonal_anomalies(grid, values, DAY)
+    assert [anomaly["date"] for anomaly in anomalies] == [START + 30 * DAY]
+    assert anomalies[0]["z_score"] > 3
+
+
+def test_default_step_matches_rollup_granularity():
+    """Short ranges use minutes, up to two weeks hours, beyond that days"""
+    assert default_step(START, START + 6 * HOUR) == timedelta(minutes=1)
+    assert default_step(START, START + 14 * DAY) == HOUR
+    assert default_step(START, START + 30 * DAY) == DAY
+
+
+def test_analyze_trends_on_rollup_rows():
+    """A rising hourly series is increasing, and missing hours count as zero"""
+    values = [10 + i for i in range(48)]
+    rows = [row for i, row in enumerate(hourly_rows(values)) if i != 5]
+    result = TrendAnalysisEngine().analyze_trends(rows, "count", START, START + 48 * HOUR, step=HOUR)
+    
+    assert result["trend"] == "increasing"
+    assert result["change_percentage"] > 100
+    assert len(result["data_points"]) == 48
+    assert result["data_points"][5]["count"] == 0.0
+    
+    flat = TrendAnalysisEngine().analyze_trends(hourly_rows([10] * 48), "count", START, START + 48 * HOUR, step=HOUR)
+    assert flat["trend"] == "stable"
+
+
+def test_analyze_trends_reports_bad_input():
+    """Invalid windows and non-numeric values raise instead of reading as a stable trend"""
+    engine = TrendAnalysisEngine()
+    with pytest.raises(ValueError):
+        engine.analyze_trends(hourly_rows([1, 2, 3]), "count", START, START + 3 * HOUR, step=HOUR, window=0)
+    with pytest.raises(ValueError):
+        engine.analyze_trends(hourly_rows(["n/a", 2, 3]), "count", START, START + 3 * HOUR, step=HOUR)
@@ -11,7 +11,7 @@ from app.schemas.ambulance import (
     AmbulanceTrackingUpdate,
 )
 from app.services.ambulance_service import AmbulanceService
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_cursor
 
 router = APIRouter()
 
@@ -19,13 +19,19 @@ router = APIRouter()
 @router.get("/", response_model=AmbulanceListResponse)
 async def list_ambulances(
     status: Optional[str] = Query(None, description="Filter by status"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Depends(get_cursor),
     limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = Query(False, description="Include an estimated/cached total count"),
     current_user: dict = Depends(get_current_active_user),
 ):
     """List all ambulances"""
     service = AmbulanceService()
-    ambulances = await service.list_ambulances(status=status, skip=skip, limit=limit)
+    ambulances = await service.list_ambulances(
+        status=status,
+        cursor=cursor,
+        limit=limit,
+        include_total=include_total,
+    )
     return ambulances
 
 
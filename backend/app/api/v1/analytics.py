@@ -2,16 +2,22 @@
 Analytics API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional
 from datetime import datetime
+import os
 
+from app.models.report import ReportStatus
 from app.schemas.analytics import (
     DashboardDataResponse,
+    ReportJobResponse,
     ReportRequest,
+    ResolutionMetricsResponse,
     TrendAnalysisRequest,
     TrendAnalysisResponse,
 )
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_service import AnalyticsService, report_job_payload
+from app.services.report_service import report_service
 from app.core.dependencies import get_current_active_user
 
 router = APIRouter()
@@ -29,13 +35,40 @@ async def get_dashboard_data(
     return data
 
 
+@router.get("/resolution", response_model=ResolutionMetricsResponse)
+async def get_resolution_metrics(
+    start_date: Optional[datetime] = Query(None, description="Resolved on or after"),
+    end_date: Optional[datetime] = Query(None, description="Resolved before"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Get resolution time metrics"""
+    service = AnalyticsService()
+    return await service.get_resolution_metrics(start_date=start_date, end_date=end_date)
+
+
 @router.get("/reports", response_model=dict)
 async def generate_report(
     report_request: ReportRequest,
+    gzip: bool = Query(False, description="Gzip CSV downloads"),
     current_user: dict = Depends(get_current_active_user),
 ):
     """Generate analytics report"""
     service = AnalyticsService()
+    if report_request.format == "csv":
+        # Streamed straight from the cursor, so exports of any size run in constant memory
+        filename = f"cases_{report_request.start_date:%Y%m%d}_{report_request.end_date:%Y%m%d}.csv"
+        if gzip:
+            filename += ".gz"
+        return StreamingResponse(
+            service.export_cases_csv(
+                start_date=report_request.start_date,
+                end_date=report_request.end_date,
+                compress=gzip,
+            ),
+            media_type="application/gzip" if gzip else "text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    
     report = await service.generate_report(
         report_type=report_request.report_type,
         start_date=report_request.start_date,
@@ -45,6 +78,65 @@ async def generate_report(
     return report
 
 
+@router.post("/reports/jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    report_request: ReportRequest,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Queue a report render; identical requests over unchanged data share one job"""
+    if report_request.format not in ("pdf", "csv"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be pdf or csv",
+        )
+    service = AnalyticsService()
+    return await service.generate_report(
+        report_type=report_request.report_type,
+        start_date=report_request.start_date,
+        end_date=report_request.end_date,
+        format=report_request.format,
+    )
+
+
+@router.get("/reports/jobs/{report_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    report_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Get report job status"""
+    job = await report_service.get_job(report_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found",
+        )
+    return report_job_payload(job)
+
+
+@router.get("/reports/jobs/{report_id}/download")
+async def download_report(
+    report_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Download a rendered report"""
+    job = await report_service.get_job(report_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found",
+        )
+    if job.status != ReportStatus.COMPLETED or not job.artifact_path or not os.path.exists(job.artifact_path):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is {job.status.value}",
+        )
+    return FileResponse(
+        job.artifact_path,
+        media_type="application/pdf" if job.format == "pdf" else "text/csv",
+        filename=f"{job.report_type}_{job.start_date:%Y%m%d}_{job.end_date:%Y%m%d}.{job.format}",
+    )
+
+
 @router.post("/trends", response_model=TrendAnalysisResponse)
 async def analyze_trends(
     trend_request: TrendAnalysisRequest,
@@ -52,10 +144,16 @@ async def analyze_trends(
 ):
     """Analyze trends"""
     service = AnalyticsService()
-    trends = await service.analyze_trends(
-        metric=trend_request.metric,
-        start_date=trend_request.start_date,
-        end_date=trend_request.end_date,
-    )
+    try:
+        trends = await service.analyze_trends(
+            metric=trend_request.metric,
+            start_date=trend_request.start_date,
+            end_date=trend_request.end_date,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     return trends
 
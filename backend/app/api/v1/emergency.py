@@ -12,12 +12,31 @@ from app.schemas.emergency import (
     EmergencyCaseResponse,
     EmergencyCaseListResponse,
 )
+from app.schemas.calls import TranscriptResponse
 from app.services.emergency_service import EmergencyService
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_cursor
+from shared.responses import FastJSONResponse
 
 router = APIRouter()
 
 
+def get_case_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (implies lean mode)"),
+) -> Optional[List[str]]:
+    """Parse and validate a case field projection"""
+    if not fields:
+        return None
+    
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in EmergencyCaseResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return requested
+
+
 @router.post("/", response_model=EmergencyCaseResponse, status_code=status.HTTP_201_CREATED)
 async def create_emergency_case(
     case_data: EmergencyCaseCreate,
@@ -34,18 +53,36 @@ async def list_emergency_cases(
     status: Optional[EmergencyStatus] = Query(None, description="Filter by status"),
     severity: Optional[SeverityLevel] = Query(None, description="Filter by severity"),
     emergency_type: Optional[EmergencyType] = Query(None, description="Filter by type"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Depends(get_cursor),
     limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = Query(False, description="Include an estimated/cached total count"),
+    fields: Optional[List[str]] = Depends(get_case_fields),
+    lean: bool = Query(False, description="Return raw projected documents without model validation"),
     current_user: dict = Depends(get_current_active_user),
 ):
     """List all emergency cases with optional filters"""
     service = EmergencyService()
+    
+    if lean or fields:
+        # Lean mode: Mongo projection straight to orjson, no Pydantic models
+        cases = await service.list_cases_lean(
+            status=status,
+            severity=severity,
+            emergency_type=emergency_type,
+            cursor=cursor,
+            limit=limit,
+            include_total=include_total,
+            fields=fields,
+        )
+        return FastJSONResponse(cases)
+    
     cases = await service.list_cases(
         status=status,
         severity=severity,
         emergency_type=emergency_type,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
+        include_total=include_total,
     )
     return cases
 
@@ -66,6 +103,22 @@ async def get_emergency_case(
     return case
 
 
+@router.get("/{case_id}/transcript", response_model=TranscriptResponse)
+async def get_emergency_case_transcript(
+    case_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Get the latest caller transcript for an emergency case"""
+    service = EmergencyService()
+    transcript = await service.get_transcript(case_id)
+    if not transcript:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transcript for case {case_id} not found",
+        )
+    return transcript
+
+
 @router.put("/{case_id}", response_model=EmergencyCaseResponse)
 async def update_emergency_case(
     case_id: str,
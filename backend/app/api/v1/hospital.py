@@ -7,10 +7,13 @@ from typing import List, Optional
 from app.schemas.hospital import (
     HospitalResponse,
     HospitalListResponse,
+    HospitalRankingResponse,
     HospitalResourceUpdate,
+    HospitalReservationCreate,
+    HospitalReservationResponse,
 )
 from app.services.hospital_service import HospitalService
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_cursor
 
 router = APIRouter()
 
@@ -18,16 +21,45 @@ router = APIRouter()
 @router.get("/", response_model=HospitalListResponse)
 async def list_hospitals(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Depends(get_cursor),
     limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = Query(False, description="Include an estimated/cached total count"),
     current_user: dict = Depends(get_current_active_user),
 ):
     """List all hospitals"""
     service = HospitalService()
-    hospitals = await service.list_hospitals(is_active=is_active, skip=skip, limit=limit)
+    hospitals = await service.list_hospitals(
+        is_active=is_active,
+        cursor=cursor,
+        limit=limit,
+        include_total=include_total,
+    )
     return hospitals
 
 
+@router.get("/rank", response_model=HospitalRankingResponse)
+async def rank_hospitals(
+    lat: float = Query(..., ge=-90, le=90, description="Patient latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="Patient longitude"),
+    severity: str = Query("medium", description="Case severity"),
+    specialties: List[str] = Query([], description="Required specialties"),
+    equipment: List[str] = Query([], description="Required equipment"),
+    limit: int = Query(5, ge=1, le=50),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Rank hospitals by ETA, capacity, capabilities and inbound load"""
+    service = HospitalService()
+    ranking = await service.rank_hospitals(
+        lat=lat,
+        lng=lng,
+        severity=severity,
+        specialties=specialties,
+        equipment=equipment,
+        limit=limit,
+    )
+    return ranking
+
+
 @router.get("/{hospital_id}", response_model=HospitalResponse)
 async def get_hospital(
     hospital_id: str,
@@ -76,3 +108,61 @@ async def update_hospital_resources(
         )
     return hospital
 
+
+
+@router.post(
+    "/{hospital_id}/reservations",
+    response_model=HospitalReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def reserve_hospital_resource(
+    hospital_id: str,
+    reservation_request: HospitalReservationCreate,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Atomically hold a bed or ICU bed for an incoming patient"""
+    service = HospitalService()
+    reservation = await service.reserve_resource(
+        hospital_id=hospital_id,
+        case_id=reservation_request.case_id,
+        resource_type=reservation_request.resource_type,
+        ttl_seconds=reservation_request.ttl_seconds,
+    )
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No {reservation_request.resource_type.value} available at hospital {hospital_id}",
+        )
+    return reservation
+
+
+@router.post("/reservations/{reservation_id}/confirm", response_model=HospitalReservationResponse)
+async def confirm_hospital_reservation(
+    reservation_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Confirm a held reservation on patient arrival"""
+    service = HospitalService()
+    reservation = await service.confirm_reservation(reservation_id)
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Active reservation {reservation_id} not found",
+        )
+    return reservation
+
+
+@router.delete("/reservations/{reservation_id}", response_model=HospitalReservationResponse)
+async def release_hospital_reservation(
+    reservation_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Release a held reservation and return its capacity"""
+    service = HospitalService()
+    reservation = await service.release_reservation(reservation_id)
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Active reservation {reservation_id} not found",
+        )
+    return reservation
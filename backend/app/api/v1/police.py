@@ -4,14 +4,18 @@ Police API endpoints
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 
+from app.models.police import OfficerRank
 from app.schemas.police import (
     PoliceOfficerResponse,
     PoliceOfficerListResponse,
+    AvailableOfficerListResponse,
+    PoliceActionListResponse,
     PoliceAlertRequest,
     PoliceActionCreate,
 )
 from app.services.police_service import PoliceService
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_cursor
+from shared.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -29,6 +33,27 @@ async def list_officers(
     return officers
 
 
+@router.get("/officers/available", response_model=AvailableOfficerListResponse)
+async def list_available_officers(
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Incident latitude"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Incident longitude"),
+    min_rank: Optional[OfficerRank] = Query(None, description="Minimum officer rank"),
+    station: Optional[str] = Query(None, description="Filter by police station"),
+    limit: int = Query(3, ge=1, le=100),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Find nearest available officers at or above a rank"""
+    service = PoliceService()
+    officers = await service.find_available_officers(
+        lat=lat,
+        lng=lng,
+        min_rank=min_rank.value if min_rank else None,
+        station=station,
+        limit=limit,
+    )
+    return officers
+
+
 @router.post("/alert", status_code=status.HTTP_200_OK)
 async def send_police_alert(
     alert_request: PoliceAlertRequest,
@@ -41,23 +66,23 @@ async def send_police_alert(
         severity=alert_request.severity,
         num_officers=alert_request.num_officers,
     )
-    return result
+    return FastJSONResponse(result)
 
 
-@router.get("/actions", response_model=List[dict])
+@router.get("/actions", response_model=PoliceActionListResponse)
 async def get_officer_actions(
     case_id: Optional[str] = Query(None, description="Filter by case ID"),
     officer_id: Optional[str] = Query(None, description="Filter by officer ID"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Depends(get_cursor),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_active_user),
 ):
-    """Get police officer actions"""
+    """Get police officer actions, newest first"""
     service = PoliceService()
     actions = await service.get_actions(
         case_id=case_id,
         officer_id=officer_id,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
     )
     return actions
@@ -71,5 +96,10 @@ async def create_officer_action(
     """Create police officer action log"""
     service = PoliceService()
     action = await service.create_action(action_data)
-    return action
+    if not action:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Officer {action_data.officer_id} is not known; officer_name and officer_rank are required",
+        )
+    return FastJSONResponse(action, status_code=status.HTTP_201_CREATED)
 
@@ -1,20 +1,60 @@
 """
 WebSocket API for real-time updates
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from typing import Optional
+import asyncio
 import json
 
-from app.services.websocket_service import WebSocketService
+from app.core.security import SERVICE_PRINCIPAL, is_service_request, verify_token
+from app.services.websocket_service import websocket_service
+from app.services.live_updates_service import live_updates_service
 
 router = APIRouter()
-websocket_service = WebSocketService()
+
+# Seconds a client has to send its auth message after connecting
+AUTH_TIMEOUT_SECONDS = 10.0
+
+
+async def authenticate(websocket: WebSocket) -> Optional[dict]:
+    """Verify a JWT from ?token= or a first {"type": "auth", "token": ...} message"""
+    if is_service_request(websocket.scope):
+        return dict(SERVICE_PRINCIPAL)
+    
+    token = websocket.query_params.get("token")
+    if not token:
+        try:
+            message = json.loads(
+                await asyncio.wait_for(websocket.receive_text(), timeout=AUTH_TIMEOUT_SECONDS)
+            )
+        except (asyncio.TimeoutError, ValueError):
+            return None
+        if not isinstance(message, dict) or message.get("type") != "auth":
+            return None
+        token = message.get("token")
+    if not token:
+        return None
+    
+    try:
+        return await verify_token(token)
+    except HTTPException:
+        return None
 
 
 @router.websocket("/")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
-    await websocket_service.connect(websocket)
+    await websocket.accept()
+    try:
+        user = await authenticate(websocket)
+    except WebSocketDisconnect:
+        return
+    if user is None:
+        # Live channels carry case locations and assignments; nothing is sent unauthenticated
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    connection = await websocket_service.connect(websocket, accept=False)
     
     try:
         while True:
@@ -25,12 +65,15 @@ async def websocket_endpoint(websocket: WebSocket):
             # Handle different message types
             if message.get("type") == "subscribe":
                 await websocket_service.subscribe(websocket, message.get("channel"))
+                # Live channels start with the full state; deltas follow
+                live_updates_service.send_snapshot(websocket, message.get("channel"))
             elif message.get("type") == "unsubscribe":
                 await websocket_service.unsubscribe(websocket, message.get("channel"))
             else:
-                # Echo back or process message
-                await websocket.send_text(json.dumps({"echo": message}))
-                
+                # Echo back through the connection's queue so sends never interleave
+                connection.enqueue(json.dumps({"echo": message}))
+    
     except WebSocketDisconnect:
+        pass
+    finally:
         websocket_service.disconnect(websocket)
-
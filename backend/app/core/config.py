@@ -56,14 +56,44 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_SIZE: int = 10000
+    JWT_BACKEND: str = "jose"  # "pyjwt" for faster HS256 verification when installed
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = [
+        "/health",
+        "/api/v1/calls/inbound",
+        "/api/v1/calls/recording",
+    ]
+    # Shared secret sent by ml-agents/action-systems; their calls bypass per-IP limits
+    SERVICE_TOKEN: Optional[str] = None
+    
+    # Hospital reservations
+    RESERVATION_TTL_SECONDS: int = 900
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = 30
+    HOSPITAL_SNAPSHOT_RELOAD_SECONDS: int = 60
+    
+    # Police
+    POLICE_ALERT_TTL_SECONDS: int = 300  # unacknowledged alerts free the officer after this
+    
+    # Analytics
+    DASHBOARD_RECONCILE_SECONDS: int = 300
+    ROLLUP_INTERVAL_SECONDS: int = 60
+    ROLLUP_LAG_SECONDS: int = 60
+    REPORTS_DIR: str = "reports"
+    REPORT_WORKERS: int = 2
+    REPORT_JOB_TIMEOUT_SECONDS: int = 600
     
     # WebSocket
     WEBSOCKET_ENABLED: bool = True
     WEBSOCKET_PORT: int = 8001
+    WEBSOCKET_QUEUE_SIZE: int = 256
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 5.0
+    WEBSOCKET_REDIS_FANOUT: bool = True
+    LIVE_UPDATE_FLUSH_MS: int = 250
     
     # Logging
     LOG_LEVEL: str = "INFO"
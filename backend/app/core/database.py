@@ -13,6 +13,9 @@ from app.models.ambulance import AmbulanceTracking
 from app.models.police import PoliceOfficerAction
 from app.models.ai_recommendation import AIRecommendation
 from app.models.location import LocationMetadata
+from app.models.reservation import HospitalReservation
+from app.models.rollup import CaseRollup, RollupState
+from app.models.report import ReportJob
 
 
 # Global database client
@@ -41,11 +44,15 @@ async def init_db():
                 PoliceOfficerAction,
                 AIRecommendation,
                 LocationMetadata,
+                HospitalReservation,
+                CaseRollup,
+                RollupState,
+                ReportJob,
             ],
         )
         
         logger.info(f"Connected to MongoDB: {settings.MONGODB_DB_NAME}")
-        
+    
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
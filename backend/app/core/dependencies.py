@@ -1,12 +1,13 @@
 """
 FastAPI dependencies
 """
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, Optional
+from fastapi import Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.database import get_database
 from app.core.security import get_current_user
+from app.utils.pagination import decode_cursor
 
 
 async def get_db() -> Generator:
@@ -28,3 +29,18 @@ async def get_current_active_user(user: dict = Depends(get_current_user)) -> dic
         )
     return user
 
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+) -> Optional[str]:
+    """Validate an opaque keyset pagination cursor"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+    return cursor
@@ -1,56 +1,92 @@
 """
 Custom middleware for rate limiting and request processing
 """
-from fastapi import Request, HTTPException, status
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from loguru import logger
 import time
 
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.security import is_service_request
+from shared.responses import FastJSONResponse
 
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+def client_address(scope: Scope) -> str:
+    """Client host for a request scope, matching slowapi's get_remote_address"""
+    client = scope.get("client")
+    return client[0] if client else "127.0.0.1"
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Rate limiting middleware"""
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request with rate limiting"""
-        try:
-            response = await call_next(request)
-            return response
-        except RateLimitExceeded as e:
-            return _rate_limit_exceeded_handler(request, e)
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in settings.RATE_LIMIT_EXEMPT_PATHS
+            # Internal services share one IP each and would exhaust a per-client budget
+            or is_service_request(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        allowed, retry_after = await rate_limiter.hit(client_address(scope))
+        if not allowed:
+            response = FastJSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        
+        await self.app(scope, receive, send)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Log all incoming requests"""
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Log request and response"""
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        logger.info(
-            f"{request.method} {request.url.path} - "
-            f"Client: {get_remote_address(request)}"
-        )
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
         
-        response = await call_next(request)
+        # Positional arguments are only formatted if a sink accepts the level
+        logger.info("{} {} - Client: {}", method, path, client_address(scope))
         
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(
-            f"{request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Time: {process_time:.3f}s"
-        )
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to first byte; streamed bodies keep flowing untouched
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{time.perf_counter() - start_time:.6f}")
+            await send(message)
         
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            logger.info(
+                "{} {} - Status: {} - Time: {:.3f}s",
+                method,
+                path,
+                status_code,
+                time.perf_counter() - start_time,
+            )
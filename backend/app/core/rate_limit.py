@@ -0,0 +1,201 @@
+"""
+Sliding-window rate limiting shared across workers through Redis
+"""
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+
+# Sliding-window counter over every configured window, checked and applied atomically.
+# KEYS come in (current, previous) pairs per window; ARGV holds (window_seconds, limit,
+# elapsed_fraction) per window. Returns {allowed, retry_after_seconds}.
+SLIDING_WINDOW_LUA = """
+local windows = #KEYS / 2
+local retry_after = 0
+
+for i = 1, windows do
+    local window = tonumber(ARGV[i * 3 - 2])
+    local limit = tonumber(ARGV[i * 3 - 1])
+    local elapsed = tonumber(ARGV[i * 3])
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    if previous * (1 - elapsed) + current + 1 > limit then
+        retry_after = math.max(retry_after, math.ceil(window * (1 - elapsed)))
+    end
+end
+
+if retry_after > 0 then
+    return {0, retry_after}
+end
+
+for i = 1, windows do
+    redis.call('INCR', KEYS[i * 2 - 1])
+    redis.call('EXPIRE', KEYS[i * 2 - 1], tonumber(ARGV[i * 3 - 2]) * 2)
+end
+return {1, 0}
+"""
+
+
+class SlidingWindowCounter:
+    """In-process sliding-window counter, used when Redis is unavailable"""
+    
+    def __init__(self, windows: List[Tuple[int, int]]):
+        self.windows = windows
+        # key -> [(window_index, current, previous)] per configured window
+        self.counters: Dict[str, List[List[int]]] = {}
+    
+    def hit(self, key: str, now: float) -> Tuple[bool, int]:
+        """Record a request if it fits every window; return (allowed, retry_after)"""
+        counters = self.counters.get(key)
+        if counters is None:
+            counters = [[0, 0, 0] for _ in self.windows]
+            self.counters[key] = counters
+        
+        retry_after = 0
+        for (window, limit), counter in zip(self.windows, counters):
+            index = int(now // window)
+            if counter[0] != index:
+                # Roll forward; anything older than one window no longer counts
+                counter[2] = counter[1] if counter[0] == index - 1 else 0
+                counter[1] = 0
+                counter[0] = index
+            elapsed = (now % window) / window
+            if counter[2] * (1 - elapsed) + counter[1] + 1 > limit:
+                retry_after = max(retry_after, math.ceil(window * (1 - elapsed)))
+        
+        if retry_after:
+            return False, retry_after
+        for counter in counters:
+            counter[1] += 1
+        return True, 0
+    
+    def prune(self, now: float):
+        """Drop keys idle for longer than the largest window"""
+        horizon = max(window for window, _ in self.windows)
+        stale = [
+            key for key, counters in self.counters.items()
+            if int(now // horizon) - counters[-1][0] > 1
+        ]
+        for key in stale:
+            del self.counters[key]
+
+
+class RateLimiter:
+    """Per-client limiter enforcing RATE_LIMIT_PER_MINUTE and RATE_LIMIT_PER_HOUR"""
+    
+    REDIS_RETRY_SECONDS = 5.0
+    PRUNE_INTERVAL_SECONDS = 60.0
+    
+    def __init__(
+        self,
+        per_minute: int,
+        per_hour: int,
+        redis_url: Optional[str] = None,
+        redis_db: int = 0,
+        key_prefix: str = "ratelimit",
+    ):
+        self.windows = [(60, per_minute), (3600, per_hour)]
+        self.redis_url = redis_url
+        self.redis_db = redis_db
+        self.key_prefix = key_prefix
+        self.local = SlidingWindowCounter(self.windows)
+        # Clients known to be over the limit are rejected without a Redis round trip
+        self.blocked_until: Dict[str, float] = {}
+        self._redis = None
+        self._script = None
+        self._redis_down_until = 0.0
+        self._last_prune = 0.0
+    
+    def _client(self):
+        """Lazily create the Redis client and register the limiter script"""
+        if self._redis is None and self.redis_url:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                db=self.redis_db,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+            self._script = self._redis.register_script(SLIDING_WINDOW_LUA)
+        return self._redis
+    
+    def _keys(self, identity: str, now: float) -> List[str]:
+        """Current and previous window keys for identity"""
+        # Hash tag keeps all of a client's keys in one cluster slot
+        keys = []
+        for window, _ in self.windows:
+            index = int(now // window)
+            keys.append(f"{self.key_prefix}:{{{identity}}}:{window}:{index}")
+            keys.append(f"{self.key_prefix}:{{{identity}}}:{window}:{index - 1}")
+        return keys
+    
+    def _args(self, now: float) -> list:
+        """Window, limit and elapsed fraction for each window"""
+        args = []
+        for window, limit in self.windows:
+            args.extend([window, limit, (now % window) / window])
+        return args
+    
+    async def hit(self, identity: str) -> Tuple[bool, int]:
+        """Count a request for identity; return (allowed, retry_after_seconds)"""
+        now = time.time()
+        
+        blocked_until = self.blocked_until.get(identity)
+        if blocked_until is not None:
+            if now < blocked_until:
+                return False, math.ceil(blocked_until - now)
+            del self.blocked_until[identity]
+        
+        if now - self._last_prune > self.PRUNE_INTERVAL_SECONDS:
+            self._prune(now)
+        
+        allowed, retry_after = await self._hit_shared(identity, now)
+        if not allowed:
+            self.blocked_until[identity] = now + retry_after
+        return allowed, retry_after
+    
+    async def _hit_shared(self, identity: str, now: float) -> Tuple[bool, int]:
+        """Count against Redis, falling back to local counters while it is unreachable"""
+        client = self._client() if now >= self._redis_down_until else None
+        if client is None:
+            return self.local.hit(identity, now)
+        
+        try:
+            allowed, retry_after = await self._script(
+                keys=self._keys(identity, now),
+                args=self._args(now),
+                client=client,
+            )
+        except (RedisError, OSError) as e:
+            logger.warning(f"Rate limiter falling back to local counters: {e}")
+            self._redis_down_until = now + self.REDIS_RETRY_SECONDS
+            return self.local.hit(identity, now)
+        return bool(allowed), int(retry_after)
+    
+    def _prune(self, now: float):
+        """Forget idle counters and lapsed blocks"""
+        self._last_prune = now
+        self.local.prune(now)
+        expired = [key for key, until in self.blocked_until.items() if until <= now]
+        for key in expired:
+            del self.blocked_until[key]
+    
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+            self._script = None
+
+
+rate_limiter = RateLimiter(
+    per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    per_hour=settings.RATE_LIMIT_PER_HOUR,
+    redis_url=settings.REDIS_URL,
+    redis_db=settings.REDIS_DB,
+)
@@ -1,15 +1,26 @@
 """
 Security utilities: authentication, authorization, password hashing
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
+import hashlib
+import hmac
+import time
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from loguru import logger
+from starlette.types import Scope
 
 from app.core.config import settings
+from shared.service_auth import SERVICE_TOKEN_HEADER
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT is optional; python-jose is the default backend
+    pyjwt = None
 
 
 # Password hashing context
@@ -17,6 +28,26 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
+# Same scheme without the automatic 401, for routes that also accept the service token
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_PREFIX}/auth/login",
+    auto_error=False,
+)
+
+SERVICE_TOKEN_HEADER_KEY = SERVICE_TOKEN_HEADER.lower().encode()
+
+# Principal for internal services (action-systems, ml-agents) calling with SERVICE_TOKEN
+SERVICE_PRINCIPAL = {"sub": "service", "role": "service"}
+
+
+def is_service_request(scope: Scope) -> bool:
+    """Whether a request carries the internal service token"""
+    if not settings.SERVICE_TOKEN:
+        return False
+    for name, value in scope.get("headers", []):
+        if name == SERVICE_TOKEN_HEADER_KEY:
+            return hmac.compare_digest(value, settings.SERVICE_TOKEN.encode())
+    return False
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -65,6 +96,71 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of verified token payloads, keyed by token hash and expiring at exp"""
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        """Hash tokens so raw credentials are never kept as keys"""
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload if the token was verified and has not expired"""
+        key = self._key(token)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self.entries[key]
+            return None
+        
+        self.entries.move_to_end(key)
+        return payload
+    
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Cache a verified payload until its exp claim"""
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        
+        key = self._key(token)
+        self.entries[key] = (float(payload["exp"]), payload)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached payload"""
+        self.entries.clear()
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.JWT_CACHE_SIZE)
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Verify a token's signature and expiry; raises JWTError when invalid"""
+    if settings.JWT_BACKEND == "pyjwt" and pyjwt is not None:
+        try:
+            return pyjwt.decode(
+                token,
+                settings.JWT_SECRET_KEY,
+                algorithms=[settings.JWT_ALGORITHM],
+            )
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+    
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+
+
 async def verify_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """Verify and decode JWT token"""
     credentials_exception = HTTPException(
@@ -73,25 +169,37 @@ async def verify_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
+    
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
+        payload = decode_token(token)
         
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
         
-        return payload
-        
+        token_cache.put(token, payload)
+        return dict(payload)
+    
     except JWTError:
         raise credentials_exception
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
-    """Get current authenticated user from token"""
+async def get_current_user(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> Dict[str, Any]:
+    """Get current authenticated user from token, or the service principal"""
+    if is_service_request(request.scope):
+        return dict(SERVICE_PRINCIPAL)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     payload = await verify_token(token)
     return payload
 
@@ -5,11 +5,34 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+from loguru import logger
+import asyncio
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
 from app.api.v1 import api_router
-from app.core.middleware import RateLimitMiddleware
+from app.core.middleware import RateLimitMiddleware, RequestLoggingMiddleware
+from app.core.rate_limit import rate_limiter
+from shared.responses import FastJSONResponse
+from app.services.hospital_ranking_service import hospital_ranking_service
+from app.services.hospital_service import HospitalService
+from app.services.police_availability_service import police_availability_service
+from app.services.websocket_service import websocket_service
+from app.services.live_updates_service import live_updates_service
+from app.services.dashboard_counters import dashboard_counters
+from app.services.rollup_service import rollup_service
+from app.services.report_service import report_service
+
+
+async def expire_hospital_reservations():
+    """Periodically return capacity held by expired reservations"""
+    service = HospitalService()
+    while True:
+        try:
+            await service.release_expired_reservations()
+        except Exception as e:
+            logger.error(f"Error releasing expired reservations: {e}")
+        await asyncio.sleep(settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
 
 
 @asynccontextmanager
@@ -17,8 +40,31 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await init_db()
+    await hospital_ranking_service.load()
+    hospital_ranking_service.start()
+    await police_availability_service.load()
+    reservation_sweeper = asyncio.create_task(expire_hospital_reservations())
+    await websocket_service.start()
+    await live_updates_service.load()
+    live_updates_service.start()
+    await dashboard_counters.reconcile()
+    dashboard_counters.start()
+    rollup_service.start()
+    report_service.start()
     yield
     # Shutdown
+    reservation_sweeper.cancel()
+    try:
+        await reservation_sweeper
+    except asyncio.CancelledError:
+        pass
+    await hospital_ranking_service.stop()
+    await live_updates_service.stop()
+    await dashboard_counters.stop()
+    await rollup_service.stop()
+    await report_service.stop()
+    await websocket_service.stop()
+    await rate_limiter.close()
     await close_db()
 
 
@@ -29,8 +75,21 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Middleware added later wraps what was added earlier
+
+# Rate Limiting Middleware (inside CORS, so 429s carry CORS headers browsers can read)
+app.add_middleware(RateLimitMiddleware)
+
+# Trusted Host Middleware
+if settings.ENVIRONMENT == "production":
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=settings.ALLOWED_HOSTS,
+    )
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -40,15 +99,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Trusted Host Middleware
-if settings.ENVIRONMENT == "production":
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=settings.ALLOWED_HOSTS,
-    )
-
-# Rate Limiting Middleware
-app.add_middleware(RateLimitMiddleware)
+# Request Logging Middleware (outermost, so timings include every other layer)
+app.add_middleware(RequestLoggingMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
@@ -52,5 +52,6 @@ class AmbulanceTracking(Document):
             "assigned_case",
             ["current_lat", "current_lng"],
             "last_update",
+            [("status", 1), ("created_at", -1), ("_id", -1)],
         ]
 
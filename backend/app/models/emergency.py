@@ -66,6 +66,7 @@ class EmergencyCase(Document):
     
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    dispatched_at: Optional[datetime] = Field(None, description="First dispatch timestamp")
     resolved_at: Optional[datetime] = Field(None, description="Resolution timestamp")
     
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
@@ -79,5 +80,11 @@ class EmergencyCase(Document):
             "severity_level",
             "created_at",
             ["location_lat", "location_lng"],
+            # Keyset pagination: (created_at, _id) newest first, optionally per status
+            [("created_at", -1), ("_id", -1)],
+            [("status", 1), ("created_at", -1), ("_id", -1)],
+            # Rollup windows by event time
+            "dispatched_at",
+            "resolved_at",
         ]
 
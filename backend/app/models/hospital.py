@@ -57,5 +57,6 @@ class HospitalResource(Document):
             "is_active",
             "icu_status",
             ["location_lat", "location_lng"],
+            [("is_active", 1), ("created_at", -1), ("_id", -1)],
         ]
 
@@ -60,5 +60,7 @@ class PoliceOfficerAction(Document):
             "case_id",
             "action_type",
             "timestamp",
+            [("officer_id", 1), ("timestamp", -1)],
+            [("case_id", 1), ("timestamp", -1), ("_id", -1)],
         ]
 
@@ -0,0 +1,43 @@
+"""
+Report Job Model
+"""
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class ReportStatus(str, Enum):
+    """Report job status"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReportJob(Document):
+    """A report render request and its artifact"""
+    
+    job_id: str = Field(..., description="Unique job identifier")
+    # Hash of type, format, range and data fingerprint; identical requests share a job
+    key: str = Field(..., description="Deduplication key")
+    report_type: str = Field(..., description="Report type")
+    format: str = Field(..., description="pdf or csv")
+    start_date: datetime = Field(..., description="Range start")
+    end_date: datetime = Field(..., description="Range end")
+    status: ReportStatus = Field(default=ReportStatus.QUEUED, description="Job status")
+    artifact_path: Optional[str] = Field(None, description="Rendered file on disk")
+    error: Optional[str] = Field(None, description="Failure reason")
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
+    
+    class Settings:
+        name = "Report_Jobs"
+        indexes = [
+            IndexModel([("job_id", ASCENDING)], unique=True),
+            IndexModel([("key", ASCENDING)], unique=True),
+        ]
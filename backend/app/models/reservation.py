@@ -0,0 +1,58 @@
+"""
+Hospital Reservation Model
+"""
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from typing import Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+
+
+class ReservationResource(str, Enum):
+    """Reserved resource type"""
+    BED = "bed"
+    ICU = "icu"
+
+
+class ReservationStatus(str, Enum):
+    """Reservation status"""
+    HELD = "held"
+    CONFIRMED = "confirmed"
+    RELEASED = "released"
+    EXPIRED = "expired"
+
+
+class HospitalReservation(Document):
+    """Hospital bed/ICU hold document"""
+    
+    reservation_id: str = Field(..., description="Unique reservation identifier")
+    hospital_id: str = Field(..., description="Reserved hospital ID")
+    case_id: str = Field(..., description="Associated emergency case ID")
+    
+    resource_type: ReservationResource = Field(..., description="Reserved resource type")
+    status: ReservationStatus = Field(default=ReservationStatus.HELD, description="Reservation status")
+    
+    expires_at: datetime = Field(..., description="Hold expiry timestamp")
+    purge_at: Optional[datetime] = Field(None, description="TTL purge timestamp for finished holds")
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
+    
+    class Settings:
+        name = "Hospital_Reservations"
+        indexes = [
+            "reservation_id",
+            "hospital_id",
+            "case_id",
+            # One live hold per case and hospital
+            IndexModel(
+                [("case_id", ASCENDING), ("hospital_id", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"status": ReservationStatus.HELD.value},
+            ),
+            [("status", ASCENDING), ("expires_at", ASCENDING)],
+            IndexModel([("purge_at", ASCENDING)], expireAfterSeconds=0),
+        ]
@@ -0,0 +1,61 @@
+"""
+Case Metric Rollup Models
+"""
+from beanie import Document, Granularity, TimeSeriesConfig
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from typing import Optional, Dict
+from datetime import datetime
+from enum import Enum
+
+
+class RollupGranularity(str, Enum):
+    """Rollup bucket size"""
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+
+class CaseRollup(Document):
+    """Pre-aggregated case metrics for one time bucket"""
+    
+    bucket_start: datetime = Field(..., description="Bucket start (UTC)")
+    granularity: RollupGranularity = Field(..., description="Bucket size")
+    
+    # Cases created in the bucket
+    case_count: int = Field(0, description="Cases created")
+    # Created -> dispatched, for cases dispatched in the bucket (minutes)
+    response_time_sum: float = Field(0.0, description="Sum of response times")
+    response_time_count: int = Field(0, description="Dispatched cases")
+    response_time_max: Optional[float] = Field(None, description="Longest response time")
+    # Created -> resolved, for cases resolved in the bucket (minutes)
+    resolution_time_sum: float = Field(0.0, description="Sum of resolution times")
+    resolution_time_count: int = Field(0, description="Resolved cases")
+    resolution_time_max: Optional[float] = Field(None, description="Longest resolution time")
+    
+    class Settings:
+        name = "Case_Rollups"
+        timeseries = TimeSeriesConfig(
+            time_field="bucket_start",
+            meta_field="granularity",
+            granularity=Granularity.minutes,
+        )
+        indexes = [
+            [("granularity", ASCENDING), ("bucket_start", ASCENDING)],
+        ]
+
+
+class RollupState(Document):
+    """Rollup job lease and per-granularity watermarks"""
+    
+    job: str = Field(..., description="Rollup job name")
+    owner: Optional[str] = Field(None, description="Worker holding the lease")
+    lease_until: Optional[datetime] = Field(None, description="Lease expiry")
+    # Granularity -> end of the last fully rolled-up bucket
+    watermarks: Dict[str, datetime] = Field(default_factory=dict, description="Rolled-up until")
+    
+    class Settings:
+        name = "Rollup_State"
+        indexes = [
+            IndexModel([("job", ASCENDING)], unique=True),
+        ]
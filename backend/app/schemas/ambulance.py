@@ -4,6 +4,7 @@ Ambulance schemas
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from app.models.ambulance import AmbulanceStatus
 
 
 class AmbulanceResponse(BaseModel):
@@ -30,8 +31,8 @@ class AmbulanceResponse(BaseModel):
 class AmbulanceListResponse(BaseModel):
     """Schema for ambulance list response"""
     ambulances: List[AmbulanceResponse]
-    total: int
-    skip: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
     limit: int
 
 
@@ -46,7 +47,7 @@ class AmbulanceTrackingUpdate(BaseModel):
     """Schema for updating ambulance tracking"""
     current_lat: float
     current_lng: float
-    status: Optional[str] = None
+    status: Optional[AmbulanceStatus] = None
     eta_minutes: Optional[int] = None
     route_distance_km: Optional[float] = None
 
@@ -11,14 +11,26 @@ class DashboardDataResponse(BaseModel):
     total_cases: int
     active_cases: int
     resolved_cases: int
+    cases_by_status: Dict[str, int] = {}
     cases_by_severity: Dict[str, int]
     cases_by_type: Dict[str, int]
-    response_times: Dict[str, float]
+    response_times: Dict[str, Optional[float]]
     ambulance_status: Dict[str, int]
     hospital_load: List[Dict[str, Any]]
     recent_cases: List[Dict[str, Any]]
 
 
+class ResolutionMetricsResponse(BaseModel):
+    """Schema for resolution metrics response"""
+    resolved_cases: int
+    avg_resolution_time: Optional[float] = None
+    max_resolution_time: Optional[float] = None
+    p50_resolution_time: Optional[float] = None
+    p90_resolution_time: Optional[float] = None
+    p99_resolution_time: Optional[float] = None
+    histogram: Dict[str, int]
+
+
 class ReportRequest(BaseModel):
     """Schema for report request"""
     report_type: str
@@ -27,6 +39,20 @@ class ReportRequest(BaseModel):
     format: str = "pdf"  # "pdf" or "csv"
 
 
+class ReportJobResponse(BaseModel):
+    """Schema for report job response"""
+    report_id: str
+    report_type: str
+    format: str
+    status: str  # "queued", "running", "completed", "failed"
+    start_date: datetime
+    end_date: datetime
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+
 class TrendAnalysisRequest(BaseModel):
     """Schema for trend analysis request"""
     metric: str
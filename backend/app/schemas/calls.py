@@ -2,7 +2,7 @@
 Call schemas
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, Any
 from datetime import datetime
 
 
@@ -36,3 +36,21 @@ class CallStatusUpdate(BaseModel):
     call_id: str
     status: str
 
+
+
+class TranscriptResponse(BaseModel):
+    """Schema for caller transcript response"""
+    case_id: str
+    call_id: Optional[str] = None
+    transcript_text: Optional[str] = None
+    transcript_status: str
+    extracted_entities: Dict[str, Any] = {}
+    intent: Optional[str] = None
+    urgency_score: Optional[float] = None
+    language: Optional[str] = None
+    confidence: Optional[float] = None
+    created_at: datetime
+    processed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
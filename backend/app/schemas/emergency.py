@@ -68,7 +68,7 @@ class EmergencyCaseResponse(BaseModel):
 class EmergencyCaseListResponse(BaseModel):
     """Schema for emergency case list response"""
     cases: List[EmergencyCaseResponse]
-    total: int
-    skip: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
     limit: int
 
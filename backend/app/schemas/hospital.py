@@ -1,10 +1,13 @@
 """
 Hospital schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+from app.core.config import settings
+from app.models.reservation import ReservationResource, ReservationStatus
+
 
 class HospitalResponse(BaseModel):
     """Schema for hospital response"""
@@ -36,11 +39,28 @@ class HospitalResponse(BaseModel):
 class HospitalListResponse(BaseModel):
     """Schema for hospital list response"""
     hospitals: List[HospitalResponse]
-    total: int
-    skip: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
     limit: int
 
 
+class RankedHospital(BaseModel):
+    """Schema for a ranked hospital"""
+    hospital_id: str
+    hospital_name: str
+    score: float
+    eta_minutes: float
+    available_beds: int
+    icu_available: int
+    inbound_patients: int
+    load: float
+
+
+class HospitalRankingResponse(BaseModel):
+    """Schema for hospital ranking response"""
+    hospitals: List[RankedHospital]
+
+
 class HospitalResourceUpdate(BaseModel):
     """Schema for updating hospital resources"""
     available_beds: Optional[int] = None
@@ -50,3 +70,25 @@ class HospitalResourceUpdate(BaseModel):
     doctor_on_call: Optional[str] = None
     doctor_phone: Optional[str] = None
 
+
+
+class HospitalReservationCreate(BaseModel):
+    """Schema for reserving a hospital bed or ICU bed"""
+    case_id: str
+    resource_type: ReservationResource = ReservationResource.BED
+    ttl_seconds: int = Field(settings.RESERVATION_TTL_SECONDS, ge=30, le=86400)
+
+
+class HospitalReservationResponse(BaseModel):
+    """Schema for hospital reservation response"""
+    reservation_id: str
+    hospital_id: str
+    case_id: str
+    resource_type: ReservationResource
+    status: ReservationStatus
+    expires_at: datetime
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -4,6 +4,7 @@ Police schemas
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from app.models.police import ActionType, OfficerRank
 
 
 class PoliceOfficerResponse(BaseModel):
@@ -26,6 +27,30 @@ class PoliceOfficerListResponse(BaseModel):
     limit: int
 
 
+class AvailableOfficerResponse(BaseModel):
+    """Schema for an available officer"""
+    officer_id: str
+    officer_name: str
+    officer_rank: str
+    officer_phone: Optional[str] = None
+    officer_station: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    distance_km: Optional[float] = None
+
+
+class AvailableOfficerListResponse(BaseModel):
+    """Schema for available officer list response"""
+    officers: List[AvailableOfficerResponse]
+
+
+class PoliceActionListResponse(BaseModel):
+    """Schema for police action list response"""
+    actions: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
 class PoliceAlertRequest(BaseModel):
     """Schema for police alert request"""
     case_id: str
@@ -37,7 +62,12 @@ class PoliceActionCreate(BaseModel):
     """Schema for creating police action"""
     officer_id: str
     case_id: str
-    action_type: str
+    action_type: ActionType
     action_description: Optional[str] = None
     location: Optional[Dict[str, Any]] = None
+    # Required unless the officer is already known from earlier actions
+    officer_name: Optional[str] = None
+    officer_rank: Optional[OfficerRank] = None
+    officer_phone: Optional[str] = None
+    officer_station: Optional[str] = None
 
@@ -2,7 +2,13 @@
 Ambulance service
 """
 from typing import Optional, List
+from datetime import datetime
+from app.models.ambulance import AmbulanceTracking, AmbulanceStatus
 from app.schemas.ambulance import AmbulanceTrackingUpdate
+from app.services.dashboard_counters import dashboard_counters
+from app.services.hospital_ranking_service import INBOUND_AMBULANCE_STATUSES, hospital_ranking_service
+from app.services.live_updates_service import live_updates_service
+from app.utils.pagination import keyset_query, keyset_sort, next_cursor, count_cache
 from loguru import logger
 
 
@@ -12,48 +18,101 @@ class AmbulanceService:
     async def list_ambulances(
         self,
         status: Optional[str] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
+        include_total: bool = False,
     ) -> dict:
-        """List all ambulances"""
-        # In a real implementation, this would query the database
+        """List all ambulances using keyset pagination"""
+        query = {}
+        if status:
+            query["status"] = status
+        
+        ambulances = await AmbulanceTracking.find(
+            keyset_query(query, cursor)
+        ).sort(keyset_sort()).limit(limit).to_list()
+        
+        total = None
+        if include_total:
+            total = await count_cache.count(AmbulanceTracking.get_motor_collection(), query)
+        
         return {
-            "ambulances": [],
-            "total": 0,
-            "skip": skip,
+            "ambulances": ambulances,
+            "next_cursor": next_cursor(ambulances, limit),
+            "total": total,
             "limit": limit,
         }
     
-    async def get_ambulance_by_id(self, ambulance_id: str) -> Optional[dict]:
+    async def get_ambulance_by_id(self, ambulance_id: str) -> Optional[AmbulanceTracking]:
         """Get ambulance by ID"""
-        # In a real implementation, this would query the database
-        return None
+        return await AmbulanceTracking.find_one(AmbulanceTracking.ambulance_id == ambulance_id)
     
-    async def get_tracking(self, ambulance_id: str) -> Optional[dict]:
+    async def get_tracking(self, ambulance_id: str) -> Optional[AmbulanceTracking]:
         """Get live tracking data for ambulance"""
-        # In a real implementation, this would get real-time GPS data
-        return None
+        return await self.get_ambulance_by_id(ambulance_id)
     
     async def dispatch_ambulance(
         self,
         ambulance_id: str,
         case_id: str,
         destination_hospital_id: Optional[str] = None,
-    ) -> Optional[dict]:
+    ) -> Optional[AmbulanceTracking]:
         """Dispatch ambulance to emergency case"""
+        ambulance = await self.get_ambulance_by_id(ambulance_id)
+        if not ambulance:
+            return None
+        
         logger.info(f"Dispatching ambulance {ambulance_id} to case {case_id}")
-        # In a real implementation, this would update ambulance status
-        # and calculate route/ETA
-        return None
+        previous_status = ambulance.status.value
+        previous_trip = (ambulance.destination_hospital_id, ambulance.assigned_case)
+        ambulance.status = AmbulanceStatus.DISPATCHED
+        ambulance.assigned_case = case_id
+        ambulance.destination_hospital_id = destination_hospital_id
+        await ambulance.save()
+        self._track_inbound(previous_trip, ambulance)
+        await dashboard_counters.record_ambulance(previous_status, ambulance.status.value)
+        await live_updates_service.publish_ambulance(ambulance)
+        return ambulance
     
     async def update_tracking(
         self,
         ambulance_id: str,
         tracking_update: AmbulanceTrackingUpdate,
-    ) -> Optional[dict]:
+    ) -> Optional[AmbulanceTracking]:
         """Update ambulance tracking data"""
-        logger.info(f"Updating tracking for ambulance {ambulance_id}")
-        # In a real implementation, this would update GPS coordinates
-        # and recalculate ETA
-        return None
+        ambulance = await self.get_ambulance_by_id(ambulance_id)
+        if not ambulance:
+            return None
+        
+        update_data = tracking_update.dict(exclude_unset=True)
+        previous_status = ambulance.status.value
+        previous_trip = (ambulance.destination_hospital_id, ambulance.assigned_case)
+        ambulance.current_lat = tracking_update.current_lat
+        ambulance.current_lng = tracking_update.current_lng
+        ambulance.current_location = {"lat": tracking_update.current_lat, "lng": tracking_update.current_lng}
+        if tracking_update.status:
+            ambulance.status = tracking_update.status
+        for key in ("eta_minutes", "route_distance_km"):
+            if key in update_data:
+                setattr(ambulance, key, update_data[key])
+        ambulance.last_update = datetime.utcnow()
+        
+        await ambulance.save()
+        self._track_inbound(previous_trip, ambulance)
+        await dashboard_counters.record_ambulance(previous_status, ambulance.status.value)
+        await live_updates_service.publish_ambulance(ambulance)
+        return ambulance
+    
+    @staticmethod
+    def _track_inbound(previous_trip: tuple, ambulance: AmbulanceTracking):
+        """Keep hospital inbound load in step with where the ambulance's patient is headed"""
+        previous_hospital, previous_case = previous_trip
+        if previous_hospital and previous_case:
+            hospital_ranking_service.clear_inbound(previous_hospital, previous_case)
+        # Returning/available/offline means the patient was handed over (or the trip ended)
+        if (
+            ambulance.status in INBOUND_AMBULANCE_STATUSES
+            and ambulance.destination_hospital_id
+            and ambulance.assigned_case
+        ):
+            hospital_ranking_service.record_inbound(ambulance.destination_hospital_id, ambulance.assigned_case)
 
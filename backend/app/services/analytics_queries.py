@@ -0,0 +1,188 @@
+"""
+Analytics queries compiled to MongoDB aggregation pipelines
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from app.models.emergency import EmergencyCase
+
+
+# Resolution time histogram edges (minutes); slower cases fall in "240+"
+RESOLUTION_BOUNDARIES = [0, 5, 10, 15, 30, 60, 120, 240]
+
+PERCENTILES = [0.5, 0.9, 0.99]
+
+
+def time_range(field: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Range filter on field; empty when unbounded"""
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+
+def _minutes_since_created(field: str) -> Dict[str, Any]:
+    return {"$divide": [{"$subtract": [f"${field}", "$created_at"]}, 60000]}
+
+
+def _count_by(field: str) -> List[Dict[str, Any]]:
+    return [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+
+def dashboard_pipeline(start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+    """Case breakdowns and timing averages for cases created in a range"""
+    match = time_range("created_at", start, end)
+    return ([{"$match": match}] if match else []) + [
+        {"$facet": {
+            "status": _count_by("status"),
+            "severity_level": _count_by("severity_level"),
+            "emergency_type": _count_by("emergency_type"),
+            "response_times": [
+                {"$group": {
+                    "_id": None,
+                    "avg_response_minutes": {"$avg": _minutes_since_created("dispatched_at")},
+                    "avg_resolution_minutes": {"$avg": _minutes_since_created("resolved_at")},
+                    "dispatched_cases": {"$sum": {"$cond": [{"$gt": ["$dispatched_at", None]}, 1, 0]}},
+                    "resolved_cases": {"$sum": {"$cond": [{"$gt": ["$resolved_at", None]}, 1, 0]}},
+                }},
+                {"$project": {"_id": 0}},
+            ],
+        }},
+    ]
+
+
+def event_buckets_pipeline(start: datetime, end: datetime, unit: str) -> List[Dict[str, Any]]:
+    """Per-bucket creations, dispatches and resolutions, each counted when it happened"""
+    window = {"$gte": start, "$lt": end}
+    
+    def durations(field: str) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {field: window}},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": f"${field}", "unit": unit}},
+                "sum": {"$sum": _minutes_since_created(field)},
+                "count": {"$sum": 1},
+                "max": {"$max": _minutes_since_created(field)},
+            }},
+        ]
+    
+    return [
+        # Each branch of the $or is served by its own index
+        {"$match": {"$or": [
+            {"created_at": window},
+            {"dispatched_at": window},
+            {"resolved_at": window},
+        ]}},
+        {"$facet": {
+            "created": [
+                {"$match": {"created_at": window}},
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": "$created_at", "unit": unit}},
+                    "count": {"$sum": 1},
+                }},
+            ],
+            "dispatched": durations("dispatched_at"),
+            "resolved": durations("resolved_at"),
+        }},
+    ]
+
+
+def resolution_pipeline(start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+    """Resolution time summary, percentiles and histogram for cases resolved in a range"""
+    match = time_range("resolved_at", start, end) or {"resolved_at": {"$ne": None}}
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "minutes": _minutes_since_created("resolved_at")}},
+        {"$facet": {
+            "summary": [
+                {"$group": {
+                    "_id": None,
+                    "resolved_cases": {"$sum": 1},
+                    "avg_resolution_time": {"$avg": "$minutes"},
+                    "max_resolution_time": {"$max": "$minutes"},
+                    "percentiles": {"$percentile": {
+                        "input": "$minutes",
+                        "p": PERCENTILES,
+                        "method": "approximate",
+                    }},
+                }},
+            ],
+            "histogram": [
+                {"$bucket": {
+                    "groupBy": "$minutes",
+                    "boundaries": RESOLUTION_BOUNDARIES,
+                    "default": f"{RESOLUTION_BOUNDARIES[-1]}+",
+                    "output": {"count": {"$sum": 1}},
+                }},
+            ],
+        }},
+    ]
+
+
+def plan_stages(explain: Dict[str, Any]) -> List[str]:
+    """Every plan stage name in an explain() result, however the server nests them"""
+    stages = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "stage" and isinstance(value, str):
+                stages.append(value)
+            elif key != "rejectedPlans":
+                stages.extend(plan_stages(value))
+    elif isinstance(explain, list):
+        for item in explain:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+class AnalyticsQueries:
+    """Runs analytics pipelines so only aggregated results leave MongoDB"""
+    
+    async def _aggregate_one(self, pipeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+        result = await EmergencyCase.get_motor_collection().aggregate(pipeline).to_list(length=1)
+        return result[0] if result else {}
+    
+    async def dashboard(self, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+        """Counts by status, severity and type plus timing averages"""
+        facets = await self._aggregate_one(dashboard_pipeline(start, end))
+        result = {
+            field: {row["_id"]: row["count"] for row in facets.get(field, [])}
+            for field in ("status", "severity_level", "emergency_type")
+        }
+        timings = facets.get("response_times") or [{}]
+        result["response_times"] = timings[0]
+        return result
+    
+    async def event_buckets(self, start: datetime, end: datetime, unit: str) -> Dict[str, List[dict]]:
+        """Created, dispatched and resolved groups per time bucket"""
+        return await self._aggregate_one(event_buckets_pipeline(start, end, unit))
+    
+    async def resolution(self, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+        """Resolution time summary and histogram"""
+        facets = await self._aggregate_one(resolution_pipeline(start, end))
+        summary = (facets.get("summary") or [{}])[0]
+        percentiles = summary.get("percentiles") or [None] * len(PERCENTILES)
+        
+        result = {
+            "resolved_cases": summary.get("resolved_cases", 0),
+            "avg_resolution_time": summary.get("avg_resolution_time"),
+            "max_resolution_time": summary.get("max_resolution_time"),
+        }
+        for p, value in zip(PERCENTILES, percentiles):
+            result[f"p{round(p * 100)}_resolution_time"] = value
+        result["histogram"] = {str(row["_id"]): row["count"] for row in facets.get("histogram", [])}
+        return result
+    
+    async def explain(self, pipeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Query plan for a pipeline against Emergency_Cases"""
+        collection = EmergencyCase.get_motor_collection()
+        return await collection.database.command(
+            "aggregate",
+            collection.name,
+            pipeline=pipeline,
+            explain=True,
+        )
+
+
+analytics_queries = AnalyticsQueries()
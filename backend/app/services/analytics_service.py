@@ -1,9 +1,75 @@
 """
 Analytics service
 """
-from typing import Optional
-from datetime import datetime
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
 from loguru import logger
+import heapq
+
+from app.core.config import settings
+from app.models.report import ReportJob, ReportStatus
+from app.models.rollup import RollupGranularity
+from app.services.analytics_queries import analytics_queries
+from app.services.dashboard_counters import dashboard_counters, summarize_case_counts
+from app.services.hospital_ranking_service import hospital_ranking_service
+from app.services.live_updates_service import live_updates_service
+from app.services.report_service import export_cases_csv, report_service
+from app.services.rollup_service import fill_series, granularity_for_range, rollup_service
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return total / count if count else None
+
+
+# Trend metrics computed from rollup rows
+TREND_METRICS: Dict[str, Callable[[dict], Optional[float]]] = {
+    "case_count": lambda row: row["case_count"],
+    "resolved_count": lambda row: row["resolution_time_count"],
+    "avg_response_time": lambda row: _average(row["response_time_sum"], row["response_time_count"]),
+    "avg_resolution_time": lambda row: _average(row["resolution_time_sum"], row["resolution_time_count"]),
+}
+
+
+def summarize_trend(values: List[Optional[float]]) -> dict:
+    """Trend direction from the mean of the first half of the range against the second
+    
+    values is one entry per time bucket; None marks a bucket with no value.
+    """
+    middle = len(values) // 2
+    before = [value for value in values[:middle] if value is not None]
+    after = [value for value in values[middle:] if value is not None]
+    if not before or not after:
+        return {"trend": "stable", "change_percentage": 0.0}
+    
+    before = sum(before) / len(before)
+    after = sum(after) / len(after)
+    change_percentage = ((after - before) / before) * 100 if before > 0 else 0.0
+    
+    if change_percentage > 5:
+        trend = "increasing"
+    elif change_percentage < -5:
+        trend = "decreasing"
+    else:
+        trend = "stable"
+    return {"trend": trend, "change_percentage": round(change_percentage, 2)}
+
+
+def report_job_payload(job: ReportJob) -> dict:
+    """Public view of a report job"""
+    completed = job.status == ReportStatus.COMPLETED
+    return {
+        "report_id": job.job_id,
+        "report_type": job.report_type,
+        "format": job.format,
+        "status": job.status.value,
+        "start_date": job.start_date,
+        "end_date": job.end_date,
+        "error": job.error,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "download_url": f"{settings.API_V1_PREFIX}/analytics/reports/jobs/{job.job_id}/download" if completed else None,
+    }
 
 
 class AnalyticsService:
@@ -15,21 +81,68 @@ class AnalyticsService:
         end_date: Optional[datetime] = None,
     ) -> dict:
         """Get dashboard analytics data"""
-        logger.info("Fetching dashboard data")
+        data = dashboard_counters.snapshot()
         
-        # In a real implementation, this would aggregate data from multiple collections
+        if start_date or end_date:
+            # Date-bounded views fall back to a single aggregation over the range
+            counts = await analytics_queries.dashboard(start_date, end_date)
+            data.update(summarize_case_counts(
+                Counter(counts["status"]),
+                Counter(counts["severity_level"]),
+                Counter(counts["emergency_type"]),
+            ))
+            data["response_times"] = counts["response_times"]
+        else:
+            data["response_times"] = await self._response_times()
+        data["hospital_load"] = [
+            {
+                "hospital_id": hospital.hospital_id,
+                "hospital_name": hospital.hospital_name,
+                "available_beds": hospital.available_beds,
+                "icu_available": hospital.icu_available,
+                "inbound": hospital.inbound,
+            }
+            for hospital in hospital_ranking_service.hospitals.values()
+            if hospital.is_active
+        ]
+        data["recent_cases"] = heapq.nlargest(
+            10,
+            live_updates_service.state[live_updates_service.CASES].values(),
+            key=lambda case: case.get("created_at") or "",
+        )
+        return data
+    
+    async def _response_times(self) -> dict:
+        """Average response and resolution times over the last 24 hourly rollups"""
+        end = datetime.utcnow()
+        rows = await rollup_service.get_series(RollupGranularity.HOUR, end - timedelta(hours=24), end)
+        response_count = sum(row["response_time_count"] for row in rows)
+        resolution_count = sum(row["resolution_time_count"] for row in rows)
         return {
-            "total_cases": 0,
-            "active_cases": 0,
-            "resolved_cases": 0,
-            "cases_by_severity": {},
-            "cases_by_type": {},
-            "response_times": {},
-            "ambulance_status": {},
-            "hospital_load": [],
-            "recent_cases": [],
+            "avg_response_minutes": _average(sum(row["response_time_sum"] for row in rows), response_count),
+            "avg_resolution_minutes": _average(sum(row["resolution_time_sum"] for row in rows), resolution_count),
+            "dispatched_cases": response_count,
+            "resolved_cases": resolution_count,
         }
     
+    async def get_resolution_metrics(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> dict:
+        """Resolution time summary, percentiles and histogram"""
+        return await analytics_queries.resolution(start_date, end_date)
+    
+    def export_cases_csv(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        compress: bool = False,
+        batch_size: int = 2000,
+    ) -> AsyncIterator[bytes]:
+        """CSV chunks for cases created in a range, streamed from the cursor"""
+        return export_cases_csv(start_date, end_date, compress=compress, batch_size=batch_size)
+    
     async def generate_report(
         self,
         report_type: str,
@@ -37,16 +150,9 @@ class AnalyticsService:
         end_date: datetime,
         format: str = "pdf",
     ) -> dict:
-        """Generate analytics report"""
-        logger.info(f"Generating {report_type} report in {format} format")
-        
-        # In a real implementation, this would use ReportLab for PDF generation
-        return {
-            "report_id": "REPORT-123",
-            "report_type": report_type,
-            "format": format,
-            "download_url": "/reports/REPORT-123.pdf",
-        }
+        """Queue a report render, reusing a cached or in-flight one for the same request"""
+        job = await report_service.submit(report_type, format, start_date, end_date)
+        return report_job_payload(job)
     
     async def analyze_trends(
         self,
@@ -54,14 +160,27 @@ class AnalyticsService:
         start_date: datetime,
         end_date: datetime,
     ) -> dict:
-        """Analyze trends"""
-        logger.info(f"Analyzing trends for metric: {metric}")
+        """Analyze trends from pre-aggregated rollups"""
+        if metric not in TREND_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        
+        granularity = granularity_for_range(start_date, end_date)
+        logger.info(f"Analyzing trends for metric: {metric} ({granularity.value} rollups)")
+        rows = fill_series(
+            await rollup_service.get_series(granularity, start_date, end_date),
+            granularity,
+            start_date,
+            end_date,
+        )
+        values = [TREND_METRICS[metric](row) for row in rows]
         
-        # In a real implementation, this would perform time-series analysis
         return {
             "metric": metric,
-            "data_points": [],
-            "trend": "stable",
-            "change_percentage": 0.0,
+            "data_points": [
+                {"date": row["bucket_start"], "value": value}
+                for row, value in zip(rows, values)
+                if value is not None
+            ],
+            **summarize_trend(values),
         }
 
@@ -0,0 +1,160 @@
+"""
+Incrementally maintained dashboard counters
+"""
+from collections import Counter
+from typing import Any, Dict, Optional
+from loguru import logger
+import asyncio
+
+from app.core.config import settings
+from app.models.ambulance import AmbulanceTracking
+from app.models.emergency import EmergencyCase, EmergencyStatus
+from app.services.websocket_service import WebSocketService, websocket_service
+
+
+ACTIVE_STATUSES = (
+    EmergencyStatus.OPEN.value,
+    EmergencyStatus.DISPATCHED.value,
+    EmergencyStatus.IN_PROGRESS.value,
+)
+
+
+def case_facets(case: Any) -> Dict[str, str]:
+    """The fields a case is counted by, as plain strings"""
+    if isinstance(case, dict):
+        return {
+            "status": case["status"],
+            "severity_level": case["severity_level"],
+            "emergency_type": case["emergency_type"],
+        }
+    return {
+        "status": case.status.value,
+        "severity_level": case.severity_level.value,
+        "emergency_type": case.emergency_type.value,
+    }
+
+
+def summarize_case_counts(by_status: Counter, by_severity: Counter, by_type: Counter) -> Dict[str, Any]:
+    """Dashboard totals and breakdowns from per-facet counters"""
+    return {
+        "total_cases": sum(by_status.values()),
+        "active_cases": sum(by_status[status] for status in ACTIVE_STATUSES),
+        "resolved_cases": by_status[EmergencyStatus.RESOLVED.value],
+        "cases_by_status": {key: value for key, value in by_status.items() if value},
+        "cases_by_severity": {key: value for key, value in by_severity.items() if value},
+        "cases_by_type": {key: value for key, value in by_type.items() if value},
+    }
+
+
+class DashboardCounters:
+    """Case and ambulance counts kept current from write events, reconciled periodically"""
+    
+    EVENT_TOPIC = "counters"
+    
+    def __init__(self, websocket_service: WebSocketService, reconcile_interval: int = 300):
+        self.websocket_service = websocket_service
+        self.reconcile_interval = reconcile_interval
+        self.cases_by_status: Counter = Counter()
+        self.cases_by_severity: Counter = Counter()
+        self.cases_by_type: Counter = Counter()
+        self.ambulance_status: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        websocket_service.on_event(self.EVENT_TOPIC, self._apply)
+    
+    async def count_cases(self, match: Optional[Dict[str, Any]] = None) -> Dict[str, Counter]:
+        """Count cases by status, severity and type in one aggregation"""
+        pipeline = [{"$match": match}] if match else []
+        pipeline.append({"$facet": {
+            field: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+            for field in ("status", "severity_level", "emergency_type")
+        }})
+        result = await EmergencyCase.get_motor_collection().aggregate(pipeline).to_list(length=1)
+        facets = result[0] if result else {}
+        return {
+            field: Counter({row["_id"]: row["count"] for row in facets.get(field, [])})
+            for field in ("status", "severity_level", "emergency_type")
+        }
+    
+    async def reconcile(self):
+        """Recount from the collections, correcting any drift"""
+        case_counts = await self.count_cases()
+        ambulance_counts = await AmbulanceTracking.get_motor_collection().aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]).to_list(length=None)
+        
+        self.cases_by_status = case_counts["status"]
+        self.cases_by_severity = case_counts["severity_level"]
+        self.cases_by_type = case_counts["emergency_type"]
+        self.ambulance_status = Counter({row["_id"]: row["count"] for row in ambulance_counts})
+        logger.info(f"Reconciled dashboard counters: {sum(self.cases_by_status.values())} cases")
+    
+    async def record_case(self, before: Optional[Dict[str, str]], after: Optional[Dict[str, str]]):
+        """Count a case transition (before=None for creates, after=None for deletes)"""
+        if before == after:
+            return
+        await self.websocket_service.publish_event(
+            self.EVENT_TOPIC,
+            {"kind": "case", "before": before, "after": after},
+        )
+    
+    async def record_ambulance(self, before: Optional[str], after: Optional[str]):
+        """Count an ambulance status transition"""
+        if before == after:
+            return
+        await self.websocket_service.publish_event(
+            self.EVENT_TOPIC,
+            {"kind": "ambulance", "before": before, "after": after},
+        )
+    
+    def _apply(self, event: Dict[str, Any]):
+        """Apply a transition to the counters on every worker"""
+        before, after = event["before"], event["after"]
+        if event["kind"] == "ambulance":
+            if before:
+                self.ambulance_status[before] -= 1
+            if after:
+                self.ambulance_status[after] += 1
+            return
+        
+        for counter, field in (
+            (self.cases_by_status, "status"),
+            (self.cases_by_severity, "severity_level"),
+            (self.cases_by_type, "emergency_type"),
+        ):
+            if before:
+                counter[before[field]] -= 1
+            if after:
+                counter[after[field]] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counts; cost does not depend on history size"""
+        return {
+            **summarize_case_counts(self.cases_by_status, self.cases_by_severity, self.cases_by_type),
+            "ambulance_status": {key: value for key, value in self.ambulance_status.items() if value},
+        }
+    
+    async def _run(self):
+        """Reconcile counters every interval"""
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling dashboard counters: {e}")
+    
+    def start(self):
+        """Start periodic reconciliation"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop periodic reconciliation"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+dashboard_counters = DashboardCounters(
+    websocket_service,
+    reconcile_interval=settings.DASHBOARD_RECONCILE_SECONDS,
+)
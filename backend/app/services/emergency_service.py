@@ -6,7 +6,11 @@ from datetime import datetime
 import uuid
 
 from app.models.emergency import EmergencyCase, EmergencyStatus, SeverityLevel, EmergencyType
-from app.schemas.emergency import EmergencyCaseCreate, EmergencyCaseUpdate
+from app.models.transcript import CallerTranscript
+from app.schemas.emergency import EmergencyCaseCreate, EmergencyCaseUpdate, EmergencyCaseResponse
+from app.services.dashboard_counters import dashboard_counters, case_facets
+from app.services.live_updates_service import live_updates_service
+from app.utils.pagination import keyset_query, keyset_sort, next_cursor, count_cache
 from loguru import logger
 
 
@@ -23,6 +27,8 @@ class EmergencyService:
         )
         
         await case.insert()
+        await dashboard_counters.record_case(None, case_facets(case))
+        await live_updates_service.publish_case(case)
         logger.info(f"Created emergency case: {case_id}")
         return case
     
@@ -30,15 +36,22 @@ class EmergencyService:
         """Get emergency case by ID"""
         return await EmergencyCase.find_one(EmergencyCase.case_id == case_id)
     
+    async def get_transcript(self, case_id: str) -> Optional[CallerTranscript]:
+        """Get the most recent caller transcript for a case"""
+        return await CallerTranscript.find(
+            CallerTranscript.case_id == case_id
+        ).sort(-CallerTranscript.created_at).first_or_none()
+    
     async def list_cases(
         self,
         status: Optional[EmergencyStatus] = None,
         severity: Optional[SeverityLevel] = None,
         emergency_type: Optional[EmergencyType] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
+        include_total: bool = False,
     ) -> dict:
-        """List emergency cases with filters"""
+        """List emergency cases with filters, newest first, using keyset pagination"""
         query = {}
         
         if status:
@@ -48,13 +61,65 @@ class EmergencyService:
         if emergency_type:
             query["emergency_type"] = emergency_type
         
-        cases = await EmergencyCase.find(query).skip(skip).limit(limit).to_list()
-        total = await EmergencyCase.find(query).count()
+        cases = await EmergencyCase.find(
+            keyset_query(query, cursor)
+        ).sort(keyset_sort()).limit(limit).to_list()
+        
+        total = None
+        if include_total:
+            total = await count_cache.count(EmergencyCase.get_motor_collection(), query)
+        
+        return {
+            "cases": cases,
+            "next_cursor": next_cursor(cases, limit),
+            "total": total,
+            "limit": limit,
+        }
+    
+    async def list_cases_lean(
+        self,
+        status: Optional[EmergencyStatus] = None,
+        severity: Optional[SeverityLevel] = None,
+        emergency_type: Optional[EmergencyType] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include_total: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        """List emergency cases as raw projected dicts, skipping model construction"""
+        query = {}
+        
+        if status:
+            query["status"] = status.value
+        if severity:
+            query["severity_level"] = severity.value
+        if emergency_type:
+            query["emergency_type"] = emergency_type.value
+        
+        # case_id and created_at are always returned; created_at/_id also feed the cursor
+        projection = {field: 1 for field in fields or EmergencyCaseResponse.model_fields}
+        projection.update({"case_id": 1, "created_at": 1})
+        
+        collection = EmergencyCase.get_motor_collection()
+        cases = await collection.find(
+            keyset_query(query, cursor),
+            projection=projection,
+            sort=keyset_sort(),
+            limit=limit,
+        ).to_list(length=limit)
+        
+        next_page = next_cursor(cases, limit)
+        for case in cases:
+            del case["_id"]
+        
+        total = None
+        if include_total:
+            total = await count_cache.count(collection, query)
         
         return {
             "cases": cases,
+            "next_cursor": next_page,
             "total": total,
-            "skip": skip,
             "limit": limit,
         }
     
@@ -70,11 +135,19 @@ class EmergencyService:
         
         update_data = case_data.dict(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
+        before = case_facets(case)
         
         for key, value in update_data.items():
             setattr(case, key, value)
+        # Event times feed the response/resolution rollups
+        if case.status == EmergencyStatus.DISPATCHED and case.dispatched_at is None:
+            case.dispatched_at = update_data["updated_at"]
+        if case.status == EmergencyStatus.RESOLVED and case.resolved_at is None:
+            case.resolved_at = update_data["updated_at"]
         
         await case.save()
+        await dashboard_counters.record_case(before, case_facets(case))
+        await live_updates_service.publish_case(case)
         logger.info(f"Updated emergency case: {case_id}")
         return case
     
@@ -85,6 +158,8 @@ class EmergencyService:
             return False
         
         await case.delete()
+        await dashboard_counters.record_case(case_facets(case), None)
+        await live_updates_service.remove(live_updates_service.CASES, case_id)
         logger.info(f"Deleted emergency case: {case_id}")
         return True
     
@@ -94,11 +169,14 @@ class EmergencyService:
         if not case:
             return None
         
+        before = case_facets(case)
         case.status = EmergencyStatus.RESOLVED
         case.resolved_at = datetime.utcnow()
         case.updated_at = datetime.utcnow()
         
         await case.save()
+        await dashboard_counters.record_case(before, case_facets(case))
+        await live_updates_service.publish_case(case)
         logger.info(f"Resolved emergency case: {case_id}")
         return case
 
@@ -0,0 +1,249 @@
+"""
+Hospital capacity ranking service
+"""
+import asyncio
+from typing import Optional, List, Dict, Any, Iterable, Set
+from math import radians, cos, sin, asin, sqrt
+from datetime import datetime
+from loguru import logger
+
+from app.core.config import settings
+from app.models.ambulance import AmbulanceStatus, AmbulanceTracking
+from app.models.hospital import HospitalResource
+from app.models.reservation import HospitalReservation, ReservationStatus
+
+
+# Hospital fields the snapshot reads; projections feeding apply_update use these
+RANKING_FIELDS = {
+    "_id": 0,
+    "hospital_id": 1,
+    "hospital_name": 1,
+    "location_lat": 1,
+    "location_lng": 1,
+    "available_beds": 1,
+    "icu_available": 1,
+    "specialties": 1,
+    "equipment_available": 1,
+    "is_active": 1,
+}
+
+# Ambulance states in which a patient may still be headed to the destination hospital
+INBOUND_AMBULANCE_STATUSES = (
+    AmbulanceStatus.DISPATCHED,
+    AmbulanceStatus.EN_ROUTE,
+    AmbulanceStatus.ON_SCENE,
+    AmbulanceStatus.TRANSPORTING,
+)
+
+
+class HospitalCapacitySnapshot:
+    """In-memory capacity entry for a single hospital"""
+    
+    __slots__ = (
+        "hospital_id",
+        "hospital_name",
+        "lat",
+        "lng",
+        "available_beds",
+        "icu_available",
+        "specialties",
+        "equipment",
+        "is_active",
+        "inbound_cases",
+        "last_updated",
+    )
+    
+    def __init__(self, hospital: Dict[str, Any]):
+        self.hospital_id: str = hospital["hospital_id"]
+        # Cases routed here (dispatch or bed hold); a set, so both paths count a case once
+        self.inbound_cases: Set[str] = set()
+        self.apply(hospital)
+    
+    @property
+    def inbound(self) -> int:
+        return len(self.inbound_cases)
+    
+    def apply(self, fields: Dict[str, Any]):
+        """Apply a partial resource update"""
+        if "hospital_name" in fields:
+            self.hospital_name = fields["hospital_name"]
+        if "location_lat" in fields:
+            self.lat = fields["location_lat"]
+        if "location_lng" in fields:
+            self.lng = fields["location_lng"]
+        if fields.get("available_beds") is not None:
+            self.available_beds = fields["available_beds"]
+        if fields.get("icu_available") is not None:
+            self.icu_available = fields["icu_available"]
+        if "specialties" in fields:
+            self.specialties = frozenset(s.lower() for s in fields["specialties"] or [])
+        if "equipment_available" in fields:
+            self.equipment = frozenset(e.lower() for e in fields["equipment_available"] or [])
+        if "is_active" in fields:
+            self.is_active = fields["is_active"]
+        self.last_updated = fields.get("last_updated") or datetime.utcnow()
+
+
+class HospitalRankingService:
+    """Ranks hospitals for patient routing from an in-memory capacity snapshot"""
+    
+    def __init__(self, reload_interval: int = 60):
+        self.hospitals: Dict[str, HospitalCapacitySnapshot] = {}
+        self.avg_speed_kmh = 40.0
+        self.road_factor = 1.3
+        # Minutes added to ETA per inbound patient relative to free capacity
+        self.load_penalty_minutes = 10.0
+        # Local events only see this worker's writes; reloads pick up everyone else's
+        self.reload_interval = reload_interval
+        self._task: Optional[asyncio.Task] = None
+    
+    async def load(self):
+        """Build the snapshot with a single scan of active hospitals"""
+        hospitals = await HospitalResource.find(HospitalResource.is_active == True).to_list()
+        # Inbound load comes from open bed holds and ambulances still carrying patients
+        holds = await HospitalReservation.get_motor_collection().find(
+            {"status": ReservationStatus.HELD.value},
+            projection={"_id": 0, "hospital_id": 1, "case_id": 1},
+        ).to_list(length=None)
+        trips = await AmbulanceTracking.get_motor_collection().find(
+            {
+                "status": {"$in": [status.value for status in INBOUND_AMBULANCE_STATUSES]},
+                "destination_hospital_id": {"$ne": None},
+                "assigned_case": {"$ne": None},
+            },
+            projection={"_id": 0, "destination_hospital_id": 1, "assigned_case": 1},
+        ).to_list(length=None)
+        
+        # Swap in the new snapshot without awaiting, so requests never rank a half-built one
+        self.hospitals = {}
+        for hospital in hospitals:
+            self.upsert(hospital.dict())
+        for hold in holds:
+            self.record_inbound(hold["hospital_id"], hold["case_id"])
+        for trip in trips:
+            self.record_inbound(trip["destination_hospital_id"], trip["assigned_case"])
+        logger.info(f"Loaded capacity snapshot for {len(self.hospitals)} hospitals")
+    
+    def upsert(self, hospital: Dict[str, Any]):
+        """Insert or fully replace a hospital entry"""
+        entry = self.hospitals.get(hospital["hospital_id"])
+        if entry:
+            entry.apply(hospital)
+        else:
+            defaults = {
+                "hospital_name": hospital["hospital_id"],
+                "location_lat": None,
+                "location_lng": None,
+                "available_beds": 0,
+                "icu_available": 0,
+                "specialties": [],
+                "equipment_available": [],
+                "is_active": True,
+            }
+            self.hospitals[hospital["hospital_id"]] = HospitalCapacitySnapshot({**defaults, **hospital})
+    
+    def apply_update(self, hospital_id: str, fields: Dict[str, Any]):
+        """Apply an incremental resource update, adding hospitals the snapshot hasn't seen"""
+        entry = self.hospitals.get(hospital_id)
+        if entry:
+            entry.apply(fields)
+        else:
+            # Activated (or created) after startup
+            self.upsert({**fields, "hospital_id": hospital_id})
+    
+    def record_inbound(self, hospital_id: str, case_id: str):
+        """Count a case as headed to a hospital"""
+        entry = self.hospitals.get(hospital_id)
+        if entry:
+            entry.inbound_cases.add(case_id)
+    
+    def clear_inbound(self, hospital_id: str, case_id: str):
+        """Stop counting a case that arrived or was routed elsewhere"""
+        entry = self.hospitals.get(hospital_id)
+        if entry:
+            entry.inbound_cases.discard(case_id)
+    
+    def rank(
+        self,
+        lat: float,
+        lng: float,
+        severity: str = "medium",
+        specialties: Optional[Iterable[str]] = None,
+        equipment: Optional[Iterable[str]] = None,
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Rank hospitals able to take a patient, best first"""
+        needs_icu = severity == "critical"
+        required_specialties = frozenset(s.lower() for s in specialties or [])
+        required_equipment = frozenset(e.lower() for e in equipment or [])
+        
+        ranked = []
+        for entry in self.hospitals.values():
+            if not entry.is_active or entry.lat is None or entry.lng is None:
+                continue
+            
+            capacity = entry.icu_available if needs_icu else entry.available_beds
+            if capacity <= 0:
+                continue
+            if not required_specialties <= entry.specialties:
+                continue
+            if not required_equipment <= entry.equipment:
+                continue
+            
+            eta_minutes = (
+                self._distance_km(lat, lng, entry.lat, entry.lng)
+                * self.road_factor / self.avg_speed_kmh * 60
+            )
+            load = entry.inbound / capacity
+            score = eta_minutes + load * self.load_penalty_minutes
+            
+            ranked.append((score, eta_minutes, load, entry))
+        
+        ranked.sort(key=lambda r: r[0])
+        
+        return [
+            {
+                "hospital_id": entry.hospital_id,
+                "hospital_name": entry.hospital_name,
+                "score": round(score, 2),
+                "eta_minutes": round(eta_minutes, 1),
+                "available_beds": entry.available_beds,
+                "icu_available": entry.icu_available,
+                "inbound_patients": entry.inbound,
+                "load": round(load, 2),
+            }
+            for score, eta_minutes, load, entry in ranked[:limit]
+        ]
+    
+    async def _run(self):
+        """Reload the snapshot every interval"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error reloading hospital capacity snapshot: {e}")
+    
+    def start(self):
+        """Start periodic reloads"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop periodic reloads"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    @staticmethod
+    def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        """Haversine distance in kilometers"""
+        lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
+        a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+        return 2 * 6371 * asin(sqrt(a))
+
+
+# Process-wide snapshot shared by all requests
+hospital_ranking_service = HospitalRankingService(
+    reload_interval=settings.HOSPITAL_SNAPSHOT_RELOAD_SECONDS,
+)
@@ -1,8 +1,21 @@
 """
 Hospital service
 """
-from typing import Optional
+from typing import Optional, List
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import uuid
+
+from app.models.hospital import HospitalResource
+from app.models.reservation import (
+    HospitalReservation,
+    ReservationResource,
+    ReservationStatus,
+)
 from app.schemas.hospital import HospitalResourceUpdate
+from app.services.hospital_ranking_service import RANKING_FIELDS, hospital_ranking_service
+from app.utils.pagination import keyset_query, keyset_sort, next_cursor, count_cache
 from loguru import logger
 
 
@@ -12,30 +25,225 @@ class HospitalService:
     async def list_hospitals(
         self,
         is_active: Optional[bool] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
+        include_total: bool = False,
     ) -> dict:
-        """List all hospitals"""
-        # In a real implementation, this would query the database
+        """List all hospitals using keyset pagination"""
+        query = {}
+        if is_active is not None:
+            query["is_active"] = is_active
+        
+        hospitals = await HospitalResource.find(
+            keyset_query(query, cursor)
+        ).sort(keyset_sort()).limit(limit).to_list()
+        
+        total = None
+        if include_total:
+            total = await count_cache.count(HospitalResource.get_motor_collection(), query)
+        
         return {
-            "hospitals": [],
-            "total": 0,
-            "skip": skip,
+            "hospitals": hospitals,
+            "next_cursor": next_cursor(hospitals, limit),
+            "total": total,
             "limit": limit,
         }
     
-    async def get_hospital_by_id(self, hospital_id: str) -> Optional[dict]:
+    async def get_hospital_by_id(self, hospital_id: str) -> Optional[HospitalResource]:
         """Get hospital by ID"""
-        # In a real implementation, this would query the database
-        return None
+        return await HospitalResource.find_one(HospitalResource.hospital_id == hospital_id)
     
     async def update_resources(
         self,
         hospital_id: str,
         resource_update: HospitalResourceUpdate,
-    ) -> Optional[dict]:
+    ) -> Optional[HospitalResource]:
         """Update hospital resource availability"""
         logger.info(f"Updating resources for hospital {hospital_id}")
-        # In a real implementation, this would update the database
-        return None
-
+        hospital = await HospitalResource.find_one(HospitalResource.hospital_id == hospital_id)
+        if not hospital:
+            return None
+        
+        update_data = resource_update.dict(exclude_unset=True)
+        update_data["last_updated"] = datetime.utcnow()
+        
+        for key, value in update_data.items():
+            setattr(hospital, key, value)
+        
+        await hospital.save()
+        hospital_ranking_service.upsert(hospital.dict())
+        return hospital
+    
+    async def rank_hospitals(
+        self,
+        lat: float,
+        lng: float,
+        severity: str = "medium",
+        specialties: Optional[List[str]] = None,
+        equipment: Optional[List[str]] = None,
+        limit: int = 5,
+    ) -> dict:
+        """Rank hospitals for patient routing"""
+        hospitals = hospital_ranking_service.rank(
+            lat=lat,
+            lng=lng,
+            severity=severity,
+            specialties=specialties,
+            equipment=equipment,
+            limit=limit,
+        )
+        return {"hospitals": hospitals}
+    
+    
+    async def reserve_resource(
+        self,
+        hospital_id: str,
+        case_id: str,
+        resource_type: ReservationResource = ReservationResource.BED,
+        ttl_seconds: int = 900,
+    ) -> Optional[HospitalReservation]:
+        """Atomically hold a bed or ICU bed; returns None when none are free
+        
+        A case holds at most one bed per hospital: a repeat call refreshes and
+        returns the existing hold instead of taking more capacity.
+        """
+        field = self._capacity_field(resource_type)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        
+        existing = await self._refresh_hold(hospital_id, case_id, expires_at)
+        if existing:
+            return existing
+        
+        # Conditional decrement: only succeeds while capacity is still positive,
+        # so concurrent callers can never take the same last bed
+        hospital = await HospitalResource.get_motor_collection().find_one_and_update(
+            {"hospital_id": hospital_id, "is_active": True, field: {"$gt": 0}},
+            {"$inc": {field: -1}, "$set": {"last_updated": now}},
+            projection=RANKING_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if not hospital:
+            logger.info(f"No {resource_type.value} capacity to reserve at hospital {hospital_id}")
+            return None
+        
+        hospital_ranking_service.apply_update(hospital_id, hospital)
+        
+        reservation = HospitalReservation(
+            reservation_id=f"RES-{uuid.uuid4().hex[:8].upper()}",
+            hospital_id=hospital_id,
+            case_id=case_id,
+            resource_type=resource_type,
+            expires_at=expires_at,
+        )
+        try:
+            await reservation.insert()
+        except DuplicateKeyError:
+            # A concurrent call for the same case won the hold
+            await self._restore_capacity(hospital_id, resource_type)
+            return await self._refresh_hold(hospital_id, case_id, expires_at)
+        except Exception:
+            await self._restore_capacity(hospital_id, resource_type)
+            raise
+        hospital_ranking_service.record_inbound(hospital_id, case_id)
+        
+        logger.info(f"Reserved {resource_type.value} at hospital {hospital_id} for case {case_id}")
+        return reservation
+    
+    async def confirm_reservation(self, reservation_id: str) -> Optional[HospitalReservation]:
+        """Mark a held reservation as used by an arriving patient"""
+        reservation = await self._transition(reservation_id, ReservationStatus.CONFIRMED)
+        if reservation:
+            hospital_ranking_service.clear_inbound(reservation.hospital_id, reservation.case_id)
+        return reservation
+    
+    async def release_reservation(self, reservation_id: str) -> Optional[HospitalReservation]:
+        """Cancel a held reservation and return its capacity"""
+        reservation = await self._transition(reservation_id, ReservationStatus.RELEASED)
+        if reservation:
+            hospital_ranking_service.clear_inbound(reservation.hospital_id, reservation.case_id)
+            await self._restore_capacity(reservation.hospital_id, reservation.resource_type)
+        return reservation
+    
+    async def release_expired_reservations(self) -> int:
+        """Expire holds past their TTL and return their capacity"""
+        collection = HospitalReservation.get_motor_collection()
+        released = 0
+        
+        while True:
+            now = datetime.utcnow()
+            doc = await collection.find_one_and_update(
+                {"status": ReservationStatus.HELD.value, "expires_at": {"$lte": now}},
+                {"$set": self._finished_fields(ReservationStatus.EXPIRED, now)},
+                return_document=ReturnDocument.AFTER,
+            )
+            if not doc:
+                break
+            hospital_ranking_service.clear_inbound(doc["hospital_id"], doc["case_id"])
+            await self._restore_capacity(doc["hospital_id"], ReservationResource(doc["resource_type"]))
+            released += 1
+        
+        if released:
+            logger.info(f"Released {released} expired hospital reservations")
+        return released
+    
+    async def _transition(
+        self,
+        reservation_id: str,
+        status: ReservationStatus,
+    ) -> Optional[HospitalReservation]:
+        """Move a held reservation to a final status exactly once"""
+        doc = await HospitalReservation.get_motor_collection().find_one_and_update(
+            {"reservation_id": reservation_id, "status": ReservationStatus.HELD.value},
+            {"$set": self._finished_fields(status, datetime.utcnow())},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return None
+        return HospitalReservation.parse_obj(doc)
+    
+    async def _refresh_hold(
+        self,
+        hospital_id: str,
+        case_id: str,
+        expires_at: datetime,
+    ) -> Optional[HospitalReservation]:
+        """Extend a case's existing hold at a hospital, if it has one"""
+        doc = await HospitalReservation.get_motor_collection().find_one_and_update(
+            {"hospital_id": hospital_id, "case_id": case_id, "status": ReservationStatus.HELD.value},
+            {"$set": {"expires_at": expires_at, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return None
+        hospital_ranking_service.record_inbound(hospital_id, case_id)
+        return HospitalReservation.parse_obj(doc)
+    
+    async def _restore_capacity(self, hospital_id: str, resource_type: ReservationResource):
+        """Give a held bed back to the hospital"""
+        field = self._capacity_field(resource_type)
+        hospital = await HospitalResource.get_motor_collection().find_one_and_update(
+            {"hospital_id": hospital_id},
+            {"$inc": {field: 1}, "$set": {"last_updated": datetime.utcnow()}},
+            projection=RANKING_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if hospital:
+            hospital_ranking_service.apply_update(hospital_id, hospital)
+    
+    @staticmethod
+    def _capacity_field(resource_type: ReservationResource) -> str:
+        """Hospital capacity field consumed by a reservation"""
+        if resource_type == ReservationResource.ICU:
+            return "icu_available"
+        return "available_beds"
+    
+    @staticmethod
+    def _finished_fields(status: ReservationStatus, now: datetime) -> dict:
+        """Fields set when a reservation leaves the held state"""
+        return {
+            "status": status.value,
+            "updated_at": now,
+            # Finished holds are purged by the TTL index after a day
+            "purge_at": now + timedelta(days=1),
+        }
@@ -0,0 +1,199 @@
+"""
+Live dashboard state: snapshots on subscribe and batched per-entity deltas
+"""
+from typing import Any, Dict, Optional
+from fastapi import WebSocket
+from loguru import logger
+import asyncio
+import orjson
+
+from app.core.config import settings
+from shared.responses import dumps
+from app.models.ambulance import AmbulanceTracking
+from app.models.emergency import EmergencyCase, EmergencyStatus
+from app.services.websocket_service import WebSocketService, websocket_service
+
+
+CASE_FIELDS = (
+    "case_id",
+    "emergency_type",
+    "severity_level",
+    "status",
+    "location_lat",
+    "location_lng",
+    "location_address",
+    "description",
+    "assigned_ambulance_id",
+    "assigned_hospital_id",
+    "created_at",
+    "updated_at",
+)
+
+AMBULANCE_FIELDS = (
+    "ambulance_id",
+    "ambulance_number",
+    "status",
+    "current_lat",
+    "current_lng",
+    "assigned_case",
+    "destination_hospital_id",
+    "eta_minutes",
+    "last_update",
+)
+
+# Closed cases leave the live "cases" channel
+CLOSED_CASE_STATUSES = {EmergencyStatus.RESOLVED.value, EmergencyStatus.CANCELLED.value}
+
+
+def _json_ready(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize values (datetimes, enums) to their JSON form so comparisons are stable"""
+    return orjson.loads(dumps(fields))
+
+
+class LiveUpdatesService:
+    """Keeps the latest state per entity and publishes only what changed"""
+    
+    CASES = "cases"
+    AMBULANCES = "ambulances"
+    EVENT_TOPIC = "live"
+    
+    def __init__(self, websocket_service: WebSocketService, flush_interval_ms: int = 250):
+        self.websocket_service = websocket_service
+        self.flush_interval = flush_interval_ms / 1000
+        # channel -> entity id -> latest fields
+        self.state: Dict[str, Dict[str, Dict[str, Any]]] = {self.CASES: {}, self.AMBULANCES: {}}
+        # channel -> entity id -> changed fields since the last frame (None = removed)
+        self.pending: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {self.CASES: {}, self.AMBULANCES: {}}
+        # Per-channel frame sequence; clients resubscribe for a snapshot on a gap
+        self.seq: Dict[str, int] = {self.CASES: 0, self.AMBULANCES: 0}
+        self._task: Optional[asyncio.Task] = None
+        websocket_service.on_event(self.EVENT_TOPIC, self._apply)
+    
+    async def load(self):
+        """Load open cases and all ambulances as the initial state"""
+        cases = await EmergencyCase.get_motor_collection().find(
+            {"status": {"$nin": list(CLOSED_CASE_STATUSES)}},
+            projection={field: 1 for field in CASE_FIELDS},
+        ).to_list(length=None)
+        ambulances = await AmbulanceTracking.get_motor_collection().find(
+            {},
+            projection={field: 1 for field in AMBULANCE_FIELDS},
+        ).to_list(length=None)
+        
+        for case in cases:
+            case.pop("_id", None)
+            self.state[self.CASES][case["case_id"]] = _json_ready(case)
+        for ambulance in ambulances:
+            ambulance.pop("_id", None)
+            self.state[self.AMBULANCES][ambulance["ambulance_id"]] = _json_ready(ambulance)
+        logger.info(f"Loaded live state: {len(cases)} open cases, {len(ambulances)} ambulances")
+    
+    async def publish_case(self, case: EmergencyCase):
+        """Publish a created or updated case"""
+        if case.status.value in CLOSED_CASE_STATUSES:
+            await self.remove(self.CASES, case.case_id)
+        else:
+            await self.publish(self.CASES, case.case_id, case.model_dump(include=set(CASE_FIELDS)))
+    
+    async def publish_ambulance(self, ambulance: AmbulanceTracking):
+        """Publish an ambulance's latest tracking state"""
+        await self.publish(
+            self.AMBULANCES,
+            ambulance.ambulance_id,
+            ambulance.model_dump(include=set(AMBULANCE_FIELDS)),
+        )
+    
+    async def publish(self, channel: str, entity_id: str, fields: Dict[str, Any]):
+        """Record an entity's fields on every worker"""
+        await self.websocket_service.publish_event(
+            self.EVENT_TOPIC,
+            {"channel": channel, "id": entity_id, "fields": _json_ready(fields)},
+        )
+    
+    async def remove(self, channel: str, entity_id: str):
+        """Drop an entity from a channel on every worker"""
+        await self.websocket_service.publish_event(
+            self.EVENT_TOPIC,
+            {"channel": channel, "id": entity_id, "fields": None},
+        )
+    
+    def _apply(self, event: Dict[str, Any]):
+        """Merge an entity change into state and the pending delta"""
+        channel, entity_id, fields = event["channel"], event["id"], event["fields"]
+        state = self.state[channel]
+        pending = self.pending[channel]
+        
+        if fields is None:
+            if state.pop(entity_id, None) is not None:
+                pending[entity_id] = None
+            return
+        
+        current = state.setdefault(entity_id, {})
+        changed = {key: value for key, value in fields.items() if key not in current or current[key] != value}
+        if not changed:
+            return
+        current.update(changed)
+        
+        if entity_id in pending and pending[entity_id] is None:
+            # Removed and re-added within one batch: resend the whole entity
+            pending[entity_id] = dict(current)
+        else:
+            pending.setdefault(entity_id, {}).update(changed)
+    
+    async def flush(self):
+        """Send one delta frame per channel with everything changed since the last flush"""
+        for channel, pending in self.pending.items():
+            if not pending:
+                continue
+            self.pending[channel] = {}
+            self.seq[channel] += 1
+            
+            if not self.websocket_service.channels.get(channel):
+                continue
+            await self.websocket_service.broadcast(
+                channel,
+                {
+                    "type": "delta",
+                    "channel": channel,
+                    "seq": self.seq[channel],
+                    "updates": {key: fields for key, fields in pending.items() if fields is not None},
+                    "removed": [key for key, fields in pending.items() if fields is None],
+                },
+                relay=False,
+            )
+    
+    def send_snapshot(self, websocket: WebSocket, channel: str):
+        """Send the full current state of a channel to a new subscriber"""
+        if channel in self.state:
+            self.websocket_service.send(websocket, {
+                "type": "snapshot",
+                "channel": channel,
+                "seq": self.seq[channel],
+                "items": self.state[channel],
+            })
+    
+    async def _run(self):
+        """Flush batched deltas every interval"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing live updates: {e}")
+    
+    def start(self):
+        """Start the periodic flush"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the periodic flush"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+live_updates_service = LiveUpdatesService(
+    websocket_service,
+    flush_interval_ms=settings.LIVE_UPDATE_FLUSH_MS,
+)
@@ -0,0 +1,207 @@
+"""
+Police officer availability index
+"""
+from typing import Optional, List, Dict, Any, Set, Tuple
+from math import radians, cos, sin, asin, sqrt
+from datetime import datetime, timedelta
+import heapq
+from loguru import logger
+
+from app.core.config import settings
+from app.models.police import PoliceOfficerAction, OfficerRank, ActionType
+
+
+# Ranks in ascending order of seniority
+RANK_ORDER = {rank: i for i, rank in enumerate(OfficerRank)}
+
+# Latest action types after which an officer is free for a new case
+AVAILABLE_ACTIONS = {ActionType.CASE_CLOSED, ActionType.OTHER}
+
+
+class OfficerState:
+    """Latest known state of a single officer"""
+    
+    __slots__ = (
+        "officer_id",
+        "officer_name",
+        "officer_rank",
+        "officer_phone",
+        "officer_station",
+        "case_id",
+        "action_type",
+        "lat",
+        "lng",
+        "timestamp",
+        "alert_expires_at",
+    )
+    
+    def __init__(self, action: Dict[str, Any]):
+        self.officer_id: str = action["officer_id"]
+        self.timestamp: datetime = datetime.min
+        self.lat: Optional[float] = None
+        self.lng: Optional[float] = None
+        self.alert_expires_at: Optional[datetime] = None
+        self.apply(action)
+    
+    def apply(self, action: Dict[str, Any]):
+        """Apply a newer action to this officer's state"""
+        self.officer_name = action.get("officer_name", getattr(self, "officer_name", self.officer_id))
+        self.officer_rank = OfficerRank(action["officer_rank"])
+        self.officer_phone = action.get("officer_phone")
+        self.officer_station = action.get("officer_station")
+        self.case_id = action.get("case_id")
+        self.action_type = ActionType(action["action_type"])
+        self.timestamp = action.get("timestamp") or datetime.utcnow()
+        
+        location = action.get("location") or {}
+        if location.get("lat") is not None and location.get("lng") is not None:
+            self.lat, self.lng = location["lat"], location["lng"]
+    
+    @property
+    def is_available(self) -> bool:
+        if self.action_type in AVAILABLE_ACTIONS:
+            return True
+        # An alert nobody acted on stops holding the officer once it lapses
+        return self.alert_expires_at is not None and self.alert_expires_at <= datetime.utcnow()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "officer_id": self.officer_id,
+            "officer_name": self.officer_name,
+            "officer_rank": self.officer_rank.value,
+            "officer_phone": self.officer_phone,
+            "officer_station": self.officer_station,
+            "available": self.is_available,
+            "current_case_id": None if self.is_available else self.case_id,
+            "last_action": self.action_type.value,
+            "last_action_at": self.timestamp,
+            "lat": self.lat,
+            "lng": self.lng,
+        }
+
+
+class PoliceAvailabilityService:
+    """Incrementally maintained index of officer availability"""
+    
+    def __init__(self, alert_ttl_seconds: int = 300):
+        self.officers: Dict[str, OfficerState] = {}
+        # Available officer IDs bucketed by rank for rank-filtered lookups
+        self.available_by_rank: Dict[OfficerRank, Set[str]] = {rank: set() for rank in OfficerRank}
+        self.alert_ttl = timedelta(seconds=alert_ttl_seconds)
+        # (expiry, officer_id) of outstanding alerts, soonest first
+        self.alert_expiry: List[Tuple[datetime, str]] = []
+    
+    async def load(self):
+        """Build the index from the latest action of every officer"""
+        pipeline = [
+            {"$sort": {"timestamp": -1}},
+            {"$group": {"_id": "$officer_id", "latest": {"$first": "$$ROOT"}}},
+            {"$replaceRoot": {"newRoot": "$latest"}},
+        ]
+        actions = await PoliceOfficerAction.aggregate(pipeline).to_list()
+        
+        self.officers = {}
+        self.available_by_rank = {rank: set() for rank in OfficerRank}
+        self.alert_expiry = []
+        for action in actions:
+            self.apply_action(action)
+        logger.info(f"Loaded availability index for {len(self.officers)} officers")
+    
+    def apply_action(self, action: Dict[str, Any]):
+        """Update the index with a newly logged action"""
+        officer = self.officers.get(action["officer_id"])
+        timestamp = action.get("timestamp")
+        
+        if officer is None:
+            officer = OfficerState(action)
+            self.officers[officer.officer_id] = officer
+        elif timestamp is not None and timestamp < officer.timestamp:
+            # Out-of-order event; the index already reflects a newer action
+            return
+        else:
+            self.available_by_rank[officer.officer_rank].discard(officer.officer_id)
+            officer.apply(action)
+        
+        officer.alert_expires_at = None
+        if officer.action_type == ActionType.ALERTED:
+            officer.alert_expires_at = officer.timestamp + self.alert_ttl
+            heapq.heappush(self.alert_expiry, (officer.alert_expires_at, officer.officer_id))
+        if officer.is_available:
+            self.available_by_rank[officer.officer_rank].add(officer.officer_id)
+    
+    def expire_alerts(self, now: Optional[datetime] = None):
+        """Return officers whose alert lapsed without a follow-up action to the available set"""
+        now = now or datetime.utcnow()
+        while self.alert_expiry and self.alert_expiry[0][0] <= now:
+            expires_at, officer_id = heapq.heappop(self.alert_expiry)
+            officer = self.officers.get(officer_id)
+            # Skip entries superseded by a later action
+            if officer is not None and officer.alert_expires_at == expires_at:
+                self.available_by_rank[officer.officer_rank].add(officer_id)
+    
+    def get_officer(self, officer_id: str) -> Optional[OfficerState]:
+        """Get latest known state of an officer"""
+        return self.officers.get(officer_id)
+    
+    def list_officers(
+        self,
+        rank: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """List indexed officers, optionally filtered by rank"""
+        officers = [
+            o for o in self.officers.values()
+            if rank is None or o.officer_rank.value == rank
+        ]
+        officers.sort(key=lambda o: o.officer_id)
+        return {
+            "officers": [o.to_dict() for o in officers[skip:skip + limit]],
+            "total": len(officers),
+        }
+    
+    def nearest_available(
+        self,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        min_rank: Optional[str] = None,
+        station: Optional[str] = None,
+        limit: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Nearest available officers at or above a rank, most senior breaking ties"""
+        self.expire_alerts()
+        min_order = RANK_ORDER[OfficerRank(min_rank)] if min_rank else 0
+        
+        candidates = []
+        for rank, officer_ids in self.available_by_rank.items():
+            if RANK_ORDER[rank] < min_order:
+                continue
+            for officer_id in officer_ids:
+                officer = self.officers[officer_id]
+                if station and officer.officer_station != station:
+                    continue
+                if lat is None or lng is None or officer.lat is None:
+                    distance = float("inf")
+                else:
+                    distance = self._distance_km(lat, lng, officer.lat, officer.lng)
+                candidates.append((distance, -RANK_ORDER[rank], officer_id))
+        
+        nearest = heapq.nsmallest(limit, candidates)
+        return [
+            {
+                **self.officers[officer_id].to_dict(),
+                "distance_km": None if distance == float("inf") else round(distance, 2),
+            }
+            for distance, _, officer_id in nearest
+        ]
+    
+    @staticmethod
+    def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        """Haversine distance in kilometers"""
+        lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
+        a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+        return 2 * 6371 * asin(sqrt(a))
+
+
+# Process-wide index shared by all requests
+police_availability_service = PoliceAvailabilityService(alert_ttl_seconds=settings.POLICE_ALERT_TTL_SECONDS)
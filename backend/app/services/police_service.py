@@ -2,7 +2,10 @@
 Police service
 """
 from typing import Optional, List
+from app.models.police import PoliceOfficerAction
 from app.schemas.police import PoliceActionCreate
+from app.services.police_availability_service import police_availability_service
+from app.utils.pagination import keyset_query, keyset_sort, next_cursor
 from loguru import logger
 
 
@@ -16,14 +19,31 @@ class PoliceService:
         limit: int = 100,
     ) -> dict:
         """List all police officers"""
-        # In a real implementation, this would query the database
+        officers = police_availability_service.list_officers(rank=rank, skip=skip, limit=limit)
         return {
-            "officers": [],
-            "total": 0,
+            **officers,
             "skip": skip,
             "limit": limit,
         }
     
+    async def find_available_officers(
+        self,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        min_rank: Optional[str] = None,
+        station: Optional[str] = None,
+        limit: int = 3,
+    ) -> dict:
+        """Find nearest available officers at or above a rank"""
+        officers = police_availability_service.nearest_available(
+            lat=lat,
+            lng=lng,
+            min_rank=min_rank,
+            station=station,
+            limit=limit,
+        )
+        return {"officers": officers}
+    
     async def send_alert(
         self,
         case_id: str,
@@ -46,19 +66,53 @@ class PoliceService:
         self,
         case_id: Optional[str] = None,
         officer_id: Optional[str] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
-    ) -> List[dict]:
-        """Get police officer actions"""
-        # In a real implementation, this would query the database
-        return []
+    ) -> dict:
+        """Get police officer actions using keyset pagination on timestamp"""
+        query = {}
+        if case_id:
+            query["case_id"] = case_id
+        if officer_id:
+            query["officer_id"] = officer_id
+        
+        actions = await PoliceOfficerAction.get_motor_collection().find(
+            keyset_query(query, cursor, sort_field="timestamp"),
+            sort=keyset_sort("timestamp"),
+            limit=limit,
+        ).to_list(length=limit)
+        
+        next_page = next_cursor(actions, limit, sort_field="timestamp")
+        for action in actions:
+            action["_id"] = str(action["_id"])
+        
+        return {
+            "actions": actions,
+            "next_cursor": next_page,
+            "limit": limit,
+        }
     
-    async def create_action(self, action_data: PoliceActionCreate) -> dict:
+    async def create_action(self, action_data: PoliceActionCreate) -> Optional[dict]:
         """Create police officer action log"""
         logger.info(f"Creating action for officer {action_data.officer_id}")
-        # In a real implementation, this would save to the database
+        
+        # Officer details default to the latest known state for this officer
+        action_fields = action_data.dict(exclude_none=True)
+        known = police_availability_service.get_officer(action_data.officer_id)
+        if known:
+            action_fields.setdefault("officer_name", known.officer_name)
+            action_fields.setdefault("officer_rank", known.officer_rank)
+            action_fields.setdefault("officer_phone", known.officer_phone)
+            action_fields.setdefault("officer_station", known.officer_station)
+        if "officer_name" not in action_fields or "officer_rank" not in action_fields:
+            return None
+        
+        action = PoliceOfficerAction(**action_fields)
+        await action.insert()
+        police_availability_service.apply_action(action.dict())
+        
         return {
             "success": True,
-            "action_id": "ACTION-123",
+            "action_id": str(action.id),
         }
 
@@ -0,0 +1,44 @@
+"""
+Report rendering, run in worker processes
+"""
+from typing import Any, Dict
+import os
+
+
+def render_pdf(report: Dict[str, Any], output_path: str) -> str:
+    """Render report sections to a PDF; CPU-bound, so callers run it in a process pool"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph(report["title"], styles["Title"]),
+        Paragraph(f"Period: {report['period']}", styles["Normal"]),
+        Paragraph(f"Report Generated: {report['generated_at']}", styles["Normal"]),
+        Spacer(1, 0.2 * inch),
+    ]
+    
+    for heading, rows in report["sections"]:
+        story.append(Paragraph(heading, styles["Heading2"]))
+        table_data = [["Metric", "Value"]] + [[str(key), str(value)] for key, value in rows]
+        if not rows:
+            table_data.append(["No data", ""])
+        table = Table(table_data)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        story.append(table)
+        story.append(Spacer(1, 0.2 * inch))
+    
+    # Render beside the target and rename, so readers never see a partial file
+    partial_path = f"{output_path}.partial"
+    SimpleDocTemplate(partial_path, pagesize=A4).build(story)
+    os.replace(partial_path, output_path)
+    return output_path
@@ -0,0 +1,317 @@
+"""
+Report job queue: deduplicated jobs, PDF rendering in worker processes, artifacts on disk
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime, timedelta
+from pathlib import Path
+from loguru import logger
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import uuid
+
+from app.core.config import settings
+from app.models.emergency import EmergencyCase
+from app.models.report import ReportJob, ReportStatus
+from app.services.analytics_queries import analytics_queries
+from app.services.report_rendering import render_pdf
+from shared.csv_stream import iter_csv
+
+
+# Columns of the case CSV export, in order
+CASE_EXPORT_COLUMNS = [
+    "case_id",
+    "emergency_type",
+    "severity_level",
+    "status",
+    "location_address",
+    "location_lat",
+    "location_lng",
+    "people_involved",
+    "injuries_reported",
+    "assigned_ambulance_id",
+    "assigned_hospital_id",
+    "created_at",
+    "dispatched_at",
+    "resolved_at",
+]
+
+
+def export_cases_csv(
+    start_date: datetime,
+    end_date: datetime,
+    compress: bool = False,
+    batch_size: int = 2000,
+) -> AsyncIterator[bytes]:
+    """CSV chunks for cases created in a range, streamed from the cursor"""
+    cursor = EmergencyCase.get_motor_collection().find(
+        {"created_at": {"$gte": start_date, "$lt": end_date}},
+        projection={"_id": 0, **{column: 1 for column in CASE_EXPORT_COLUMNS}},
+        sort=[("created_at", 1)],
+        batch_size=batch_size,
+    )
+    return iter_csv(cursor, CASE_EXPORT_COLUMNS, compress=compress)
+
+
+def job_key(
+    report_type: str,
+    format: str,
+    start_date: datetime,
+    end_date: datetime,
+    fingerprint: Dict[str, Any],
+) -> str:
+    """Identical requests over unchanged data share a key"""
+    parts = [
+        report_type,
+        format,
+        start_date.isoformat(),
+        end_date.isoformat(),
+        str(fingerprint.get("count", 0)),
+        str(fingerprint.get("last_updated") or ""),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def fingerprint_pipeline(start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    """Count and latest update of every case a report over the range reads"""
+    in_range = {"$gte": start_date, "$lt": end_date}
+    return [
+        # Status/severity/type sections read cases created in the range, resolution reads cases resolved in it
+        {"$match": {"$or": [{"created_at": in_range}, {"resolved_at": in_range}]}},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "last_updated": {"$max": "$updated_at"}}},
+    ]
+
+
+def report_sections(dashboard: Dict[str, Any], resolution: Dict[str, Any]) -> List[tuple]:
+    """(heading, rows) tables for a report, as plain picklable data"""
+    timings = dashboard.get("response_times", {})
+    summary = [
+        ("Total cases", sum(dashboard["status"].values())),
+        ("Resolved cases", resolution["resolved_cases"]),
+        ("Avg response (min)", _rounded(timings.get("avg_response_minutes"))),
+        ("Avg resolution (min)", _rounded(resolution["avg_resolution_time"])),
+        ("P50 resolution (min)", _rounded(resolution["p50_resolution_time"])),
+        ("P90 resolution (min)", _rounded(resolution["p90_resolution_time"])),
+        ("P99 resolution (min)", _rounded(resolution["p99_resolution_time"])),
+    ]
+    return [
+        ("Summary", summary),
+        ("Cases by status", sorted(dashboard["status"].items())),
+        ("Cases by severity", sorted(dashboard["severity_level"].items())),
+        ("Cases by type", sorted(dashboard["emergency_type"].items())),
+        ("Resolution time histogram (min)", list(resolution["histogram"].items())),
+    ]
+
+
+def _rounded(value: Optional[float]) -> Any:
+    return round(value, 2) if value is not None else "N/A"
+
+
+class ReportService:
+    """Queues report jobs and renders them off the request path"""
+    
+    def __init__(self, reports_dir: str = "reports", workers: int = 2, job_timeout_seconds: int = 600):
+        self.reports_dir = Path(reports_dir)
+        self.workers = workers
+        # Queued/running jobs older than this are treated as lost and requeued
+        self.job_timeout = timedelta(seconds=job_timeout_seconds)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    async def fingerprint(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Case count and latest update in the range; changes whenever the report data would"""
+        result = await EmergencyCase.get_motor_collection().aggregate(
+            fingerprint_pipeline(start_date, end_date)
+        ).to_list(length=1)
+        return result[0] if result else {}
+    
+    async def submit(
+        self,
+        report_type: str,
+        format: str,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> ReportJob:
+        """Return the job for this report, reusing a cached or in-flight one when possible"""
+        fingerprint = await self.fingerprint(start_date, end_date)
+        key = job_key(report_type, format, start_date, end_date, fingerprint)
+        
+        job = await ReportJob.find_one(ReportJob.key == key)
+        if job is None:
+            job = ReportJob(
+                job_id=f"REPORT-{uuid.uuid4().hex[:12].upper()}",
+                key=key,
+                report_type=report_type,
+                format=format,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            try:
+                await job.insert()
+            except DuplicateKeyError:
+                # An identical request raced us; share its job
+                return await ReportJob.find_one(ReportJob.key == key)
+            self.queue.put_nowait(job.job_id)
+            logger.info(f"Queued report {job.job_id} ({report_type} {format})")
+            return job
+        
+        if job.status == ReportStatus.COMPLETED and job.artifact_path and os.path.exists(job.artifact_path):
+            return job
+        if job.status in (ReportStatus.QUEUED, ReportStatus.RUNNING) and not self._is_stale(job):
+            return job
+        return await self._requeue(job)
+    
+    def _is_stale(self, job: ReportJob) -> bool:
+        """Queued/running for longer than the timeout, so presumed lost"""
+        return job.updated_at <= datetime.utcnow() - self.job_timeout
+    
+    async def _requeue(self, job: ReportJob) -> ReportJob:
+        """Queue a failed, lost or evicted job again; only one worker wins the requeue"""
+        now = datetime.utcnow()
+        result = await ReportJob.get_motor_collection().update_one(
+            {"job_id": job.job_id, "updated_at": job.updated_at},
+            {"$set": {"status": ReportStatus.QUEUED.value, "error": None, "updated_at": now}},
+        )
+        if result.modified_count:
+            self.queue.put_nowait(job.job_id)
+            logger.info(f"Requeued report {job.job_id}")
+        return await ReportJob.find_one(ReportJob.job_id == job.job_id)
+    
+    async def get_job(self, job_id: str) -> Optional[ReportJob]:
+        """Get report job by ID, requeueing it if it was lost"""
+        job = await ReportJob.find_one(ReportJob.job_id == job_id)
+        if job and job.status in (ReportStatus.QUEUED, ReportStatus.RUNNING) and self._is_stale(job):
+            return await self._requeue(job)
+        return job
+    
+    async def _claim(self, job_id: str) -> Optional[ReportJob]:
+        """Move a queued job to running; None if it was already taken"""
+        result = await ReportJob.get_motor_collection().update_one(
+            {"job_id": job_id, "status": ReportStatus.QUEUED.value},
+            {"$set": {"status": ReportStatus.RUNNING.value, "updated_at": datetime.utcnow()}},
+        )
+        return await ReportJob.find_one(ReportJob.job_id == job_id) if result.modified_count else None
+    
+    async def _render(self, job: ReportJob) -> str:
+        """Write the job's artifact and return its path"""
+        path = self.reports_dir / f"{job.job_id}.{job.format}"
+        if job.format == "csv":
+            partial_path = f"{path}.partial"
+            with open(partial_path, "wb") as output:
+                async for chunk in export_cases_csv(job.start_date, job.end_date):
+                    output.write(chunk)
+            os.replace(partial_path, path)
+            return str(path)
+        
+        # Aggregations run here; only the CPU-bound layout goes to the process pool
+        dashboard = await analytics_queries.dashboard(job.start_date, job.end_date)
+        resolution = await analytics_queries.resolution(job.start_date, job.end_date)
+        report = {
+            "title": f"Shivay Emergency Response Report: {job.report_type}",
+            "period": f"{job.start_date:%Y-%m-%d %H:%M} to {job.end_date:%Y-%m-%d %H:%M} UTC",
+            "generated_at": f"{datetime.utcnow():%Y-%m-%d %H:%M} UTC",
+            "sections": report_sections(dashboard, resolution),
+        }
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, render_pdf, report, str(path))
+    
+    async def _run_job(self, job_id: str):
+        """Render one job and record the outcome"""
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        
+        try:
+            job.artifact_path = await self._render(job)
+            job.status = ReportStatus.COMPLETED
+            job.completed_at = datetime.utcnow()
+            logger.info(f"Rendered report {job_id}")
+        except Exception as e:
+            job.status = ReportStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Error rendering report {job_id}: {e}")
+        job.updated_at = datetime.utcnow()
+        await job.save()
+        
+        if job.status == ReportStatus.COMPLETED:
+            await self._evict_superseded(job)
+    
+    async def _evict_superseded(self, job: ReportJob):
+        """Delete older renders of the same report, made stale by data changes"""
+        stale = await ReportJob.find(
+            ReportJob.report_type == job.report_type,
+            ReportJob.format == job.format,
+            ReportJob.start_date == job.start_date,
+            ReportJob.end_date == job.end_date,
+            ReportJob.status == ReportStatus.COMPLETED,
+            ReportJob.job_id != job.job_id,
+        ).to_list()
+        for old in stale:
+            if old.artifact_path and os.path.exists(old.artifact_path):
+                os.remove(old.artifact_path)
+            await old.delete()
+    
+    async def _resume(self):
+        """Pick up jobs left unfinished by a previous run"""
+        try:
+            jobs = await ReportJob.find(
+                {"status": {"$in": [ReportStatus.QUEUED.value, ReportStatus.RUNNING.value]}}
+            ).to_list()
+        except Exception as e:
+            logger.error(f"Error resuming report jobs: {e}")
+            return
+        for job in jobs:
+            if job.status == ReportStatus.QUEUED:
+                # Claiming is conditional, so a job another process already queued runs once
+                self.queue.put_nowait(job.job_id)
+            else:
+                # Its render died with the previous process; a duplicate render (should another
+                # process still hold it) is harmless, as artifacts are replaced atomically
+                await self._requeue(job)
+        if jobs:
+            logger.info(f"Resumed {len(jobs)} unfinished report jobs")
+    
+    async def _worker(self):
+        """Process queued jobs one at a time"""
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Error processing report job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+    
+    def start(self):
+        """Start the render pool and queue workers"""
+        if self._tasks:
+            return
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        # Spawned (not forked) children don't inherit the event loop or driver threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._resume()))
+    
+    async def stop(self):
+        """Stop queue workers and the render pool"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+report_service = ReportService(
+    reports_dir=settings.REPORTS_DIR,
+    workers=settings.REPORT_WORKERS,
+    job_timeout_seconds=settings.REPORT_JOB_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,280 @@
+"""
+Time-bucketed case metric rollups
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from loguru import logger
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.models.emergency import EmergencyCase
+from app.models.rollup import CaseRollup, RollupGranularity, RollupState
+from app.services.analytics_queries import analytics_queries
+
+
+# Coarser rollups are merged from the next finer level instead of rescanning cases
+FINER = {
+    RollupGranularity.HOUR: RollupGranularity.MINUTE,
+    RollupGranularity.DAY: RollupGranularity.HOUR,
+}
+
+BUCKET_SIZE = {
+    RollupGranularity.MINUTE: timedelta(minutes=1),
+    RollupGranularity.HOUR: timedelta(hours=1),
+    RollupGranularity.DAY: timedelta(days=1),
+}
+
+METRIC_FIELDS = (
+    "case_count",
+    "response_time_sum",
+    "response_time_count",
+    "response_time_max",
+    "resolution_time_sum",
+    "resolution_time_count",
+    "resolution_time_max",
+)
+
+
+def truncate(value: datetime, granularity: RollupGranularity) -> datetime:
+    """Start of the bucket containing value"""
+    if granularity == RollupGranularity.MINUTE:
+        return value.replace(second=0, microsecond=0)
+    if granularity == RollupGranularity.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def granularity_for_range(start: datetime, end: datetime) -> RollupGranularity:
+    """Coarsest-sensible bucket size so a query reads at most a few hundred rows"""
+    span = end - start
+    if span <= timedelta(hours=6):
+        return RollupGranularity.MINUTE
+    if span <= timedelta(days=14):
+        return RollupGranularity.HOUR
+    return RollupGranularity.DAY
+
+
+def empty_row(bucket: datetime, granularity: RollupGranularity) -> dict:
+    """Rollup row for a bucket with no events"""
+    return {
+        "bucket_start": bucket,
+        "granularity": granularity.value,
+        "case_count": 0,
+        "response_time_sum": 0.0,
+        "response_time_count": 0,
+        "response_time_max": None,
+        "resolution_time_sum": 0.0,
+        "resolution_time_count": 0,
+        "resolution_time_max": None,
+    }
+
+
+def rows_from_facets(facets: Dict[str, List[dict]], granularity: RollupGranularity) -> List[dict]:
+    """Combine created/dispatched/resolved groups into one row per bucket"""
+    rows: Dict[datetime, dict] = {}
+    
+    def row(bucket: datetime) -> dict:
+        if bucket not in rows:
+            rows[bucket] = empty_row(bucket, granularity)
+        return rows[bucket]
+    
+    for group in facets.get("created", []):
+        row(group["_id"])["case_count"] = group["count"]
+    for prefix, facet in (("response_time", "dispatched"), ("resolution_time", "resolved")):
+        for group in facets.get(facet, []):
+            entry = row(group["_id"])
+            entry[f"{prefix}_sum"] = group["sum"]
+            entry[f"{prefix}_count"] = group["count"]
+            entry[f"{prefix}_max"] = group["max"]
+    
+    return [rows[bucket] for bucket in sorted(rows)]
+
+
+def fill_series(
+    rows: List[dict],
+    granularity: RollupGranularity,
+    start: datetime,
+    end: datetime,
+) -> List[dict]:
+    """One row per bucket from start to end, with empty rows where nothing happened"""
+    # Only buckets with events are stored, so gaps would otherwise vanish from trends
+    by_bucket = {row["bucket_start"]: row for row in rows}
+    step = BUCKET_SIZE[granularity]
+    bucket = truncate(start, granularity)
+    filled = []
+    while bucket < end:
+        filled.append(by_bucket.get(bucket) or empty_row(bucket, granularity))
+        bucket += step
+    return filled
+
+
+class RollupService:
+    """Maintains minute, hour and day rollups in the Case_Rollups time-series collection"""
+    
+    JOB = "case_rollups"
+    
+    def __init__(
+        self,
+        interval_seconds: int = 60,
+        lag_seconds: int = 60,
+        backfill_window: timedelta = timedelta(days=1),
+    ):
+        self.interval_seconds = interval_seconds
+        # Buckets are only rolled up once late writes can no longer land in them
+        self.lag = timedelta(seconds=lag_seconds)
+        self.backfill_window = backfill_window
+        self.owner = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _acquire_lease(self, now: datetime) -> Optional[dict]:
+        """Take or renew the job lease so only one worker writes rollups"""
+        try:
+            return await RollupState.get_motor_collection().find_one_and_update(
+                {
+                    "job": self.JOB,
+                    "$or": [
+                        {"owner": self.owner},
+                        {"lease_until": {"$lt": now}},
+                        {"lease_until": None},
+                    ],
+                },
+                {"$set": {
+                    "owner": self.owner,
+                    "lease_until": now + timedelta(seconds=self.interval_seconds * 2),
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another worker holds the lease
+            return None
+    
+    async def _set_watermark(self, granularity: RollupGranularity, value: datetime):
+        """Record that every bucket before value is rolled up"""
+        await RollupState.get_motor_collection().update_one(
+            {"job": self.JOB, "owner": self.owner},
+            {"$set": {f"watermarks.{granularity.value}": value}},
+        )
+    
+    async def _first_case_at(self) -> Optional[datetime]:
+        """Creation time of the oldest case, where backfill starts"""
+        first = await EmergencyCase.get_motor_collection().find_one(
+            {},
+            projection={"created_at": 1},
+            sort=[("created_at", 1)],
+        )
+        return first["created_at"] if first else None
+    
+    async def _case_rows(self, start: datetime, end: datetime) -> List[dict]:
+        """Minute rows straight from cases, bucketed by when each event happened"""
+        minute = RollupGranularity.MINUTE
+        facets = await analytics_queries.event_buckets(start, end, minute.value)
+        return rows_from_facets(facets, minute)
+    
+    async def _merged_rows(self, granularity: RollupGranularity, start: datetime, end: datetime) -> List[dict]:
+        """Coarser rows summed from the finer rollups"""
+        group: Dict[str, Any] = {
+            "_id": {"$dateTrunc": {"date": "$bucket_start", "unit": granularity.value}},
+        }
+        for field in METRIC_FIELDS:
+            group[field] = {"$max" if field.endswith("_max") else "$sum": f"${field}"}
+        
+        rows = await CaseRollup.get_motor_collection().aggregate([
+            {"$match": {
+                "granularity": FINER[granularity].value,
+                "bucket_start": {"$gte": start, "$lt": end},
+            }},
+            {"$group": group},
+            {"$sort": {"_id": 1}},
+        ]).to_list(length=None)
+        
+        for row in rows:
+            row["bucket_start"] = row.pop("_id")
+            row["granularity"] = granularity.value
+        return rows
+    
+    async def _write(self, granularity: RollupGranularity, start: datetime, end: datetime, rows: List[dict]):
+        """Insert rows, skipping buckets already written before an interrupted run"""
+        if not rows:
+            return
+        existing = await CaseRollup.get_motor_collection().distinct(
+            "bucket_start",
+            {"granularity": granularity.value, "bucket_start": {"$gte": start, "$lt": end}},
+        )
+        written = set(existing)
+        rows = [row for row in rows if row["bucket_start"] not in written]
+        if rows:
+            await CaseRollup.get_motor_collection().insert_many(rows, ordered=False)
+    
+    async def run_once(self, now: Optional[datetime] = None):
+        """Roll up every bucket that has closed since the last run"""
+        now = now or datetime.utcnow()
+        state = await self._acquire_lease(now)
+        if state is None:
+            return
+        
+        watermarks = state.get("watermarks") or {}
+        if RollupGranularity.MINUTE.value not in watermarks:
+            origin = await self._first_case_at() or now - self.lag
+            for granularity in RollupGranularity:
+                watermarks[granularity.value] = truncate(origin, granularity)
+                await self._set_watermark(granularity, watermarks[granularity.value])
+        
+        # Minutes come from the cases; hours and days from the level below
+        targets = {RollupGranularity.MINUTE: truncate(now - self.lag, RollupGranularity.MINUTE)}
+        for granularity in RollupGranularity:
+            if granularity in FINER:
+                targets[granularity] = truncate(watermarks[FINER[granularity].value], granularity)
+            
+            start, target = watermarks[granularity.value], targets[granularity]
+            while start < target:
+                end = min(start + self.backfill_window, target)
+                if granularity == RollupGranularity.MINUTE:
+                    rows = await self._case_rows(start, end)
+                else:
+                    rows = await self._merged_rows(granularity, start, end)
+                await self._write(granularity, start, end, rows)
+                await self._set_watermark(granularity, end)
+                watermarks[granularity.value] = start = end
+    
+    async def get_series(
+        self,
+        granularity: RollupGranularity,
+        start: datetime,
+        end: datetime,
+    ) -> List[dict]:
+        """Rollup rows for a range, oldest first"""
+        return await CaseRollup.get_motor_collection().find(
+            {"granularity": granularity.value, "bucket_start": {"$gte": start, "$lt": end}},
+            projection={"_id": 0},
+            sort=[("bucket_start", 1)],
+        ).to_list(length=None)
+    
+    async def _run(self):
+        """Run the rollup job every interval"""
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Error rolling up case metrics: {e}")
+            await asyncio.sleep(self.interval_seconds)
+    
+    def start(self):
+        """Start the background rollup job"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background rollup job"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+rollup_service = RollupService(
+    interval_seconds=settings.ROLLUP_INTERVAL_SECONDS,
+    lag_seconds=settings.ROLLUP_LAG_SECONDS,
+)
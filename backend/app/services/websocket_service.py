@@ -1,57 +1,246 @@
 """
 WebSocket service for real-time updates
 """
+from collections import OrderedDict
 from fastapi import WebSocket
-from typing import Dict, List, Set
+from typing import Any, Callable, Dict, Hashable, Optional, Set
 from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+import asyncio
+import orjson
+import uuid
+
+from app.core.config import settings
+from shared.responses import dumps
+
+
+class Connection:
+    """A WebSocket client with its own bounded outbound queue"""
+    
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.channels: Set[str] = set()
+        self.max_queue = max_queue
+        # Frames waiting to be sent, keyed so newer state can replace queued state
+        self.pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+        self._seq = 0
+        self._ready = asyncio.Event()
+    
+    def enqueue(self, frame: str, key: Optional[str] = None):
+        """Queue a frame without blocking; coalesce on key, drop oldest when full"""
+        if key is None:
+            self._seq += 1
+            key = self._seq
+        elif key in self.pending:
+            # Coalesce: the client only needs the latest state for this key
+            self.pending[key] = frame
+            return
+        
+        self.pending[key] = frame
+        if len(self.pending) > self.max_queue:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self._ready.set()
+    
+    async def run(self, send_timeout: float):
+        """Drain the queue until the connection fails or is cancelled"""
+        while True:
+            await self._ready.wait()
+            while self.pending:
+                _, frame = self.pending.popitem(last=False)
+                # asyncio.timeout avoids wait_for's extra task per frame
+                async with asyncio.timeout(send_timeout):
+                    await self.websocket.send_text(frame)
+            self._ready.clear()
 
 
 class WebSocketService:
     """Service for managing WebSocket connections"""
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.subscriptions: Dict[WebSocket, Set[str]] = {}
+    def __init__(
+        self,
+        max_queue: int = 256,
+        send_timeout: float = 5.0,
+        redis_url: Optional[str] = None,
+        redis_channel: str = "ws:broadcast",
+    ):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.redis_url = redis_url
+        self.redis_channel = redis_channel
+        self.connections: Dict[WebSocket, Connection] = {}
+        # channel -> subscribed connections, so a broadcast only touches its subscribers
+        self.channels: Dict[str, Set[Connection]] = {}
+        # Lets each worker skip its own messages when they come back from Redis
+        self.instance_id = uuid.uuid4().hex
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self._relay_ready = False
+        # topic -> handler for state events that every worker applies
+        self.event_handlers: Dict[str, Callable[[Any], None]] = {}
+    
+    async def connect(self, websocket: WebSocket, accept: bool = True) -> Connection:
+        """Register a WebSocket connection, accepting it unless the caller already has"""
+        if accept:
+            await websocket.accept()
+        connection = Connection(websocket, self.max_queue)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections[websocket] = connection
+        logger.info(f"WebSocket connected. Total connections: {len(self.connections)}")
+        return connection
     
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        self.subscriptions[websocket] = set()
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+    async def _write(self, connection: Connection):
+        """Per-connection sender; a stalled client only stalls itself"""
+        try:
+            await connection.run(self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("Closing slow WebSocket consumer")
+            try:
+                await connection.websocket.close(code=1013)
+            except Exception:
+                pass
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket: {e}")
+        self.disconnect(connection.websocket)
     
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket in self.subscriptions:
-            del self.subscriptions[websocket]
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+        
+        for channel in connection.channels:
+            subscribers = self.channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.channels[channel]
+        
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        logger.info(f"WebSocket disconnected. Total connections: {len(self.connections)}")
     
     async def subscribe(self, websocket: WebSocket, channel: str):
         """Subscribe WebSocket to a channel"""
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].add(channel)
+        connection = self.connections.get(websocket)
+        if connection is not None and channel:
+            connection.channels.add(channel)
+            self.channels.setdefault(channel, set()).add(connection)
             logger.info(f"Subscribed to channel: {channel}")
     
     async def unsubscribe(self, websocket: WebSocket, channel: str):
         """Unsubscribe WebSocket from a channel"""
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].discard(channel)
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.channels.discard(channel)
+            subscribers = self.channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.channels[channel]
             logger.info(f"Unsubscribed from channel: {channel}")
     
-    async def broadcast(self, channel: str, message: dict):
-        """Broadcast message to all subscribers of a channel"""
-        disconnected = []
-        for websocket, channels in self.subscriptions.items():
-            if channel in channels:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to WebSocket: {e}")
-                    disconnected.append(websocket)
+    def send(self, websocket: WebSocket, message: Any):
+        """Queue a message for a single connection"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.enqueue(dumps(message).decode())
+    
+    async def broadcast(
+        self,
+        channel: str,
+        message: Any,
+        key: Optional[str] = None,
+        relay: bool = True,
+    ):
+        """Broadcast message to all subscribers of a channel, on every worker unless relay is off"""
+        # Serialize once; messages sharing a key coalesce in slow clients' queues
+        frame = dumps(message).decode()
+        self._deliver(channel, frame, key)
         
-        # Remove disconnected WebSockets
-        for ws in disconnected:
-            self.disconnect(ws)
+        if relay:
+            await self._publish({"origin": self.instance_id, "channel": channel, "key": key, "frame": frame})
+    
+    def on_event(self, topic: str, handler: Callable[[Any], None]):
+        """Register a handler for events published by any worker"""
+        self.event_handlers[topic] = handler
+    
+    async def publish_event(self, topic: str, payload: Any):
+        """Apply an event locally and relay it to the other workers"""
+        handler = self.event_handlers.get(topic)
+        if handler is not None:
+            handler(payload)
+        await self._publish({"origin": self.instance_id, "topic": topic, "payload": payload})
+    
+    async def _publish(self, envelope: dict):
+        """Relay an envelope through Redis while the relay is connected"""
+        if not self._relay_ready:
+            return
+        try:
+            await self._redis.publish(self.redis_channel, dumps(envelope))
+        except (RedisError, OSError) as e:
+            logger.warning(f"WebSocket fan-out publish failed: {e}")
+    
+    def _deliver(self, channel: str, frame: str, key: Optional[str] = None):
+        """Queue a serialized frame for this worker's subscribers"""
+        for connection in self.channels.get(channel, ()):
+            connection.enqueue(frame, key)
+    
+    async def start(self):
+        """Start relaying broadcasts from other workers through Redis"""
+        if self.redis_url and self._listener is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                db=settings.REDIS_DB,
+                socket_connect_timeout=0.5,
+            )
+            self._listener = asyncio.create_task(self._listen())
+    
+    async def _listen(self):
+        """Deliver other workers' broadcasts locally, reconnecting on failure"""
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.redis_channel)
+                self._relay_ready = True
+                async for message in pubsub.listen():
+                    envelope = orjson.loads(message["data"])
+                    if envelope["origin"] == self.instance_id:
+                        continue
+                    if "topic" in envelope:
+                        handler = self.event_handlers.get(envelope["topic"])
+                        if handler is not None:
+                            handler(envelope["payload"])
+                    else:
+                        self._deliver(envelope["channel"], envelope["frame"], envelope["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"WebSocket fan-out unavailable, serving local subscribers only: {e}")
+            finally:
+                self._relay_ready = False
+                await pubsub.aclose()
+            await asyncio.sleep(5)
+    
+    async def stop(self):
+        """Stop the Redis relay and close every connection's writer"""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        for websocket in list(self.connections):
+            self.disconnect(websocket)
+
 
+websocket_service = WebSocketService(
+    max_queue=settings.WEBSOCKET_QUEUE_SIZE,
+    send_timeout=settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    redis_url=settings.REDIS_URL if settings.WEBSOCKET_REDIS_FANOUT else None,
+)
@@ -0,0 +1,93 @@
+"""
+Keyset (cursor) pagination utilities
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from bson import ObjectId
+import base64
+import json
+import time
+
+
+def encode_cursor(sort_value: datetime, doc_id: Any) -> str:
+    """Encode the last item's (sort value, _id) as an opaque cursor"""
+    payload = json.dumps({"t": sort_value.isoformat(), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode an opaque cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["i"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_query(
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    sort_field: str = "created_at",
+) -> Dict[str, Any]:
+    """Restrict a query to items after the cursor in (sort_field, _id) descending order"""
+    if not cursor:
+        return query
+    
+    sort_value, doc_id = decode_cursor(cursor)
+    return {
+        **query,
+        "$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, "_id": {"$lt": doc_id}},
+        ],
+    }
+
+
+def keyset_sort(sort_field: str = "created_at") -> List[Tuple[str, int]]:
+    """Sort order matching keyset_query (newest first, _id as tie-breaker)"""
+    return [(sort_field, -1), ("_id", -1)]
+
+
+def next_cursor(
+    items: List[Any],
+    limit: int,
+    sort_field: str = "created_at",
+) -> Optional[str]:
+    """Cursor for the page after items, or None on the last page"""
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    if isinstance(last, dict):
+        return encode_cursor(last[sort_field], last["_id"])
+    return encode_cursor(getattr(last, sort_field), last.id)
+
+
+class CountCache:
+    """Short-lived cache of filtered document counts"""
+    
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+    
+    async def count(self, collection, query: Dict[str, Any]) -> int:
+        """Count documents, using metadata for unfiltered counts and caching filtered ones"""
+        if not query:
+            return await collection.estimated_document_count()
+        
+        key = f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+        now = time.monotonic()
+        cached = self._entries.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+        
+        total = await collection.count_documents(query)
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (now, total)
+        return total
+
+
+# Process-wide count cache shared by list endpoints
+count_cache = CountCache()
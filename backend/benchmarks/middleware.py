@@ -0,0 +1,132 @@
+"""
+Per-request middleware overhead: BaseHTTPMiddleware (before) vs raw ASGI (after)
+
+Run from backend/: python -m benchmarks.middleware [--iterations 5000] [--log-level WARNING]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI, Request
+from loguru import logger
+from slowapi.util import get_remote_address
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.middleware import RateLimitMiddleware, RequestLoggingMiddleware
+from app.core.rate_limit import rate_limiter
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Rate limiting as a BaseHTTPMiddleware, for comparison"""
+    
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in settings.RATE_LIMIT_EXEMPT_PATHS:
+            return await call_next(request)
+        await rate_limiter.hit(get_remote_address(request))
+        return await call_next(request)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """Request logging as a BaseHTTPMiddleware with eager f-strings, for comparison"""
+    
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        logger.info(f"{request.method} {request.url.path} - Client: {get_remote_address(request)}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"{request.method} {request.url.path} - "
+            f"Status: {response.status_code} - "
+            f"Time: {process_time:.3f}s"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+def build_app(middleware: list) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    
+    for cls in middleware:
+        app.add_middleware(cls)
+    return app
+
+
+async def measure(app, iterations: int) -> tuple:
+    """Drive the app directly over ASGI; return (p50, p99) in microseconds"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("10.0.0.1", 5000),
+        "server": ("bench", 80),
+    }
+    
+    samples = []
+    for _ in range(iterations):
+        done = asyncio.Event()
+        request_sent = False
+        
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like a real server, report a disconnect only once the response is finished
+            await done.wait()
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+        
+        start = time.perf_counter()
+        await app(dict(scope), receive, send)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    p99_index = min(len(samples) - 1, int(len(samples) * 0.99))
+    return statistics.median(samples), samples[p99_index]
+
+
+async def run(args):
+    # Limits high enough that every request is admitted, counted in process
+    rate_limiter.windows = [(60, 10**9), (3600, 10**9)]
+    rate_limiter.local.windows = rate_limiter.windows
+    rate_limiter.redis_url = None
+    
+    logger.remove()
+    logger.add(lambda _: None, level=args.log_level)
+    
+    apps = {
+        "no middleware": build_app([]),
+        "before (BaseHTTPMiddleware)": build_app([LegacyRateLimitMiddleware, LegacyRequestLoggingMiddleware]),
+        "after (raw ASGI)": build_app([RateLimitMiddleware, RequestLoggingMiddleware]),
+    }
+    print(f"{args.iterations} requests per app, log level {args.log_level}")
+    for name, app in apps.items():
+        await measure(app, 200)
+        p50, p99 = await measure(app, args.iterations)
+        print(f"  {name:<30} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--log-level", default="WARNING")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Rate limiter overhead benchmark
+
+Run from backend/: python -m benchmarks.rate_limit [--redis-url redis://localhost:6379] [--iterations 20000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.rate_limit import RateLimiter
+
+
+async def measure(limiter: RateLimiter, identities: list, iterations: int) -> tuple:
+    """Return (p50, p99) per-call overhead in microseconds"""
+    samples = []
+    for i in range(iterations):
+        identity = identities[i % len(identities)]
+        start = time.perf_counter()
+        await limiter.hit(identity)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    p99_index = min(len(samples) - 1, int(len(samples) * 0.99))
+    return statistics.median(samples), samples[p99_index]
+
+
+async def run(args):
+    identities = [f"10.0.{i // 256}.{i % 256}" for i in range(1000)]
+    scenarios = {
+        # Every client under its limit, counted in process
+        "local counters": (RateLimiter(10**9, 10**9, redis_url=None), identities),
+        # A single client over its limit, rejected before any counting
+        "local blocked fast path": (RateLimiter(1, 1, redis_url=None), ["10.9.9.9"]),
+    }
+    if args.redis_url:
+        scenarios["redis lua script"] = (RateLimiter(10**9, 10**9, redis_url=args.redis_url), identities)
+        scenarios["redis blocked fast path"] = (RateLimiter(1, 1, redis_url=args.redis_url), ["10.9.9.9"])
+    
+    print(f"{args.iterations} calls per scenario")
+    for name, (limiter, keys) in scenarios.items():
+        p50, p99 = await measure(limiter, keys, args.iterations)
+        print(f"  {name:<26} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+        await limiter.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
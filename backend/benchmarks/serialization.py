@@ -0,0 +1,86 @@
+"""
+Serialization benchmark for large EmergencyCaseListResponse payloads
+
+Run from backend/: python -m benchmarks.serialization [--cases 1000 5000] [--iterations 200]
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from shared.responses import FastJSONResponse
+from app.models.emergency import EmergencyStatus, SeverityLevel, EmergencyType
+from app.schemas.emergency import EmergencyCaseListResponse
+
+
+def build_payload(count: int) -> EmergencyCaseListResponse:
+    """Build a list response with realistic case documents"""
+    now = datetime.utcnow()
+    cases = []
+    for i in range(count):
+        created = now - timedelta(minutes=i)
+        cases.append({
+            "case_id": f"EMG-{uuid.uuid4().hex[:12].upper()}",
+            "caller_id": f"caller-{i}",
+            "caller_name": "Test Caller",
+            "caller_phone": "+910000000000",
+            "emergency_type": list(EmergencyType)[i % len(EmergencyType)],
+            "severity_level": list(SeverityLevel)[i % len(SeverityLevel)],
+            "status": list(EmergencyStatus)[i % len(EmergencyStatus)],
+            "location": {"lat": 28.6 + i * 1e-4, "lng": 77.2 - i * 1e-4, "address": "Connaught Place, New Delhi"},
+            "location_lat": 28.6 + i * 1e-4,
+            "location_lng": 77.2 - i * 1e-4,
+            "location_address": "Connaught Place, New Delhi",
+            "description": "Two-vehicle collision, one person trapped, smoke visible from engine bay",
+            "people_involved": 3,
+            "injuries_reported": 2,
+            "assigned_officers": [f"officer-{i % 50}", f"officer-{(i + 1) % 50}"],
+            "ai_recommendations": ["dispatch_ambulance", "alert_police"],
+            "ai_confidence": 0.87,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return EmergencyCaseListResponse(cases=cases, next_cursor=None, total=count, limit=count)
+
+
+def measure(render, iterations: int) -> tuple:
+    """Return (p50, p99) wall time in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99_index = min(len(samples) - 1, int(len(samples) * 0.99))
+    return statistics.median(samples), samples[p99_index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    for count in args.cases:
+        payload = build_payload(count)
+        lean = payload.model_dump()
+        variants = {
+            # FastAPI's previous default: jsonable_encoder + stdlib json
+            "jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(payload)),
+            # Current default: pydantic-core dump + orjson render
+            "model_dump(json) + FastJSONResponse": lambda: FastJSONResponse(payload.model_dump(mode="json")),
+            # Lean listing: raw dicts straight to orjson
+            "raw dicts + FastJSONResponse": lambda: FastJSONResponse(lean),
+        }
+        print(f"\n{count} cases ({len(FastJSONResponse(lean).body) / 1024:.0f} KiB), {args.iterations} iterations")
+        for name, render in variants.items():
+            p50, p99 = measure(render, args.iterations)
+            print(f"  {name:<38} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
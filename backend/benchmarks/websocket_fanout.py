@@ -0,0 +1,79 @@
+"""
+WebSocket broadcast fan-out benchmark
+
+Run from backend/: python -m benchmarks.websocket_fanout [--connections 10000] [--broadcasts 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from loguru import logger
+
+from app.services.websocket_service import WebSocketService
+
+
+class NullWebSocket:
+    """WebSocket stand-in with a configurable send latency"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+        self.last = None
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, frame: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last = frame
+    
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def run(args):
+    logger.remove()
+    service = WebSocketService(max_queue=256, send_timeout=30)
+    sockets = []
+    for i in range(args.connections):
+        # A share of clients are slow consumers
+        websocket = NullWebSocket(delay=0.5 if i % 100 == 0 else 0.0)
+        await service.connect(websocket)
+        await service.subscribe(websocket, "ambulances")
+        sockets.append(websocket)
+    
+    message = {"type": "ambulance_update", "ambulance_id": "AMB-001", "lat": 28.61, "lng": 77.21, "status": "en_route"}
+    fast = [s for i, s in enumerate(sockets) if i % 100]
+    enqueue_ms, delivered_ms = [], []
+    for i in range(args.broadcasts):
+        final = f'"seq":{i}}}'
+        began = time.perf_counter()
+        await service.broadcast("ambulances", {**message, "seq": i}, key="AMB-001")
+        enqueue_ms.append((time.perf_counter() - began) * 1000)
+        # Delivered once every fast client holds this broadcast
+        while any(s.last is None or not s.last.endswith(final) for s in fast):
+            await asyncio.sleep(0.001)
+        delivered_ms.append((time.perf_counter() - began) * 1000)
+    
+    print(f"{args.connections} subscribers, {args.broadcasts} broadcasts (1% slow consumers)")
+    for name, samples in (("broadcast call", enqueue_ms), ("delivered to all fast", delivered_ms)):
+        samples.sort()
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"  {name:<22} p50 {statistics.median(samples):8.2f} ms   p99 {p99:8.2f} ms")
+    slow = [s for i, s in enumerate(sockets) if i % 100 == 0]
+    print(f"  slow clients received {sum(s.received for s in slow)} frames for {len(slow) * args.broadcasts} broadcasts (coalesced)")
+    await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--broadcasts", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
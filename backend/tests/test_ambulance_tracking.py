@@ -0,0 +1,29 @@
+"""
+Tests for ambulance tracking updates
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import ambulance
+from app.core.dependencies import get_current_active_user
+from app.models.ambulance import AmbulanceStatus
+from app.schemas.ambulance import AmbulanceTrackingUpdate
+
+
+def test_tracking_status_is_parsed_as_enum():
+    """Valid statuses arrive as AmbulanceStatus members"""
+    update = AmbulanceTrackingUpdate(current_lat=28.6, current_lng=77.2, status="en_route")
+    assert update.status is AmbulanceStatus.EN_ROUTE
+
+
+def test_unknown_tracking_status_is_rejected_before_the_service():
+    """A bad status is a 422 from validation, not a 500 from the service"""
+    app = FastAPI()
+    app.include_router(ambulance.router, prefix="/ambulance")
+    app.dependency_overrides[get_current_active_user] = lambda: {"sub": "test"}
+    
+    response = TestClient(app).put(
+        "/ambulance/AMB-1/tracking",
+        json={"current_lat": 28.6, "current_lng": 77.2, "status": "teleporting"},
+    )
+    assert response.status_code == 422
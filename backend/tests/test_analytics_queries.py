@@ -0,0 +1,75 @@
+"""
+Tests for analytics aggregation pipelines
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.models.emergency import EmergencyCase
+from app.services.analytics_queries import (
+    analytics_queries,
+    dashboard_pipeline,
+    event_buckets_pipeline,
+    plan_stages,
+    resolution_pipeline,
+)
+
+
+START = datetime(2024, 1, 1)
+END = START + timedelta(days=7)
+
+
+def test_pipelines_filter_on_indexed_fields_first():
+    """Each pipeline opens with a $match the indexes can serve"""
+    assert dashboard_pipeline(START, END)[0] == {"$match": {"created_at": {"$gte": START, "$lt": END}}}
+    assert "$match" not in dashboard_pipeline(None, None)[0]
+    assert resolution_pipeline(START, None)[0] == {"$match": {"resolved_at": {"$gte": START}}}
+    assert [list(branch) for branch in event_buckets_pipeline(START, END, "hour")[0]["$match"]["$or"]] == [
+        ["created_at"],
+        ["dispatched_at"],
+        ["resolved_at"],
+    ]
+
+
+def test_plan_stages_ignores_rejected_plans():
+    """Only the winning plan counts toward index use"""
+    explain = {"stages": [{"$cursor": {"queryPlanner": {
+        "winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+        "rejectedPlans": [{"stage": "COLLSCAN"}],
+    }}}]}
+    assert plan_stages(explain) == ["FETCH", "IXSCAN"]
+
+
+@pytest_asyncio.fixture
+async def cases_collection():
+    """A scratch database with the EmergencyCase indexes; skipped without MongoDB"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=500)
+    database = client[f"{settings.MONGODB_DB_NAME}_test_analytics"]
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("MongoDB is not available")
+    
+    await init_beanie(database=database, document_models=[EmergencyCase])
+    yield EmergencyCase.get_motor_collection()
+    await client.drop_database(database.name)
+    client.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [
+    dashboard_pipeline(START, END),
+    event_buckets_pipeline(START, END, "minute"),
+    resolution_pipeline(START, END),
+])
+async def test_pipelines_use_indexes(cases_collection, pipeline):
+    """Range queries are answered from indexes, never a collection scan"""
+    stages = plan_stages(await analytics_queries.explain(pipeline))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
@@ -0,0 +1,53 @@
+"""
+Tests for streaming CSV exports
+"""
+import gzip
+from datetime import datetime
+
+import pytest
+
+from shared.csv_stream import iter_csv
+
+
+async def cases(count: int):
+    for i in range(count):
+        yield {"case_id": f"CASE-{i}", "created_at": datetime(2024, 1, 1, 12), "location": {"lat": 1.5}}
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_schema_given_up_front():
+    """Columns come from the schema; missing values are empty and extras dropped"""
+    output = await collect(iter_csv(cases(2), ["case_id", "created_at", "resolved_at"]))
+    assert output.decode().splitlines() == [
+        "case_id,created_at,resolved_at",
+        "CASE-0,2024-01-01T12:00:00,",
+        "CASE-1,2024-01-01T12:00:00,",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_schema_inferred_from_first_row():
+    """Without a schema the first row's keys are the header"""
+    output = await collect(iter_csv(cases(1)))
+    assert output.decode().splitlines() == [
+        "case_id,created_at,location",
+        'CASE-0,2024-01-01T12:00:00,"{""lat"": 1.5}"',
+    ]
+    assert await collect(iter_csv([])) == b""
+
+
+@pytest.mark.asyncio
+async def test_gzip_chunks_decompress_to_full_csv():
+    """Chunks are flushed as they fill and concatenate to one gzip stream"""
+    stats = {}
+    chunks = [chunk async for chunk in iter_csv(cases(5000), ["case_id"], compress=True, chunk_size=1024, stats=stats)]
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    
+    assert len(lines) == 5001
+    assert lines[-1] == "CASE-4999"
+    assert stats["rows"] == 5000
+    assert stats["chunks"] == len(chunks) > 1
@@ -0,0 +1,39 @@
+"""
+Tests for incrementally maintained dashboard counters
+"""
+import pytest
+
+from app.services.dashboard_counters import DashboardCounters
+from app.services.websocket_service import WebSocketService
+
+
+def case(status: str, severity: str = "high", emergency_type: str = "medical") -> dict:
+    return {"status": status, "severity_level": severity, "emergency_type": emergency_type}
+
+
+@pytest.mark.asyncio
+async def test_case_transitions_update_counts():
+    """Creates, status changes and deletes move counts without rescanning"""
+    counters = DashboardCounters(WebSocketService())
+    await counters.record_case(None, case("open", "critical"))
+    await counters.record_case(None, case("open"))
+    await counters.record_case(case("open"), case("resolved"))
+    await counters.record_case(case("open", "critical"), None)
+    
+    snapshot = counters.snapshot()
+    assert snapshot["total_cases"] == 1
+    assert snapshot["active_cases"] == 0
+    assert snapshot["resolved_cases"] == 1
+    assert snapshot["cases_by_severity"] == {"high": 1}
+    assert snapshot["cases_by_type"] == {"medical": 1}
+
+
+@pytest.mark.asyncio
+async def test_ambulance_status_transitions():
+    """Ambulance status counts follow each transition"""
+    counters = DashboardCounters(WebSocketService())
+    await counters.record_ambulance(None, "available")
+    await counters.record_ambulance(None, "available")
+    await counters.record_ambulance("available", "dispatched")
+    await counters.record_ambulance("dispatched", "dispatched")
+    assert counters.snapshot()["ambulance_status"] == {"available": 1, "dispatched": 1}
@@ -0,0 +1,105 @@
+"""
+Tests for hospital capacity ranking
+"""
+import asyncio
+
+import pytest
+
+from app.services.hospital_ranking_service import HospitalRankingService
+
+
+def _service():
+    service = HospitalRankingService()
+    service.upsert({
+        "hospital_id": "NEAR",
+        "location_lat": 28.61,
+        "location_lng": 77.21,
+        "available_beds": 5,
+        "icu_available": 0,
+        "specialties": ["Trauma"],
+    })
+    service.upsert({
+        "hospital_id": "FAR",
+        "location_lat": 28.70,
+        "location_lng": 77.30,
+        "available_beds": 10,
+        "icu_available": 2,
+        "specialties": ["trauma", "cardiology"],
+        "equipment_available": ["ventilator"],
+    })
+    return service
+
+
+def test_rank_orders_by_eta():
+    """Closest hospital with capacity ranks first"""
+    ranked = _service().rank(28.6139, 77.2090)
+    assert [h["hospital_id"] for h in ranked] == ["NEAR", "FAR"]
+
+
+def test_rank_critical_requires_icu():
+    """Critical patients are only routed to hospitals with free ICU beds"""
+    ranked = _service().rank(28.6139, 77.2090, severity="critical")
+    assert [h["hospital_id"] for h in ranked] == ["FAR"]
+
+
+def test_rank_filters_capabilities():
+    """Required specialties and equipment must all be present"""
+    service = _service()
+    assert [h["hospital_id"] for h in service.rank(28.6, 77.2, specialties=["cardiology"])] == ["FAR"]
+    assert service.rank(28.6, 77.2, equipment=["ventilator", "mri"]) == []
+
+
+def test_incremental_update_and_inbound_load():
+    """Resource updates and inbound load apply without a reload"""
+    service = _service()
+    service.apply_update("NEAR", {"available_beds": 0})
+    assert [h["hospital_id"] for h in service.rank(28.6139, 77.2090)] == ["FAR"]
+    
+    service.apply_update("NEAR", {"available_beds": 1})
+    for case_id in ("CASE-1", "CASE-2", "CASE-3"):
+        service.record_inbound("NEAR", case_id)
+    # Dispatch and bed hold for the same case count once
+    service.record_inbound("NEAR", "CASE-1")
+    ranked = service.rank(28.6139, 77.2090)
+    assert ranked[0]["hospital_id"] == "FAR"
+    assert ranked[1]["inbound_patients"] == 3
+    
+    service.clear_inbound("NEAR", "CASE-1")
+    inbound = {h["hospital_id"]: h["inbound_patients"] for h in service.rank(28.6139, 77.2090)}
+    assert inbound == {"NEAR": 2, "FAR": 0}
+
+
+def test_apply_update_adds_hospitals_activated_later():
+    """Hospitals missing from the startup snapshot are inserted, not skipped"""
+    service = _service()
+    service.apply_update("NEW", {
+        "hospital_name": "New General",
+        "location_lat": 28.614,
+        "location_lng": 77.209,
+        "available_beds": 2,
+        "is_active": True,
+    })
+    assert service.rank(28.6139, 77.2090)[0]["hospital_id"] == "NEW"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloads_on_interval(monkeypatch):
+    """The snapshot is rebuilt periodically, and a failed reload keeps the loop alive"""
+    service = HospitalRankingService(reload_interval=0)
+    calls = []
+    
+    async def load():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr(service, "load", load)
+    service.start()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await service.stop()
+    
+    assert len(calls) >= 2
+    count = len(calls)
+    await asyncio.sleep(0)
+    assert len(calls) == count
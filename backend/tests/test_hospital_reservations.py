@@ -0,0 +1,85 @@
+"""
+Tests for hospital bed reservations
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.models.hospital import HospitalResource
+from app.models.reservation import HospitalReservation, ReservationResource
+from app.services.hospital_service import HospitalService
+
+
+@pytest_asyncio.fixture
+async def hospital():
+    """A scratch database with one two-bed hospital; skipped without MongoDB"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=500)
+    database = client[f"{settings.MONGODB_DB_NAME}_test_reservations"]
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("MongoDB is not available")
+    
+    await init_beanie(database=database, document_models=[HospitalResource, HospitalReservation])
+    hospital = HospitalResource(
+        hospital_id="HOSP-1",
+        hospital_name="City General",
+        hospital_address="1 Main St",
+        available_beds=2,
+        total_beds=2,
+    )
+    await hospital.insert()
+    yield hospital
+    await client.drop_database(database.name)
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_repeat_reservations_for_a_case_share_one_hold(hospital):
+    """Retries and concurrent calls for one case take a single bed"""
+    service = HospitalService()
+    holds = await asyncio.gather(*(service.reserve_resource("HOSP-1", "CASE-1") for _ in range(5)))
+    
+    assert {hold.reservation_id for hold in holds} == {holds[0].reservation_id}
+    assert await HospitalReservation.find_all().count() == 1
+    assert (await HospitalResource.find_one(HospitalResource.hospital_id == "HOSP-1")).available_beds == 1
+    
+    # Once released, the case can hold again
+    await service.release_reservation(holds[0].reservation_id)
+    again = await service.reserve_resource("HOSP-1", "CASE-1")
+    assert again.reservation_id != holds[0].reservation_id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("resource_type, field", [
+    (ReservationResource.BED, "available_beds"),
+    (ReservationResource.ICU, "icu_available"),
+])
+async def test_cases_racing_for_the_last_slot(hospital, resource_type, field):
+    """Different cases racing for one free slot: exactly one wins and capacity never goes negative"""
+    setattr(hospital, field, 1)
+    await hospital.save()
+    service = HospitalService()
+    
+    holds = await asyncio.gather(
+        service.reserve_resource("HOSP-1", "CASE-1", resource_type),
+        service.reserve_resource("HOSP-1", "CASE-2", resource_type),
+    )
+    
+    winners = [hold for hold in holds if hold is not None]
+    assert len(winners) == 1
+    assert await HospitalReservation.find_all().count() == 1
+    updated = await HospitalResource.find_one(HospitalResource.hospital_id == "HOSP-1")
+    assert getattr(updated, field) == 0
+    
+    # The loser stays refused until the winner's slot is released
+    loser = "CASE-2" if winners[0].case_id == "CASE-1" else "CASE-1"
+    assert await service.reserve_resource("HOSP-1", loser, resource_type) is None
+    await service.release_reservation(winners[0].reservation_id)
+    assert await service.reserve_resource("HOSP-1", loser, resource_type) is not None
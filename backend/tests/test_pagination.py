@@ -0,0 +1,43 @@
+"""
+Tests for keyset pagination utilities
+"""
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_query, next_cursor
+
+
+def test_cursor_round_trip():
+    """Cursors decode back to the (created_at, _id) they were built from"""
+    created_at = datetime(2024, 5, 1, 10, 30, 15, 123000)
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor(created_at, doc_id)) == (created_at, doc_id)
+
+
+def test_invalid_cursor_raises_value_error():
+    """Malformed cursors are rejected"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_query_continues_after_cursor():
+    """Keyset filter selects strictly older items, breaking ties on _id"""
+    created_at = datetime(2024, 5, 1)
+    doc_id = ObjectId()
+    query = keyset_query({"status": "open"}, encode_cursor(created_at, doc_id))
+    
+    assert query["status"] == "open"
+    assert query["$or"] == [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": doc_id}},
+    ]
+    assert keyset_query({"status": "open"}, None) == {"status": "open"}
+
+
+def test_next_cursor_only_on_full_pages():
+    """A short page is the last page"""
+    items = [{"_id": ObjectId(), "created_at": datetime(2024, 5, 1)} for _ in range(3)]
+    assert next_cursor(items, limit=5) is None
+    assert decode_cursor(next_cursor(items, limit=3)) == (items[-1]["created_at"], items[-1]["_id"])
@@ -0,0 +1,38 @@
+"""
+Tests for police action request validation
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import police
+from app.core.dependencies import get_current_active_user
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(police.router, prefix="/police")
+    app.dependency_overrides[get_current_active_user] = lambda: {"sub": "test"}
+    return TestClient(app)
+
+
+ACTION = {
+    "officer_id": "OFF-UNKNOWN",
+    "case_id": "CASE-1",
+    "action_type": "alerted",
+    "officer_name": "R. Singh",
+    "officer_rank": "si",
+}
+
+
+@pytest.mark.parametrize("override", [
+    {"action_type": "teleported"},
+    {"officer_rank": "general"},
+    {"officer_name": None},
+    {"officer_rank": None},
+])
+def test_invalid_actions_are_rejected_with_422(client, override):
+    """Unknown action types or ranks, and missing officer details, are client errors"""
+    response = client.post("/police/actions", json={**ACTION, **override})
+    assert response.status_code == 422
@@ -0,0 +1,78 @@
+"""
+Tests for police officer availability index
+"""
+from datetime import datetime, timedelta
+
+from app.services.police_availability_service import PoliceAvailabilityService
+
+
+# Recent, so alerts logged in tests are still outstanding
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def _action(officer_id, rank, action_type, lat=None, lng=None, minutes=0, station="Central"):
+    action = {
+        "officer_id": officer_id,
+        "officer_name": officer_id,
+        "officer_rank": rank,
+        "officer_station": station,
+        "case_id": "CASE-1",
+        "action_type": action_type,
+        "timestamp": NOW + timedelta(minutes=minutes),
+    }
+    if lat is not None:
+        action["location"] = {"lat": lat, "lng": lng}
+    return action
+
+
+def _index():
+    index = PoliceAvailabilityService()
+    index.apply_action(_action("NEAR-SI", "si", "case_closed", 28.61, 77.21))
+    index.apply_action(_action("FAR-SP", "sp", "case_closed", 28.90, 77.50))
+    index.apply_action(_action("BUSY-DSP", "dsp", "on_scene", 28.61, 77.21))
+    return index
+
+
+def test_nearest_available_excludes_busy_officers():
+    """Officers whose latest action is active are not returned"""
+    officers = _index().nearest_available(28.6139, 77.2090, limit=5)
+    assert [o["officer_id"] for o in officers] == ["NEAR-SI", "FAR-SP"]
+
+
+def test_nearest_available_by_min_rank():
+    """Rank filter keeps only officers at or above the requested rank"""
+    officers = _index().nearest_available(28.6139, 77.2090, min_rank="inspector")
+    assert [o["officer_id"] for o in officers] == ["FAR-SP"]
+
+
+def test_apply_action_updates_availability_incrementally():
+    """New actions move officers in and out of the available set"""
+    index = _index()
+    index.apply_action(_action("NEAR-SI", "si", "alerted", minutes=5))
+    index.apply_action(_action("BUSY-DSP", "dsp", "case_closed", minutes=5))
+    
+    officers = index.nearest_available(28.6139, 77.2090, limit=5)
+    assert [o["officer_id"] for o in officers] == ["BUSY-DSP", "FAR-SP"]
+
+
+def test_apply_action_ignores_out_of_order_events():
+    """An older action never overwrites a newer one"""
+    index = _index()
+    index.apply_action(_action("NEAR-SI", "si", "alerted", minutes=-5))
+    assert index.get_officer("NEAR-SI").is_available
+
+
+def test_unacknowledged_alerts_expire():
+    """An officer alerted but never heard from again returns to the pool after the TTL"""
+    index = _index()
+    index.apply_action(_action("NEAR-SI", "si", "alerted", minutes=1))
+    assert not index.get_officer("NEAR-SI").is_available
+    
+    index.expire_alerts(NOW + index.alert_ttl + timedelta(minutes=2))
+    assert "NEAR-SI" in index.available_by_rank[index.get_officer("NEAR-SI").officer_rank]
+    
+    # A follow-up action supersedes the pending expiry
+    index.apply_action(_action("FAR-SP", "sp", "alerted", minutes=1))
+    index.apply_action(_action("FAR-SP", "sp", "on_scene", minutes=2))
+    index.expire_alerts(NOW + index.alert_ttl + timedelta(minutes=2))
+    assert "FAR-SP" not in index.available_by_rank[index.get_officer("FAR-SP").officer_rank]
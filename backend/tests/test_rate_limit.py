@@ -0,0 +1,122 @@
+"""
+Tests for the sliding-window rate limiter
+"""
+import pytest
+
+from app.core.rate_limit import RateLimiter, SlidingWindowCounter
+
+
+def test_counter_blocks_after_limit():
+    """Requests beyond the per-window limit are rejected with a retry hint"""
+    counter = SlidingWindowCounter([(60, 3)])
+    assert [counter.hit("client", 600.0)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = counter.hit("client", 600.0)
+    assert not allowed
+    assert retry_after == 60
+
+
+def test_counter_weights_previous_window():
+    """Half-way through a window, half of the previous window still counts"""
+    counter = SlidingWindowCounter([(60, 4)])
+    for _ in range(4):
+        counter.hit("client", 600.0)
+    # 4 * 0.5 carried over + 2 new = 4
+    assert counter.hit("client", 690.0)[0]
+    assert counter.hit("client", 690.0)[0]
+    assert not counter.hit("client", 690.0)[0]
+    # Two windows later nothing carries over
+    assert counter.hit("client", 790.0)[0]
+
+
+def test_counter_enforces_every_window():
+    """The tightest window wins"""
+    counter = SlidingWindowCounter([(60, 10), (3600, 2)])
+    assert counter.hit("client", 0.0)[0]
+    assert counter.hit("client", 0.0)[0]
+    allowed, retry_after = counter.hit("client", 0.0)
+    assert not allowed
+    assert retry_after == 3600
+
+
+@pytest.mark.asyncio
+async def test_limiter_local_fast_path_blocks_without_recounting():
+    """Blocked clients are rejected locally until the retry time passes"""
+    limiter = RateLimiter(per_minute=2, per_hour=100, redis_url=None)
+    assert (await limiter.hit("10.0.0.1"))[0]
+    assert (await limiter.hit("10.0.0.1"))[0]
+    assert not (await limiter.hit("10.0.0.1"))[0]
+    assert "10.0.0.1" in limiter.blocked_until
+    # Other clients are unaffected
+    assert (await limiter.hit("10.0.0.2"))[0]
+
+
+def test_middleware_rejects_and_exempts(monkeypatch):
+    """Over-limit clients get 429 while Twilio webhooks stay reachable"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.core import middleware
+    
+    monkeypatch.setattr(middleware, "rate_limiter", RateLimiter(per_minute=1, per_hour=100, redis_url=None))
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    
+    @app.post("/api/v1/calls/inbound")
+    async def inbound():
+        return {"ok": True}
+    
+    app.add_middleware(middleware.RateLimitMiddleware)
+    app.add_middleware(middleware.RequestLoggingMiddleware)
+    client = TestClient(app)
+    
+    first = client.get("/ping")
+    assert first.status_code == 200
+    assert "x-process-time" in first.headers
+    limited = client.get("/ping")
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) > 0
+    assert client.post("/api/v1/calls/inbound").status_code == 200
+
+
+
+def test_service_token_bypasses_limit(monkeypatch):
+    """Internal services sharing one IP are not limited when they send the service token"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.core import middleware
+    from shared.service_auth import SERVICE_TOKEN_HEADER
+    
+    monkeypatch.setattr(middleware, "rate_limiter", RateLimiter(per_minute=1, per_hour=100, redis_url=None))
+    monkeypatch.setattr(middleware.settings, "SERVICE_TOKEN", "internal-secret")
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    
+    app.add_middleware(middleware.RateLimitMiddleware)
+    client = TestClient(app)
+    
+    internal = {SERVICE_TOKEN_HEADER: "internal-secret"}
+    assert [client.get("/ping", headers=internal).status_code for _ in range(5)] == [200] * 5
+    assert client.get("/ping").status_code == 200
+    assert client.get("/ping", headers={SERVICE_TOKEN_HEADER: "wrong"}).status_code == 429
+
+
+def test_rate_limited_responses_carry_cors_headers(monkeypatch):
+    """The limiter sits inside CORS, so browsers can read 429s"""
+    from fastapi.testclient import TestClient
+    from app.core import middleware
+    from app.core.config import settings
+    from app.main import app
+    
+    monkeypatch.setattr(middleware, "rate_limiter", RateLimiter(per_minute=1, per_hour=100, redis_url=None))
+    client = TestClient(app)
+    origin = {"Origin": settings.CORS_ORIGINS[0]}
+    
+    assert client.get("/", headers=origin).status_code == 200
+    limited = client.get("/", headers=origin)
+    assert limited.status_code == 429
+    assert limited.headers["access-control-allow-origin"] == settings.CORS_ORIGINS[0]
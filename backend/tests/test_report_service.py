@@ -0,0 +1,69 @@
+"""
+Tests for report jobs and PDF rendering
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+
+from app.services.report_rendering import render_pdf
+from app.services.report_service import fingerprint_pipeline, job_key, report_sections
+
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 1, 8)
+
+
+def test_job_key_changes_only_with_request_or_data():
+    """Identical requests share a key; new data or a different range does not"""
+    fingerprint = {"count": 10, "last_updated": datetime(2024, 1, 7, 12)}
+    key = job_key("weekly", "pdf", START, END, fingerprint)
+    
+    assert key == job_key("weekly", "pdf", START, END, dict(fingerprint))
+    assert key != job_key("weekly", "pdf", START, END, {**fingerprint, "count": 11})
+    assert key != job_key("weekly", "pdf", START, END, {**fingerprint, "last_updated": datetime(2024, 1, 7, 13)})
+    assert key != job_key("weekly", "csv", START, END, fingerprint)
+    assert key != job_key("weekly", "pdf", START, datetime(2024, 1, 9), fingerprint)
+
+
+def test_fingerprint_covers_cases_resolved_in_range():
+    """Cases created earlier but resolved in the range change the resolution section, so the key"""
+    match = fingerprint_pipeline(START, END)[0]["$match"]
+    in_range = {"$gte": START, "$lt": END}
+    assert match == {"$or": [{"created_at": in_range}, {"resolved_at": in_range}]}
+
+
+def sections():
+    dashboard = {
+        "status": {"resolved": 3, "pending": 1},
+        "severity_level": {"high": 4},
+        "emergency_type": {"medical": 4},
+        "response_times": {"avg_response_minutes": 6.456},
+    }
+    resolution = {
+        "resolved_cases": 3,
+        "avg_resolution_time": 30.0,
+        "p50_resolution_time": 28.0,
+        "p90_resolution_time": 40.0,
+        "p99_resolution_time": None,
+        "histogram": {"0-30": 2, "30-60": 1},
+    }
+    return report_sections(dashboard, resolution)
+
+
+def test_report_sections():
+    """Sections are plain tables, with missing values marked"""
+    summary = dict(sections()[0][1])
+    assert summary["Total cases"] == 4
+    assert summary["Avg response (min)"] == 6.46
+    assert summary["P99 resolution (min)"] == "N/A"
+
+
+def test_render_pdf_in_worker_process(tmp_path):
+    """Rendering runs in a spawned process and leaves no partial file behind"""
+    report = {"title": "Weekly", "period": "2024-01-01 to 2024-01-08", "generated_at": "now", "sections": sections()}
+    output_path = tmp_path / "report.pdf"
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        assert pool.submit(render_pdf, report, str(output_path)).result() == str(output_path)
+    
+    assert output_path.read_bytes().startswith(b"%PDF")
+    assert [path.name for path in tmp_path.iterdir()] == ["report.pdf"]
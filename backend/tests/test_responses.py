@@ -0,0 +1,61 @@
+"""
+Tests for the orjson response encoder
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.responses import FastJSONResponse
+from app.models.emergency import SeverityLevel
+from app.schemas.emergency import EmergencyCaseListResponse
+
+
+def test_encodes_datetime_enum_and_object_id():
+    """Native types and ObjectIds render without jsonable_encoder"""
+    oid = ObjectId()
+    response = FastJSONResponse({
+        "_id": oid,
+        "severity_level": SeverityLevel.CRITICAL,
+        "created_at": datetime(2024, 1, 1, 12, 30),
+        "tags": {"fire"},
+    })
+    body = orjson.loads(response.body)
+    assert body == {
+        "_id": str(oid),
+        "severity_level": SeverityLevel.CRITICAL.value,
+        "created_at": "2024-01-01T12:30:00",
+        "tags": ["fire"],
+    }
+
+
+def test_encodes_pydantic_models():
+    """Models nested in content are dumped in JSON mode"""
+    payload = EmergencyCaseListResponse(cases=[], limit=10)
+    body = orjson.loads(FastJSONResponse({"data": payload}).body)
+    assert body["data"] == {"cases": [], "next_cursor": None, "total": None, "limit": 10}
+
+
+def test_rejects_unknown_types():
+    """Unsupported objects raise instead of being silently stringified"""
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
+
+
+def test_routes_returning_response_skip_jsonable_encoder():
+    """End to end: a route returning FastJSONResponse encodes ObjectId and Decimal"""
+    app = FastAPI(default_response_class=FastJSONResponse)
+    oid = ObjectId()
+    
+    @app.get("/raw")
+    async def raw():
+        return FastJSONResponse({"_id": oid, "cost": Decimal("12.50")}, status_code=201)
+    
+    response = TestClient(app).get("/raw")
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"_id": str(oid), "cost": 12.5}
@@ -0,0 +1,73 @@
+"""
+Tests for case metric rollups
+"""
+from datetime import datetime, timedelta
+
+from app.models.rollup import RollupGranularity
+from app.services.analytics_service import TREND_METRICS, summarize_trend
+from app.services.rollup_service import fill_series, granularity_for_range, rows_from_facets, truncate
+
+
+def test_truncate_to_bucket_start():
+    """Values map to the start of their minute, hour or day"""
+    value = datetime(2024, 3, 5, 14, 37, 52, 123)
+    assert truncate(value, RollupGranularity.MINUTE) == datetime(2024, 3, 5, 14, 37)
+    assert truncate(value, RollupGranularity.HOUR) == datetime(2024, 3, 5, 14)
+    assert truncate(value, RollupGranularity.DAY) == datetime(2024, 3, 5)
+
+
+def test_granularity_follows_range():
+    """Longer ranges read coarser rollups"""
+    start = datetime(2024, 1, 1)
+    assert granularity_for_range(start, start + timedelta(hours=2)) == RollupGranularity.MINUTE
+    assert granularity_for_range(start, start + timedelta(days=3)) == RollupGranularity.HOUR
+    assert granularity_for_range(start, start + timedelta(days=90)) == RollupGranularity.DAY
+
+
+def test_rows_from_facets_merges_events_per_bucket():
+    """Created, dispatched and resolved groups land in one row per bucket"""
+    first, second = datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 1, 10, 1)
+    rows = rows_from_facets(
+        {
+            "created": [{"_id": second, "count": 2}, {"_id": first, "count": 3}],
+            "dispatched": [{"_id": second, "sum": 9.0, "count": 2, "max": 6.0}],
+            "resolved": [],
+        },
+        RollupGranularity.MINUTE,
+    )
+    
+    assert [row["bucket_start"] for row in rows] == [first, second]
+    assert rows[0]["case_count"] == 3
+    assert rows[0]["response_time_count"] == 0
+    assert rows[1]["response_time_sum"] == 9.0
+    assert rows[1]["response_time_max"] == 6.0
+    assert rows[1]["resolution_time_max"] is None
+
+
+def test_summarize_trend_compares_halves():
+    """A single spike at either end does not decide the trend"""
+    assert summarize_trend([10, 10, 12, 14]) == {"trend": "increasing", "change_percentage": 30.0}
+    assert summarize_trend([10, 10, 10, 10, 10, 1]) == {"trend": "decreasing", "change_percentage": -30.0}
+    assert summarize_trend([5]) == {"trend": "stable", "change_percentage": 0.0}
+    assert summarize_trend([None, 4, 8, None]) == {"trend": "increasing", "change_percentage": 100.0}
+
+
+def test_sparse_buckets_are_zero_filled():
+    """Empty hours count as zero cases, so a collapse in volume reads as decreasing"""
+    start = datetime(2024, 1, 1)
+    end = start + timedelta(hours=48)
+    # One case every hour for a day, then two cases in the next day
+    hours = list(range(24)) + [30, 40]
+    stored = rows_from_facets(
+        {"created": [{"_id": start + timedelta(hours=h), "count": 1} for h in hours]},
+        RollupGranularity.HOUR,
+    )
+    
+    rows = fill_series(stored, RollupGranularity.HOUR, start, end)
+    assert len(rows) == 48
+    assert rows[25]["case_count"] == 0
+    
+    counts = [TREND_METRICS["case_count"](row) for row in rows]
+    assert summarize_trend(counts)["trend"] == "decreasing"
+    # Empty buckets have no average, rather than an average of zero
+    assert TREND_METRICS["avg_response_time"](rows[25]) is None
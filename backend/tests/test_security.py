@@ -0,0 +1,89 @@
+"""
+Tests for JWT verification caching
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import VerifiedTokenCache, create_access_token, verify_token
+
+
+def test_cache_expires_at_exp():
+    """Entries are dropped once the token's exp has passed"""
+    cache = VerifiedTokenCache(maxsize=10)
+    cache.put("fresh", {"sub": "u1", "exp": time.time() + 60})
+    cache.put("stale", {"sub": "u2", "exp": time.time() - 1})
+    assert cache.get("fresh")["sub"] == "u1"
+    assert cache.get("stale") is None
+    assert len(cache.entries) == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """The cache stays bounded, evicting the least recently used token"""
+    cache = VerifiedTokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "a", "exp": exp})
+    cache.put("b", {"sub": "b", "exp": exp})
+    cache.get("a")
+    cache.put("c", {"sub": "c", "exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_verify_token_uses_cache(monkeypatch):
+    """A verified token is served from the cache without decoding again"""
+    security.token_cache.clear()
+    token = create_access_token({"sub": "user-1"})
+    assert (await verify_token(token))["sub"] == "user-1"
+    
+    def fail(_token):
+        raise AssertionError("token decoded twice")
+    
+    monkeypatch.setattr(security, "decode_token", fail)
+    assert (await verify_token(token))["sub"] == "user-1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["jose", "pyjwt"])
+async def test_expired_and_tampered_tokens_rejected(monkeypatch, backend):
+    """Both backends reject expired and tampered tokens"""
+    monkeypatch.setattr(security.settings, "JWT_BACKEND", backend)
+    security.token_cache.clear()
+    expired = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=-5))
+    tampered = create_access_token({"sub": "user-1"})[:-2] + "xx"
+    for token in (expired, tampered):
+        with pytest.raises(HTTPException):
+            await verify_token(token)
+
+
+def test_service_token_authenticates_as_service_principal(monkeypatch):
+    """Internal callers with SERVICE_TOKEN pass user-authenticated routes; others get 401"""
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+    
+    from app.core.dependencies import get_current_active_user
+    from shared.service_auth import SERVICE_TOKEN_HEADER
+    
+    monkeypatch.setattr(security.settings, "SERVICE_TOKEN", "internal-secret")
+    app = FastAPI()
+    
+    @app.get("/whoami")
+    async def whoami(current_user: dict = Depends(get_current_active_user)):
+        return current_user
+    
+    client = TestClient(app)
+    response = client.get("/whoami", headers={SERVICE_TOKEN_HEADER: "internal-secret"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "service"
+    
+    assert client.get("/whoami").status_code == 401
+    assert client.get("/whoami", headers={SERVICE_TOKEN_HEADER: "wrong"}).status_code == 401
+    
+    token = create_access_token({"sub": "dispatcher-1"})
+    response = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["sub"] == "dispatcher-1"
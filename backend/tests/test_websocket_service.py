@@ -0,0 +1,141 @@
+"""
+Tests for WebSocket channel fan-out
+"""
+import asyncio
+
+import orjson
+import pytest
+
+from app.services.websocket_service import Connection, WebSocketService
+
+
+class RecordingWebSocket:
+    """Minimal WebSocket stand-in that records frames, optionally slowly"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = []
+        self.closed_with = None
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, frame: str):
+        await asyncio.sleep(self.delay)
+        self.frames.append(orjson.loads(frame))
+    
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+def test_queue_coalesces_keys_and_drops_oldest():
+    """Keyed frames replace queued state; unkeyed overflow drops the oldest"""
+    connection = Connection(RecordingWebSocket(), max_queue=3)
+    connection.enqueue("a1", key="ambulance:a")
+    connection.enqueue("b1", key="ambulance:b")
+    connection.enqueue("a2", key="ambulance:a")
+    assert list(connection.pending.values()) == ["a2", "b1"]
+    
+    connection.enqueue("e1")
+    connection.enqueue("e2")
+    assert list(connection.pending.values()) == ["b1", "e1", "e2"]
+    assert connection.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_only_subscribers_and_slow_clients_do_not_block():
+    """A stalled subscriber does not hold up delivery to the others"""
+    service = WebSocketService(send_timeout=0.2)
+    fast, slow, other = RecordingWebSocket(), RecordingWebSocket(delay=10), RecordingWebSocket()
+    for websocket in (fast, slow, other):
+        await service.connect(websocket)
+    await service.subscribe(fast, "ambulances")
+    await service.subscribe(slow, "ambulances")
+    await service.subscribe(other, "cases")
+    
+    await service.broadcast("ambulances", {"id": 1})
+    await asyncio.sleep(0.05)
+    assert fast.frames == [{"id": 1}]
+    assert other.frames == []
+    
+    # The slow client times out and is dropped from the channel index
+    await asyncio.sleep(0.3)
+    assert slow.closed_with == 1013
+    assert slow not in service.connections
+    assert {c.websocket for c in service.channels["ambulances"]} == {fast}
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_live_updates_snapshot_then_batched_deltas():
+    """Subscribers get a snapshot, then one frame per flush carrying only changed fields"""
+    from app.services.live_updates_service import LiveUpdatesService
+    
+    service = WebSocketService()
+    live = LiveUpdatesService(service)
+    await live.publish("ambulances", "AMB-1", {"ambulance_id": "AMB-1", "status": "available", "current_lat": 28.6})
+    await live.flush()
+    
+    websocket = RecordingWebSocket()
+    await service.connect(websocket)
+    await service.subscribe(websocket, "ambulances")
+    live.send_snapshot(websocket, "ambulances")
+    
+    await live.publish("ambulances", "AMB-1", {"ambulance_id": "AMB-1", "status": "available", "current_lat": 28.7})
+    await live.publish("ambulances", "AMB-1", {"ambulance_id": "AMB-1", "status": "en_route", "current_lat": 28.7})
+    await live.publish("ambulances", "AMB-2", {"ambulance_id": "AMB-2", "status": "available"})
+    await live.remove("ambulances", "AMB-2")
+    await live.flush()
+    await asyncio.sleep(0.01)
+    
+    snapshot, delta = websocket.frames
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["items"]["AMB-1"]["current_lat"] == 28.6
+    assert delta["type"] == "delta"
+    assert delta["seq"] == snapshot["seq"] + 1
+    assert delta["updates"] == {"AMB-1": {"current_lat": 28.7, "status": "en_route"}}
+    assert delta["removed"] == ["AMB-2"]
+    await service.stop()
+
+
+def endpoint_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    
+    from app.api.v1 import websocket
+    
+    app = FastAPI()
+    app.include_router(websocket.router, prefix="/ws")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("first_message", [
+    {"type": "subscribe", "channel": "cases"},
+    {"type": "auth", "token": "not-a-jwt"},
+])
+def test_unauthenticated_sockets_are_closed_before_any_snapshot(first_message):
+    """Subscribing without a valid JWT closes the socket with 1008"""
+    from starlette.websockets import WebSocketDisconnect
+    
+    with endpoint_client().websocket_connect("/ws/") as ws:
+        ws.send_json(first_message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+
+def test_authenticated_sockets_subscribe():
+    """A JWT in the first message or the query string opens the socket and its snapshots"""
+    from app.core.security import create_access_token
+    
+    token = create_access_token({"sub": "dispatcher-1"})
+    client = endpoint_client()
+    
+    with client.websocket_connect("/ws/") as ws:
+        ws.send_json({"type": "auth", "token": token})
+        ws.send_json({"type": "subscribe", "channel": "cases"})
+        assert ws.receive_json()["type"] == "snapshot"
+    
+    with client.websocket_connect(f"/ws/?token={token}") as ws:
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"echo": {"type": "ping"}}
@@ -1,13 +1,63 @@
 'use client'
 
+import { useMemo } from 'react'
+import { useLiveChannel } from '@/hooks/useWebSocket'
+
+const STATUS_COLORS: Record<string, string> = {
+  available: 'bg-green-500',
+  dispatched: 'bg-yellow-500',
+  en_route: 'bg-orange-500',
+  on_scene: 'bg-red-500',
+  transporting: 'bg-purple-500',
+  returning: 'bg-blue-500',
+  offline: 'bg-gray-400',
+}
+
 export default function AmbulanceMap() {
+  // Positions stream in as deltas; no polling
+  const { items, ready } = useLiveChannel('ambulances')
+
+  const ambulances = useMemo(
+    () => Object.values(items).filter((a: any) => a.current_lat != null && a.current_lng != null),
+    [items]
+  )
+
+  const bounds = useMemo(() => {
+    const lats = ambulances.map((a: any) => a.current_lat)
+    const lngs = ambulances.map((a: any) => a.current_lng)
+    return {
+      minLat: Math.min(...lats),
+      maxLat: Math.max(...lats),
+      minLng: Math.min(...lngs),
+      maxLng: Math.max(...lngs),
+    }
+  }, [ambulances])
+
+  const position = (a: any) => ({
+    left: `${bounds.maxLng > bounds.minLng ? ((a.current_lng - bounds.minLng) / (bounds.maxLng - bounds.minLng)) * 90 + 5 : 50}%`,
+    top: `${bounds.maxLat > bounds.minLat ? ((bounds.maxLat - a.current_lat) / (bounds.maxLat - bounds.minLat)) * 90 + 5 : 50}%`,
+  })
+
   return (
     <div className="bg-white p-6 rounded-lg shadow">
       <h2 className="text-xl font-bold mb-4">Ambulance Tracking</h2>
-      <div className="h-64 bg-gray-100 rounded flex items-center justify-center">
-        <p className="text-gray-500">Map visualization coming soon</p>
+      <div className="relative h-64 bg-gray-100 rounded">
+        {!ready ? (
+          <p className="absolute inset-0 flex items-center justify-center text-gray-500">Loading...</p>
+        ) : ambulances.length === 0 ? (
+          <p className="absolute inset-0 flex items-center justify-center text-gray-500">No ambulances reporting</p>
+        ) : (
+          ambulances.map((a: any) => (
+            <span
+              key={a.ambulance_id}
+              title={`${a.ambulance_number || a.ambulance_id} - ${a.status}${a.eta_minutes != null ? ` (ETA ${a.eta_minutes} min)` : ''}`}
+              className={`absolute w-3 h-3 -ml-1.5 -mt-1.5 rounded-full ${STATUS_COLORS[a.status] || 'bg-gray-400'}`}
+              style={position(a)}
+            />
+          ))
+        )}
       </div>
+      <p className="text-sm text-gray-500 mt-2">{ambulances.length} ambulances live</p>
     </div>
   )
 }
-
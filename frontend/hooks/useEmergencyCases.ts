@@ -1,34 +1,19 @@
 'use client'
 
-import { useEffect, useState } from 'react'
-import apiClient from '@/lib/api/client'
+import { useMemo } from 'react'
+import { useLiveChannel } from '@/hooks/useWebSocket'
 
 export function useEmergencyCases() {
-  const [cases, setCases] = useState<any[]>([])
-  const [loading, setLoading] = useState(true)
-  const [error, setError] = useState<string | null>(null)
-
-  useEffect(() => {
-    const fetchCases = async () => {
-      try {
-        setLoading(true)
-        const response = await apiClient.get('/emergency/')
-        setCases(response.data.cases || [])
-      } catch (err: any) {
-        setError(err.message)
-      } finally {
-        setLoading(false)
-      }
-    }
-
-    fetchCases()
-
-    // Refresh every 30 seconds
-    const interval = setInterval(fetchCases, 30000)
-
-    return () => clearInterval(interval)
-  }, [])
-
-  return { cases, loading, error }
+  // Open cases arrive as a snapshot on subscribe, then as field-level deltas
+  const { items, ready } = useLiveChannel('cases')
+
+  const cases = useMemo(
+    () =>
+      Object.values(items).sort((a: any, b: any) =>
+        (b.created_at || '').localeCompare(a.created_at || '')
+      ),
+    [items]
+  )
+
+  return { cases, loading: !ready, error: null as string | null }
 }
-
@@ -1,39 +1,155 @@
 'use client'
 
 import { useEffect, useState } from 'react'
-import { connectWebSocket, disconnectWebSocket, getSocket } from '@/lib/websocket'
+
+type Listener = (message: any) => void
+
+const WS_URL =
+  (process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000').replace(/^http/, 'ws') +
+  '/api/v1/websocket/'
+
+// One socket shared by every hook on the page
+let socket: WebSocket | null = null
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+let reconnectDelay = 1000
+let users = 0
+const channelListeners = new Map<string, Set<Listener>>()
+const statusListeners = new Set<(connected: boolean) => void>()
+
+// JWT saved at login; the backend closes the socket (1008) without one
+function accessToken() {
+  return typeof window === 'undefined' ? null : window.localStorage.getItem('access_token')
+}
+
+function send(payload: object) {
+  if (socket && socket.readyState === WebSocket.OPEN) {
+    socket.send(JSON.stringify(payload))
+  }
+}
+
+function connect() {
+  socket = new WebSocket(WS_URL)
+
+  socket.onopen = () => {
+    // Authenticate first; the token stays out of the URL and server logs
+    send({ type: 'auth', token: accessToken() })
+    reconnectDelay = 1000
+    statusListeners.forEach((listener) => listener(true))
+    // Resubscribing also brings a fresh snapshot for live channels
+    channelListeners.forEach((_, channel) => send({ type: 'subscribe', channel }))
+  }
+
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data)
+    const listeners = message.channel && channelListeners.get(message.channel)
+    listeners?.forEach((listener) => listener(message))
+  }
+
+  socket.onclose = () => {
+    statusListeners.forEach((listener) => listener(false))
+    if (users > 0) {
+      reconnectTimer = setTimeout(connect, reconnectDelay)
+      reconnectDelay = Math.min(reconnectDelay * 2, 30000)
+    }
+  }
+}
+
+function acquire() {
+  users += 1
+  if (!socket) {
+    connect()
+  }
+}
+
+function release() {
+  users -= 1
+  if (users === 0) {
+    if (reconnectTimer) clearTimeout(reconnectTimer)
+    socket?.close()
+    socket = null
+  }
+}
+
+export function subscribe(channel: string, listener: Listener) {
+  let listeners = channelListeners.get(channel)
+  if (!listeners) {
+    listeners = new Set()
+    channelListeners.set(channel, listeners)
+  }
+  listeners.add(listener)
+  // Every new listener needs its own snapshot, even on a channel already open
+  send({ type: 'subscribe', channel })
+
+  return () => {
+    listeners!.delete(listener)
+    if (listeners!.size === 0) {
+      channelListeners.delete(channel)
+      send({ type: 'unsubscribe', channel })
+    }
+  }
+}
 
 export function useWebSocket() {
   const [connected, setConnected] = useState(false)
-  const [messages, setMessages] = useState<any[]>([])
 
   useEffect(() => {
-    const socket = connectWebSocket()
+    acquire()
+    statusListeners.add(setConnected)
+    setConnected(socket?.readyState === WebSocket.OPEN)
 
-    socket.on('connect', () => {
-      setConnected(true)
-    })
+    return () => {
+      statusListeners.delete(setConnected)
+      release()
+    }
+  }, [])
 
-    socket.on('disconnect', () => {
-      setConnected(false)
-    })
+  return { connected, subscribe }
+}
+
+/**
+ * Live state of a channel: starts from the server snapshot, then applies
+ * batched deltas (changed fields only). A sequence gap means a frame was
+ * dropped, so the channel is resubscribed to get a fresh snapshot.
+ */
+export function useLiveChannel<T = any>(channel: string) {
+  const [items, setItems] = useState<Record<string, T>>({})
+  const [ready, setReady] = useState(false)
+
+  useEffect(() => {
+    acquire()
+    let seq = -1
 
-    socket.on('message', (data: any) => {
-      setMessages((prev) => [...prev, data])
+    const unsubscribe = subscribe(channel, (message) => {
+      if (message.type === 'snapshot') {
+        seq = message.seq
+        setItems(message.items)
+        setReady(true)
+      } else if (message.type === 'delta') {
+        if (seq < 0) return
+        if (message.seq !== seq + 1) {
+          seq = -1
+          send({ type: 'subscribe', channel })
+          return
+        }
+        seq = message.seq
+        setItems((prev) => {
+          const next = { ...prev }
+          for (const [id, fields] of Object.entries(message.updates as Record<string, Partial<T>>)) {
+            next[id] = { ...next[id], ...fields } as T
+          }
+          for (const id of message.removed as string[]) {
+            delete next[id]
+          }
+          return next
+        })
+      }
     })
 
     return () => {
-      disconnectWebSocket()
+      unsubscribe()
+      release()
     }
-  }, [])
+  }, [channel])
 
-  const sendMessage = (channel: string, data: any) => {
-    const socket = getSocket()
-    if (socket) {
-      socket.emit('subscribe', { type: 'subscribe', channel, data })
-    }
-  }
-
-  return { connected, messages, sendMessage }
+  return { items, ready }
 }
-
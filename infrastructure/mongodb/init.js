@@ -9,28 +9,52 @@ db.createCollection('Ambulance_Live_Tracking');
 db.createCollection('Police_Officer_Actions');
 db.createCollection('AI_Recommendations');
 db.createCollection('Location_Metadata');
+db.createCollection('Hospital_Reservations');
+db.createCollection('Case_Rollups', {
+  timeseries: { timeField: 'bucket_start', metaField: 'granularity', granularity: 'minutes' }
+});
+db.createCollection('Rollup_State');
+db.createCollection('Report_Jobs');
 
 // Create indexes
 db.Emergency_Cases.createIndex({ case_id: 1 }, { unique: true });
 db.Emergency_Cases.createIndex({ status: 1 });
 db.Emergency_Cases.createIndex({ severity_level: 1 });
 db.Emergency_Cases.createIndex({ created_at: -1 });
+db.Emergency_Cases.createIndex({ created_at: -1, _id: -1 });
+db.Emergency_Cases.createIndex({ status: 1, created_at: -1, _id: -1 });
+db.Emergency_Cases.createIndex({ dispatched_at: 1 });
+db.Emergency_Cases.createIndex({ resolved_at: 1 });
 
 db.Caller_Transcripts.createIndex({ case_id: 1 });
 db.Caller_Transcripts.createIndex({ call_id: 1 });
 
 db.Hospital_Resources.createIndex({ hospital_id: 1 }, { unique: true });
 db.Hospital_Resources.createIndex({ is_active: 1 });
+db.Hospital_Resources.createIndex({ is_active: 1, created_at: -1, _id: -1 });
+
+db.Hospital_Reservations.createIndex({ reservation_id: 1 }, { unique: true });
+db.Hospital_Reservations.createIndex({ case_id: 1, hospital_id: 1 }, { unique: true, partialFilterExpression: { status: "held" } });
+db.Hospital_Reservations.createIndex({ status: 1, expires_at: 1 });
+db.Hospital_Reservations.createIndex({ purge_at: 1 }, { expireAfterSeconds: 0 });
 
 db.Ambulance_Live_Tracking.createIndex({ ambulance_id: 1 }, { unique: true });
 db.Ambulance_Live_Tracking.createIndex({ status: 1 });
 db.Ambulance_Live_Tracking.createIndex({ assigned_case: 1 });
+db.Ambulance_Live_Tracking.createIndex({ status: 1, created_at: -1, _id: -1 });
 
 db.Police_Officer_Actions.createIndex({ case_id: 1 });
 db.Police_Officer_Actions.createIndex({ officer_id: 1 });
+db.Police_Officer_Actions.createIndex({ officer_id: 1, timestamp: -1 });
+db.Police_Officer_Actions.createIndex({ case_id: 1, timestamp: -1, _id: -1 });
 
 db.AI_Recommendations.createIndex({ case_id: 1 });
 db.AI_Recommendations.createIndex({ recommendation_id: 1 }, { unique: true });
 
+db.Case_Rollups.createIndex({ granularity: 1, bucket_start: 1 });
+db.Rollup_State.createIndex({ job: 1 }, { unique: true });
+db.Report_Jobs.createIndex({ job_id: 1 }, { unique: true });
+db.Report_Jobs.createIndex({ key: 1 }, { unique: true });
+
 print('Database initialized successfully');
 
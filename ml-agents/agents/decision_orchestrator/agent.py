@@ -2,18 +2,35 @@
 Decision Orchestrator Agent
 Central decision-making hub that coordinates all other agents
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Awaitable
 from loguru import logger
+import asyncio
 import httpx
 
+from utils.helpers import haversine_km
+from shared.service_auth import backend_url, service_headers
+
 
 class DecisionOrchestratorAgent:
     """Central decision orchestrator agent"""
     
     def __init__(self):
         """Initialize the orchestrator"""
-        self.backend_url = "http://localhost:8000"
+        self.backend_url = backend_url()
         self.action_systems_url = "http://localhost:8002"
+        
+        # Per-source deadlines (seconds) for context gathering
+        self.context_timeouts = {
+            "transcript": 1.5,
+            "related_cases": 2.0,
+            "ambulances": 1.0,
+            "hospitals": 1.0,
+        }
+        self.nearby_radius_km = 15.0
+        self.max_nearby_resources = 5
+        self.page_size = 500
+        # Pages read per decision; the deadline may stop it sooner
+        self.max_ambulance_pages = 4
     
     async def make_decision(self, case_id: str) -> Dict[str, Any]:
         """Make decision for an emergency case"""
@@ -54,7 +71,7 @@ class DecisionOrchestratorAgent:
     async def _fetch_case_data(self, case_id: str) -> Optional[Dict[str, Any]]:
         """Fetch case data from backend"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(headers=service_headers()) as client:
                 response = await client.get(
                     f"{self.backend_url}/api/v1/emergency/{case_id}"
                 )
@@ -73,12 +90,149 @@ class DecisionOrchestratorAgent:
             "location": case_data.get("location", {}),
         }
         
-        # Fetch transcript if available
-        # Fetch related cases
-        # Fetch available resources
+        lat, lng = self._case_coordinates(case_data)
+        
+        # Ambulance pages land in this list as they arrive, so a deadline keeps what was read
+        fetched_ambulances: List[Dict[str, Any]] = []
+        
+        # Fetch transcript, related cases and available resources concurrently;
+        # each source has its own deadline so total latency is bounded by the slowest one
+        async with httpx.AsyncClient(base_url=self.backend_url, headers=service_headers()) as client:
+            transcript, related_cases, _, hospitals = await asyncio.gather(
+                self._with_deadline("transcript", self._fetch_transcript(client, case_id), None),
+                self._with_deadline("related_cases", self._fetch_related_cases(client, case_id), {}),
+                self._with_deadline(
+                    "ambulances",
+                    self._fetch_available_ambulances(client, fetched_ambulances),
+                    None,
+                ),
+                self._with_deadline(
+                    "hospitals",
+                    self._fetch_nearby_hospitals(client, lat, lng, context["severity"]),
+                    [],
+                ),
+            )
+        
+        context.update({
+            "transcript": transcript,
+            "related_cases": related_cases.get("related_cases", []),
+            "cluster_id": related_cases.get("cluster_id"),
+            "available_ambulances": self._nearest(fetched_ambulances, lat, lng, "current_lat", "current_lng"),
+            "available_hospitals": hospitals,
+        })
         
         return context
     
+    async def _with_deadline(self, source: str, coro: Awaitable[Any], default: Any) -> Any:
+        """Await a context source, falling back to a default on timeout or error"""
+        try:
+            return await asyncio.wait_for(coro, timeout=self.context_timeouts[source])
+        except asyncio.TimeoutError:
+            logger.warning(f"Context source '{source}' exceeded {self.context_timeouts[source]}s deadline")
+        except Exception as e:
+            logger.error(f"Error fetching context source '{source}': {e}")
+        return default
+    
+    async def _fetch_transcript(
+        self,
+        client: httpx.AsyncClient,
+        case_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch latest caller transcript for the case"""
+        response = await client.get(f"/api/v1/emergency/{case_id}/transcript")
+        if response.status_code == 200:
+            return response.json()
+        return None
+    
+    async def _fetch_related_cases(
+        self,
+        client: httpx.AsyncClient,
+        case_id: str,
+    ) -> Dict[str, Any]:
+        """Fetch cluster matches for the case"""
+        response = await client.post("/api/v1/ai/cluster", json={"case_id": case_id})
+        if response.status_code == 200:
+            return response.json()
+        return {}
+    
+    async def _fetch_available_ambulances(
+        self,
+        client: httpx.AsyncClient,
+        ambulances: List[Dict[str, Any]],
+    ):
+        """Append available ambulances to the list, page by page, up to max_ambulance_pages"""
+        params: Dict[str, Any] = {"status": "available", "limit": self.page_size}
+        for _ in range(self.max_ambulance_pages):
+            response = await client.get("/api/v1/ambulance/", params=params)
+            if response.status_code != 200:
+                return
+            data = response.json()
+            ambulances.extend(data.get("ambulances", []))
+            if not data.get("next_cursor"):
+                return
+            params["cursor"] = data["next_cursor"]
+        logger.warning(f"Stopped after {self.max_ambulance_pages} pages of available ambulances")
+    
+    async def _fetch_nearby_hospitals(
+        self,
+        client: httpx.AsyncClient,
+        lat: Optional[float],
+        lng: Optional[float],
+        severity: str,
+    ) -> List[Dict[str, Any]]:
+        """Fetch the best hospitals for the case from the backend ranking"""
+        if lat is None or lng is None:
+            # Ranking needs a location; without one any active hospital will do
+            response = await client.get(
+                "/api/v1/hospital/",
+                params={"is_active": True, "limit": self.max_nearby_resources},
+            )
+            if response.status_code != 200:
+                return []
+            return response.json().get("hospitals", [])
+        
+        # Ranked over the backend's full capacity snapshot by ETA, beds and inbound load
+        response = await client.get(
+            "/api/v1/hospital/rank",
+            params={"lat": lat, "lng": lng, "severity": severity, "limit": self.max_nearby_resources},
+        )
+        if response.status_code != 200:
+            return []
+        return response.json().get("hospitals", [])
+    
+    def _nearest(
+        self,
+        resources: List[Dict[str, Any]],
+        lat: Optional[float],
+        lng: Optional[float],
+        lat_key: str,
+        lng_key: str,
+    ) -> List[Dict[str, Any]]:
+        """Keep resources within the nearby radius, closest first"""
+        if lat is None or lng is None:
+            return resources[:self.max_nearby_resources]
+        
+        nearby = []
+        for resource in resources:
+            r_lat, r_lng = resource.get(lat_key), resource.get(lng_key)
+            if r_lat is None or r_lng is None:
+                continue
+            distance_km = haversine_km(lat, lng, r_lat, r_lng)
+            if distance_km <= self.nearby_radius_km:
+                nearby.append({**resource, "distance_km": round(distance_km, 2)})
+        
+        nearby.sort(key=lambda r: r["distance_km"])
+        return nearby[:self.max_nearby_resources]
+    
+    def _case_coordinates(self, case_data: Dict[str, Any]) -> tuple[Optional[float], Optional[float]]:
+        """Extract case coordinates"""
+        location = case_data.get("location") or {}
+        lat = case_data.get("location_lat")
+        lng = case_data.get("location_lng")
+        if lat is None or lng is None:
+            lat, lng = location.get("lat"), location.get("lng")
+        return lat, lng
+    
     async def _generate_recommendations(
         self,
         case_id: str,
@@ -88,24 +242,45 @@ class DecisionOrchestratorAgent:
         recommendations = []
         severity = context.get("severity", "medium")
         emergency_type = context.get("emergency_type", "other")
+        ambulances = context.get("available_ambulances", [])
+        hospitals = context.get("available_hospitals", [])
         
         # Always recommend ambulance for high/critical severity
         if severity in ["high", "critical"]:
-            recommendations.append({
+            recommendation = {
                 "type": "dispatch_ambulance",
                 "priority": 1,
                 "confidence": 0.95,
                 "reasoning": f"{severity.upper()} severity requires immediate ambulance dispatch",
-            })
+            }
+            if ambulances:
+                nearest = ambulances[0]
+                recommendation["target_entity"] = nearest.get("ambulance_id")
+                recommendation["target_entity_type"] = "ambulance"
+                if "distance_km" in nearest:
+                    recommendation["reasoning"] += f" (nearest unit {nearest['distance_km']} km away)"
+            else:
+                recommendation["confidence"] = 0.7
+                recommendation["reasoning"] += " (no available ambulance found nearby)"
+            recommendations.append(recommendation)
         
         # Recommend hospital notification for medical emergencies
         if emergency_type == "medical" or severity in ["high", "critical"]:
-            recommendations.append({
+            recommendation = {
                 "type": "alert_hospital",
                 "priority": 2,
                 "confidence": 0.9,
                 "reasoning": "Medical emergency requires hospital preparation",
-            })
+            }
+            if hospitals:
+                nearest = hospitals[0]
+                recommendation["target_entity"] = nearest.get("hospital_id")
+                recommendation["target_entity_type"] = "hospital"
+                recommendation["reasoning"] += (
+                    f" ({nearest.get('hospital_name', nearest.get('hospital_id'))} "
+                    f"has {nearest.get('icu_available', 0)} ICU beds free)"
+                )
+            recommendations.append(recommendation)
         
         # Recommend police for crime/fire/accidents
         if emergency_type in ["crime", "fire", "accident"]:
@@ -158,7 +333,7 @@ class DecisionOrchestratorAgent:
                     # Call road clearance system
                     await self._request_road_clearance(case_id)
                     actions_taken.append("road_clearance_requested")
-                    
+            
             except Exception as e:
                 logger.error(f"Error executing action {rec_type}: {e}")
         
@@ -12,11 +12,13 @@ from agents.case_clustering.agent import CaseClusteringAgent
 from agents.decision_orchestrator.agent import DecisionOrchestratorAgent
 from agents.communication_ai.agent import CommunicationAIAgent
 from agents.code_generation.agent import CodeGenerationAgent
+from shared.responses import FastJSONResponse
 
 app = FastAPI(
     title="Shivay ML Agents Service",
     description="ML/AI Agents for emergency response",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -61,7 +63,7 @@ async def transcribe_audio(request: dict):
     audio_url = request.get("audio_url")
     language = request.get("language")
     result = await speech_agent.transcribe_from_url(audio_url, language)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/nlp/analyze")
@@ -70,7 +72,7 @@ async def analyze_text(request: dict):
     text = request.get("text")
     case_id = request.get("case_id")
     result = await nlp_agent.analyze_text(text, case_id)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/severity/score")
@@ -79,7 +81,7 @@ async def score_severity(request: dict):
     case_id = request.get("case_id")
     context = request.get("context", {})
     result = await severity_agent.score_severity(case_id, context)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/clustering/cluster")
@@ -89,7 +91,7 @@ async def cluster_cases(request: dict):
     case_text = request.get("case_text", "")
     historical_cases = request.get("historical_cases", [])
     result = await clustering_agent.find_similar_cases(case_id, case_text, historical_cases)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/orchestrator/decide")
@@ -97,7 +99,7 @@ async def make_decision(request: dict):
     """Make decision"""
     case_id = request.get("case_id")
     result = await orchestrator_agent.make_decision(case_id)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/communication/call")
@@ -107,7 +109,7 @@ async def make_call(request: dict):
     message = request.get("message")
     case_id = request.get("case_id")
     result = await communication_agent.make_outbound_call(to_number, message, case_id)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/communication/sms")
@@ -117,7 +119,7 @@ async def send_sms(request: dict):
     message = request.get("message")
     case_id = request.get("case_id")
     result = await communication_agent.send_sms(to_number, message, case_id)
-    return result
+    return FastJSONResponse(result)
 
 
 @app.post("/agents/code-generation/widget")
@@ -126,5 +128,5 @@ async def generate_widget(request: dict):
     widget_type = request.get("widget_type")
     config = request.get("config", {})
     result = await code_agent.generate_dashboard_widget(widget_type, config)
-    return result
+    return FastJSONResponse(result)
 
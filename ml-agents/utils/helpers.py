@@ -27,3 +27,14 @@ def calculate_similarity(emb1: List[float], emb2: List[float]) -> float:
         return float(dot_product / (norm1 * norm2))
     return 0.0
 
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Calculate great-circle distance between two points in kilometers"""
+    lat1, lng1, lat2, lng2 = map(np.radians, [lat1, lng1, lat2, lng2])
+    
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    
+    return float(2 * 6371 * np.arcsin(np.sqrt(a)))
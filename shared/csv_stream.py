@@ -0,0 +1,96 @@
+"""
+Streaming CSV encoding for large exports
+"""
+import csv
+import io
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Union
+from loguru import logger
+
+
+Rows = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+
+def _cell(value: Any) -> Any:
+    """CSV form of a value: ISO timestamps, JSON for nested data"""
+    if value is None or type(value) in (str, int, float):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+async def _aiter(rows: Rows) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def iter_csv(
+    rows: Rows,
+    columns: Optional[List[str]] = None,
+    compress: bool = False,
+    chunk_size: int = 64 * 1024,
+    stats: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[bytes]:
+    """Encode rows as CSV (optionally gzip) chunks of about chunk_size bytes; memory stays constant"""
+    stats = stats if stats is not None else {}
+    stats.update({"rows": 0, "bytes": 0, "compressed_bytes": 0, "chunks": 0, "max_chunk_ms": 0.0})
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    chunk_started = time.perf_counter()
+    
+    def drain(final: bool = False) -> bytes:
+        nonlocal chunk_started
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+        stats["bytes"] += len(data)
+        if compressor:
+            data = compressor.compress(data) + (compressor.flush() if final else b"")
+            stats["compressed_bytes"] += len(data)
+        if data:
+            stats["chunks"] += 1
+            elapsed_ms = (time.perf_counter() - chunk_started) * 1000
+            stats["max_chunk_ms"] = max(stats["max_chunk_ms"], round(elapsed_ms, 2))
+        chunk_started = time.perf_counter()
+        return data
+    
+    source = _aiter(rows)
+    if columns is None:
+        # Infer the schema from the first row
+        try:
+            first = await source.__anext__()
+        except StopAsyncIteration:
+            return
+        columns = list(first.keys())
+        writer.writerow(columns)
+        writer.writerow([_cell(first.get(column)) for column in columns])
+        stats["rows"] += 1
+    else:
+        writer.writerow(columns)
+    
+    async for row in source:
+        writer.writerow([_cell(row.get(column)) for column in columns])
+        stats["rows"] += 1
+        if buffer.tell() >= chunk_size:
+            data = drain()
+            if data:
+                yield data
+    
+    data = drain(final=True)
+    if data:
+        yield data
+    logger.info(
+        f"CSV stream finished: {stats['rows']} rows, {stats['bytes']} bytes in {stats['chunks']} chunks "
+        f"(slowest chunk {stats['max_chunk_ms']}ms)"
+    )
@@ -0,0 +1,22 @@
+"""
+Identifies internal service-to-service calls into the backend
+
+The backend treats a request carrying SERVICE_TOKEN as the "service" principal,
+so internal callers pass its authenticated routes without a user JWT.
+"""
+import os
+from typing import Dict
+
+
+SERVICE_TOKEN_HEADER = "X-Service-Token"
+
+
+def service_headers() -> Dict[str, str]:
+    """Headers marking a request as internal traffic (SERVICE_TOKEN from the environment)"""
+    token = os.getenv("SERVICE_TOKEN")
+    return {SERVICE_TOKEN_HEADER: token} if token else {}
+
+
+def backend_url() -> str:
+    """Backend base URL (BACKEND_URL from the environment)"""
+    return os.getenv("BACKEND_URL", "http://localhost:8000").rstrip("/")